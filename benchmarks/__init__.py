@@ -0,0 +1,5 @@
+# Benchmarks
+
+"""
+Benchmarks for the PS4 sales analysis pipeline
+"""
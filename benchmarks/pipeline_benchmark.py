@@ -0,0 +1,218 @@
+"""
+Pipeline Benchmark for PS4 Sales Analysis
+
+This script times every stage of the analysis pipeline on synthetic catalogs
+of increasing size and reports the throughput and peak resident memory of
+each stage. Results are saved as JSON and can be compared with a baseline.
+
+Usage:
+    python -m benchmarks.pipeline_benchmark --rows 1e4 1e5 1e6 \\
+        --output bench.json --baseline previous_bench.json
+"""
+
+import os
+import json
+import time
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic_data import write_synthetic_catalog
+from src.pipeline.instrumentation import get_peak_rss_mb
+
+
+def _time_stage(results, name, num_rows, func, *args, **kwargs):
+    """Runs a stage, records its timing and memory, and returns its result"""
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    results[name] = {
+        'seconds': seconds,
+        'rows_per_second': num_rows / seconds if seconds > 0 else None,
+        'peak_rss_mb': get_peak_rss_mb()
+    }
+    return value
+
+
+def benchmark_catalog(csv_path, num_rows, output_dir):
+    """
+    Times every pipeline stage on one catalog.
+
+    Runs in a fresh process, so that the reported peak memory belongs to
+    this catalog size only. Peak memory is cumulative within the run, so
+    the stage that raises it is the one whose value first increases.
+
+    Parameters:
+    -----------
+    csv_path : str
+        Path to the synthetic catalog
+    num_rows : int
+        Number of rows in the catalog
+    output_dir : str
+        Directory for the reports generated during the benchmark
+
+    Returns:
+    --------
+    dict
+        Timing, throughput and peak memory of each stage
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from src.data.data_processing import load_data, clean_data, preprocess_data
+    from src.analysis.regional_analysis import generate_regional_report
+    from src.analysis.year_analysis import generate_year_analysis_report
+    from src.visualization import visualize
+
+    stages = {}
+    df_raw = _time_stage(stages, 'load_data', num_rows, load_data, csv_path)
+    df_cleaned = _time_stage(
+        stages, 'clean_data', num_rows, clean_data, df_raw)
+    del df_raw
+    df_processed = _time_stage(
+        stages, 'preprocess_data', len(df_cleaned), preprocess_data, df_cleaned)
+    del df_cleaned
+
+    num_processed = len(df_processed)
+    _time_stage(stages, 'generate_regional_report', num_processed,
+                generate_regional_report, df_processed,
+                os.path.join(output_dir, 'regional_analysis_report.txt'))
+    _time_stage(stages, 'generate_year_analysis_report', num_processed,
+                generate_year_analysis_report, df_processed,
+                os.path.join(output_dir, 'year_analysis_report.txt'))
+
+    for plot_func, _ in visualize.FIGURES:
+        fig = _time_stage(stages, plot_func.__name__, num_processed,
+                          plot_func, df_processed)
+        plt.close(fig)
+
+    return stages
+
+
+def run_benchmarks(row_counts, data_dir=None, seed=0):
+    """
+    Runs the pipeline benchmark for several catalog sizes.
+
+    Parameters:
+    -----------
+    row_counts : list of int
+        Catalog sizes to benchmark
+    data_dir : str, optional
+        Directory for the synthetic catalogs. If not specified, a temporary
+        directory is used and removed afterwards.
+    seed : int, optional
+        Seed of the synthetic data generator, default is 0
+
+    Returns:
+    --------
+    dict
+        Environment description and results for each catalog size
+    """
+    import numpy as np
+    import pandas as pd
+
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__
+        },
+        'results': []
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = data_dir or temp_dir
+        context = multiprocessing.get_context('spawn')
+
+        for num_rows in row_counts:
+            csv_path = os.path.join(data_dir, f'synthetic_{num_rows}.csv')
+            if not os.path.exists(csv_path):
+                print(f"Generating {num_rows} rows...")
+                write_synthetic_catalog(csv_path, num_rows, seed)
+
+            print(f"Benchmarking {num_rows} rows...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                stages = executor.submit(
+                    benchmark_catalog, csv_path, num_rows, temp_dir).result()
+
+            results['results'].append({'rows': num_rows, 'stages': stages})
+            for name, stage in stages.items():
+                peak_rss = stage['peak_rss_mb']
+                print(f"  {name}: {stage['seconds']:.3f} s, peak RSS "
+                      + ('n/a' if peak_rss is None else f"{peak_rss:.1f} MB"))
+
+    return results
+
+
+def compare_with_baseline(results, baseline):
+    """
+    Compares benchmark results with a baseline.
+
+    Parameters:
+    -----------
+    results : dict
+        Current results of run_benchmarks
+    baseline : dict
+        Baseline results of run_benchmarks
+
+    Returns:
+    --------
+    list of str
+        Lines with the ratio of the current to the baseline time of each
+        stage present in both results
+    """
+    baseline_by_rows = {entry['rows']: entry['stages']
+                        for entry in baseline['results']}
+
+    lines = []
+    for entry in results['results']:
+        baseline_stages = baseline_by_rows.get(entry['rows'])
+        if baseline_stages is None:
+            continue
+        lines.append(f"{entry['rows']} rows:")
+        for name, stage in entry['stages'].items():
+            if name not in baseline_stages:
+                continue
+            ratio = stage['seconds'] / baseline_stages[name]['seconds']
+            lines.append(f"  {name}: {ratio:.2f}x baseline time")
+    return lines
+
+
+def main(argv=None):
+    """Parses the command line and runs the benchmark"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the PS4 sales analysis pipeline on synthetic data")
+    parser.add_argument('--rows', nargs='+', default=['1e4', '1e5', '1e6'],
+                        help="catalog sizes, from 1e4 to 1e8 rows")
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="path of the JSON results file")
+    parser.add_argument('--baseline',
+                        help="JSON results file of a previous run to compare with")
+    parser.add_argument('--data-dir',
+                        help="directory where synthetic catalogs are kept between runs")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the synthetic data generator")
+    args = parser.parse_args(argv)
+
+    row_counts = [int(float(rows)) for rows in args.rows]
+    results = run_benchmarks(row_counts, args.data_dir, args.seed)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("Comparison with baseline:")
+        for line in compare_with_baseline(results, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
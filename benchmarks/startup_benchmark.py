@@ -0,0 +1,192 @@
+"""
+Startup Benchmark for PS4 Sales Analysis
+
+This script measures the import time of every entry point of the analysis
+with `python -X importtime` in a fresh interpreter, and records which heavy
+dependencies each entry point pulls in. Results are saved as JSON and can be
+compared with a baseline.
+
+Usage:
+    python -m benchmarks.startup_benchmark --output startup.json \\
+        --baseline previous_startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+
+
+# Entry points of the analysis as (name, module imported at startup)
+ENTRY_POINTS = [
+    ('run_analysis', 'run_analysis'),
+    ('reports', 'src.analysis.reports'),
+    ('data_processing', 'src.data.data_processing'),
+    ('regional_analysis', 'src.analysis.regional_analysis'),
+    ('year_analysis', 'src.analysis.year_analysis'),
+    ('incremental', 'src.data.incremental'),
+    ('visualize', 'src.visualization.visualize')
+]
+
+# Dependencies whose import dominates the startup time
+HEAVY_MODULES = ['numpy', 'pandas', 'pyarrow', 'matplotlib']
+
+
+def parse_importtime(output):
+    """
+    Parses the output of `python -X importtime`.
+
+    Parameters:
+    -----------
+    output : str
+        Standard error of the interpreter
+
+    Returns:
+    --------
+    dict
+        Cumulative import time in microseconds of every imported module
+    """
+    cumulative = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def measure_entry_point(module, repeat=5):
+    """
+    Measures the startup of an entry point in fresh interpreters.
+
+    Parameters:
+    -----------
+    module : str
+        Module imported by the entry point
+    repeat : int, optional
+        Number of measurements, of which the fastest is kept, default is 5
+
+    Returns:
+    --------
+    dict
+        Import time of the module ('import_ms'), wall time of the whole
+        interpreter ('wall_ms'), number of imported modules ('num_modules')
+        and the heavy dependencies that were imported ('heavy_modules')
+    """
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, '-X', 'importtime', '-c', f'import {module}']
+
+    # Import from an empty directory, so that files created at import time
+    # (e.g. the log of run_analysis) are not left in the project
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [project_dir, os.environ.get('PYTHONPATH')])))
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as work_dir:
+            completed = subprocess.run(command, cwd=work_dir, env=env,
+                                       capture_output=True, text=True,
+                                       check=True)
+        wall_ms = (time.perf_counter() - start) * 1000
+        cumulative = parse_importtime(completed.stderr)
+
+        result = {
+            'import_ms': cumulative.get(module, 0) / 1000,
+            'wall_ms': wall_ms,
+            'num_modules': len(cumulative),
+            'heavy_modules': [name for name in HEAVY_MODULES
+                              if name in cumulative]
+        }
+        if best is None or result['import_ms'] < best['import_ms']:
+            best = result
+    return best
+
+
+def run_benchmarks(repeat=5):
+    """
+    Measures the startup of every entry point.
+
+    Parameters:
+    -----------
+    repeat : int, optional
+        Number of measurements per entry point, default is 5
+
+    Returns:
+    --------
+    dict
+        Environment description and the results of every entry point
+    """
+    results = {}
+    for name, module in ENTRY_POINTS:
+        results[name] = measure_entry_point(module, repeat)
+        print(f"{name}: {results[name]['import_ms']:.1f} ms "
+              f"({', '.join(results[name]['heavy_modules']) or 'no heavy imports'})")
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results
+    }
+
+
+def compare_with_baseline(results, baseline):
+    """
+    Compares startup results with a baseline.
+
+    Parameters:
+    -----------
+    results : dict
+        Current results of run_benchmarks
+    baseline : dict
+        Baseline results of run_benchmarks
+
+    Returns:
+    --------
+    list of str
+        Lines with the ratio of the current to the baseline import time of
+        each entry point present in both results
+    """
+    lines = []
+    for name, entry in results['results'].items():
+        baseline_entry = baseline['results'].get(name)
+        if baseline_entry is None or not baseline_entry['import_ms']:
+            continue
+        ratio = entry['import_ms'] / baseline_entry['import_ms']
+        lines.append(f"  {name}: {ratio:.2f}x baseline import time")
+    return lines
+
+
+def main(argv=None):
+    """Parses the command line and runs the benchmark"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the startup time of the PS4 sales analysis entry points")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="measurements per entry point, the fastest is kept")
+    parser.add_argument('--output', default='startup_results.json',
+                        help="path of the JSON results file")
+    parser.add_argument('--baseline',
+                        help="JSON results file of a previous run to compare with")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.repeat)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Startup results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("Comparison with baseline:")
+        for line in compare_with_baseline(results, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
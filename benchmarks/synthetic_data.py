@@ -0,0 +1,161 @@
+"""
+Synthetic Catalog Generator for PS4 Sales Analysis Benchmarks
+
+This module generates game catalogs with the same schema as
+data/raw/ps4_sales.csv at arbitrary sizes. Genres and publishers follow
+skewed (Zipf-like) popularity distributions, with the number of publishers
+growing with the catalog size, and sales follow a log-normal distribution.
+A small fraction of rows is invalid, so that the cleaning stage has rows
+to reject.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+
+# Genres of the real catalog
+GENRES = [
+    'Action', 'Shooter', 'Action-Adventure', 'Sports', 'Role-Playing', 'Misc',
+    'Platform', 'Racing', 'Fighting', 'Adventure', 'MMO', 'Simulation',
+    'Music', 'Party', 'Strategy', 'Puzzle', 'Visual Novel'
+]
+
+# Share of each region in global sales
+REGION_SHARES = {
+    'North America': 0.36,
+    'europe': 0.43,
+    'japan': 0.06,
+    'Rest of World': 0.15
+}
+
+# Range of release years
+FIRST_YEAR = 2013
+LAST_YEAR = 2020
+
+# Fraction of rows with null values, negative sales or a wrong global sum
+INVALID_FRACTION = 0.005
+
+# Upper bound of the number of publishers in very large catalogs
+MAX_PUBLISHERS = 500_000
+
+
+def _zipf_choice(rng, num_values, size, exponent=1.1):
+    """Draws indexes from 0 to num_values - 1 with Zipf-like probabilities"""
+    weights = 1.0 / np.arange(1, num_values + 1) ** exponent
+    return rng.choice(num_values, size=size, p=weights / weights.sum())
+
+
+def get_num_publishers(num_rows):
+    """
+    Returns a realistic number of publishers for a catalog size.
+
+    The real catalog has about one publisher per five games. Larger catalogs
+    grow more slowly, up to MAX_PUBLISHERS.
+
+    Parameters:
+    -----------
+    num_rows : int
+        Number of games in the catalog
+
+    Returns:
+    --------
+    int
+        Number of distinct publishers
+    """
+    return int(min(max(num_rows // 5, 1), MAX_PUBLISHERS))
+
+
+def generate_chunk(rng, start_id, num_rows, num_publishers):
+    """
+    Generates one chunk of a synthetic catalog.
+
+    Parameters:
+    -----------
+    rng : numpy.random.Generator
+        Random number generator
+    start_id : int
+        Id of the first game in the chunk
+    num_rows : int
+        Number of rows in the chunk
+    num_publishers : int
+        Number of distinct publishers in the catalog
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Chunk with the columns of the raw sales data
+    """
+    ids = np.arange(start_id, start_id + num_rows)
+
+    # Global sales split into regions around their average shares
+    global_sales = np.round(rng.lognormal(-1.5, 1.3, num_rows), 2)
+    shares = rng.dirichlet(
+        [share * 20 for share in REGION_SHARES.values()], num_rows)
+    regional = np.round(global_sales[:, None] * shares, 2)
+
+    chunk = pd.DataFrame({
+        'id': ids,
+        'game': [f'Game {i}' for i in ids],
+        'year': rng.integers(FIRST_YEAR, LAST_YEAR + 1, num_rows),
+        'genre': np.array(GENRES)[_zipf_choice(rng, len(GENRES), num_rows)],
+        'publisher': [f'Publisher {i}' for i in
+                      _zipf_choice(rng, num_publishers, num_rows)],
+    })
+    for i, region in enumerate(REGION_SHARES):
+        chunk[region] = regional[:, i]
+    chunk['global'] = np.round(regional.sum(axis=1), 2)
+
+    # Make a small fraction of rows invalid, spread over the three rules
+    invalid = np.flatnonzero(rng.random(num_rows) < INVALID_FRACTION)
+    rules = rng.integers(0, 3, len(invalid))
+    chunk.loc[chunk.index[invalid[rules == 0]], 'publisher'] = None
+    chunk.loc[chunk.index[invalid[rules == 1]], 'japan'] = -0.01
+    chunk.loc[chunk.index[invalid[rules == 2]], 'global'] += 1.0
+
+    return chunk
+
+
+def write_synthetic_catalog(file_path, num_rows, seed=0, chunk_rows=1_000_000):
+    """
+    Writes a synthetic catalog to a CSV file, one chunk at a time.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path of the CSV file to write
+    num_rows : int
+        Number of rows in the catalog
+    seed : int, optional
+        Seed of the random number generator, default is 0
+    chunk_rows : int, optional
+        Number of rows generated and written at once
+
+    Returns:
+    --------
+    str
+        Path where the catalog was saved
+    """
+    rng = np.random.default_rng(seed)
+    num_publishers = get_num_publishers(num_rows)
+
+    output_dir = os.path.dirname(file_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        for start in range(0, num_rows, chunk_rows):
+            size = min(chunk_rows, num_rows - start)
+            chunk = generate_chunk(rng, start + 1, size, num_publishers)
+            chunk.to_csv(f, index=False, header=(start == 0),
+                         float_format='%.2f')
+
+    return file_path
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python -m benchmarks.synthetic_data <path> <num_rows>
+    path = write_synthetic_catalog(sys.argv[1], int(float(sys.argv[2])))
+    print(f"Synthetic catalog saved to {path}")
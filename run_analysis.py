@@ -9,6 +9,7 @@ Executes data loading, preprocessing, analysis, and visualization.
 import os
 import sys
 import logging
+import argparse
 from datetime import datetime
 
 # Setup logging
@@ -23,6 +24,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Root directory of the project
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 def create_project_structure():
     """Creates the necessary directory structure if it doesn't exist"""
@@ -38,93 +42,610 @@ def create_project_structure():
         logger.info(f"Directory created or already exists: {directory}")
 
 
-def run_full_analysis():
-    """Runs the full data analysis cycle"""
+def log_rejections(rejection_counts):
+    """
+    Logs the number of rows removed by each cleaning rule
+
+    Parameters:
+    -----------
+    rejection_counts : dict
+        Rejection counts, see src.data.validation.count_rejections
+    """
+    from src.data.validation import VALIDATION_RULES
+
+    rows = rejection_counts.get('rows', 0)
+    rejected = rejection_counts.get('rejected', 0)
+    share = rejected / rows * 100 if rows else 0.0
+    logger.info(f"Rows rejected by validation: {rejected} of {rows} ({share:.2f}%)")
+    for rule in VALIDATION_RULES:
+        logger.info(f"  - {rule}: {rejection_counts.get(rule, 0)}")
+
+
+# Stages of the full analysis and the stages whose results they use
+STAGE_DEPENDENCIES = {
+    'clean': [],
+    'stats': ['clean'],
+    'preprocess': ['clean'],
+    'save': ['preprocess'],
+    'save_partitioned': ['preprocess'],
+    'cube': ['preprocess'],
+    'regional_means': ['preprocess'],
+    'regional_report': ['preprocess', 'cube'],
+    'year_report': ['preprocess', 'cube'],
+    'figures': ['cube']
+}
+
+# Stages run when no stages are selected
+DEFAULT_STAGES = ['stats', 'save', 'save_partitioned', 'regional_means',
+                  'regional_report', 'year_report', 'figures']
+
+
+def run_full_analysis(input_path=None, use_cache=True, figure_workers=None,
+                      trace_path='analysis_trace.jsonl', profile=False,
+                      trace_memory=False, data_workers=None, stages=None,
+                      stage_workers=None, output_dir=None, figures_dir=None,
+                      processed_path=None, cube_path=None, quarantine_path=None,
+                      report_formats=('text',), report_compression=None):
+    """
+    Runs the full data analysis cycle
+
+    The stages form a dependency graph: the saved data and the sales cube
+    only depend on the preprocessed data, which depends on the cleaned data,
+    and the reports and figures are read from the cube. The selected stages
+    run concurrently, and the data stages they depend on are evaluated once,
+    when the first of them needs the data. Every stage has its own record in
+    the trace and its own profile, also when it is evaluated for another
+    stage, whose times then exclude it.
+
+    Each stage is cached under a key derived from the hash of the input file,
+    the source code of the modules implementing the stage and its parameters.
+    Stages whose key has not changed since the last run are skipped and their
+    results are reloaded, and upstream data is only loaded when a downstream
+    stage actually has to be recomputed.
+
+    Parameters:
+    -----------
+    input_path : str, optional
+        Path to the raw CSV file, or a directory or glob pattern of CSV files
+        (e.g. one per platform and month) that are analyzed together, see
+        src.data.dataset.load_dataset. If not specified, the default path is
+        used.
+    use_cache : bool, optional
+        Whether to reuse cached stage results, default is True
+    figure_workers : int, optional
+        Number of processes rendering figures concurrently. If not specified,
+        figures are rendered one after another.
+    trace_path : str, optional
+        Path of the JSON lines trace with the wall time, CPU time, peak memory
+        growth and input/output rows of every stage, default is
+        'analysis_trace.jsonl' next to 'analysis_log.txt'. If None, no trace
+        is written.
+    profile : bool, optional
+        Whether to save cProfile statistics of each stage to
+        'analysis_profiles', default is False. Stages then run one after
+        another.
+    trace_memory : bool, optional
+        Whether to capture the tracemalloc peak and top allocation sites of
+        each stage, default is False. Stages then run one after
+        another.
+    data_workers : int, optional
+        Number of processes cleaning and preprocessing row ranges of the data
+        concurrently, and of threads reading the files of a dataset. If not
+        specified, the data is processed in this process.
+    stages : list of str, optional
+        Stages to run, any of STAGE_DEPENDENCIES. If not specified,
+        DEFAULT_STAGES are run.
+    stage_workers : int, optional
+        Maximum number of stages running at the same time. If not specified,
+        all selected stages can run at the same time.
+    output_dir : str, optional
+        Directory of the text reports. If not specified, 'reports/output'
+        is used.
+    figures_dir : str, optional
+        Directory of the figures. If not specified, 'reports/figures' is used.
+    processed_path : str, optional
+        Path of the saved processed data. If not specified, the default path
+        is used.
+    cube_path : str, optional
+        Path of the saved sales cube. If not specified, the default path is
+        used.
+    quarantine_path : str, optional
+        Path of a CSV file to save the rows removed by cleaning to, with the
+        rules they violate. If not specified, the removed rows are only
+        counted.
+    report_formats : sequence of str, optional
+        Outputs of every report, any of 'text', 'json' (JSON Lines) and 'csv'
+        (one file per section), default is ('text',)
+    report_compression : str, optional
+        'gzip' or 'zstd' to compress the report outputs, default is no
+        compression
+    """
     start_time = datetime.now()
     logger.info("Starting PS4 game sales data analysis")
 
-    # Import modules from the project structure
-    from src.data.data_processing import (
-        load_data, clean_data, preprocess_data, get_summary_stats, save_processed_data
+    import pandas as pd
+    from src.pipeline.cache import (
+        get_default_cache_dir, file_digest, files_digest, stage_key,
+        run_cached_stage, paths_exist
     )
-    from src.analysis.regional_analysis import (
-        generate_regional_report, calculate_regional_means
+    from src.data.dataset import is_dataset_path, find_dataset_files
+    from src.pipeline.dag import StageGraph
+    from src.pipeline.instrumentation import StageTracer
+
+    tracer = StageTracer(
+        trace_path,
+        profile_dir='analysis_profiles' if profile else None,
+        trace_memory=trace_memory
     )
-    from src.analysis.year_analysis import generate_year_analysis_report
-    from src.visualization.visualize import create_all_visualizations
 
-    # Step 1: Load data
-    logger.info("Loading raw data...")
+    if input_path is None:
+        input_path = os.path.join(PROJECT_DIR, 'data', 'raw', 'ps4_sales.csv')
+    if stages is None:
+        stages = DEFAULT_STAGES
+    if profile or trace_memory:
+        # Profiles and allocation peaks are only meaningful for one stage
+        stage_workers = 1
+
+    regional_report_path = None
+    year_report_path = None
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        regional_report_path = os.path.join(
+            output_dir, 'regional_analysis_report.txt')
+        year_report_path = os.path.join(output_dir, 'year_analysis_report.txt')
+
+    if cube_path is None:
+        from src.analysis.cube import get_default_cube_path
+        cube_path = get_default_cube_path()
+
+    cache_dir = get_default_cache_dir() if use_cache else None
+
+    # Compute the stage keys from the input hash and the stage code
     try:
-        df_raw = load_data()
+        if is_dataset_path(input_path):
+            input_digest = files_digest(find_dataset_files(input_path), cache_dir)
+        else:
+            input_digest = file_digest(input_path, cache_dir)
+    except OSError as e:
+        logger.error(f"Error loading data: {str(e)}")
+        return
+
+    data_module = 'src.data.data_processing'
+    parallel_module = 'src.data.parallel'
+    keys = {}
+    # Without data workers, the data is cleaned and preprocessed in one
+    # fused pass by the clean stage, whose result then holds the processed
+    # data, and the preprocess stage passes it on without caching it again
+    fused = data_workers is None
+    keys['clean'] = stage_key(
+        'clean', [input_digest],
+        [data_module, parallel_module, 'src.data.validation',
+         'src.data.dataset'],
+        {'quarantine_path': quarantine_path, 'fused': fused})
+    keys['stats'] = stage_key('stats', [keys['clean']], [data_module])
+    keys['preprocess'] = stage_key(
+        'preprocess', [keys['clean']], [data_module, parallel_module])
+    keys['save'] = stage_key('save', [keys['preprocess']], [data_module],
+                             {'output_path': processed_path})
+    keys['save_partitioned'] = stage_key(
+        'save_partitioned', [keys['preprocess']], [data_module])
+    keys['cube'] = stage_key(
+        'cube', [keys['preprocess']], ['src.analysis.cube'],
+        {'output_path': cube_path})
+    keys['regional_means'] = stage_key(
+        'regional_means', [keys['preprocess']], ['src.analysis.regional_analysis'])
+    keys['regional_report'] = stage_key(
+        'regional_report', [keys['preprocess'], keys['cube']],
+        ['src.analysis.regional_analysis'],
+        {'output_path': regional_report_path, 'formats': tuple(report_formats),
+         'compression': report_compression})
+    keys['year_report'] = stage_key(
+        'year_report', [keys['preprocess'], keys['cube']],
+        ['src.analysis.year_analysis'],
+        {'output_path': year_report_path, 'formats': tuple(report_formats),
+         'compression': report_compression})
+    keys['figures'] = stage_key(
+        'figures', [keys['cube']], ['src.visualization.visualize'],
+        {'output_dir': figures_dir})
+
+    graph = StageGraph()
+
+    def add_stage(name, compute, validate=None, cache=True):
+        def evaluate(inputs):
+            # Dependencies are evaluated by the first stage that needs them,
+            # and are traced and profiled as stages of their own
+            with tracer.detached(), tracer.stage(name) as record:
+                value, cached = run_cached_stage(
+                    name, keys[name], lambda: compute(inputs),
+                    cache_dir if cache else None, validate)
+                record['cached'] = cached
+                if isinstance(value, pd.DataFrame):
+                    record['rows_out'] = value.shape[0]
+            if cached:
+                logger.info(f"  (reused cached result of stage '{name}')")
+            return value
+
+        graph.add_stage(name, evaluate, STAGE_DEPENDENCIES[name])
+
+    def get_processed_input(inputs):
+        # Record the processed rows as the input of the running stage
+        df_processed = inputs['preprocess']
+        tracer.annotate(rows_in=df_processed.shape[0])
+        return df_processed
+
+    def compute_cleaned(inputs):
+        from src.data.data_processing import load_data, clean_and_preprocess
+        from src.data.dataset import load_dataset
+        from src.data.parallel import parallel_clean_data
+
+        # Step 1: Load data, reading the files of a dataset concurrently
+        logger.info("Loading raw data...")
+        with tracer.stage('load_data') as record:
+            if is_dataset_path(input_path):
+                df_raw = load_dataset(input_path, data_workers)
+            else:
+                df_raw = load_data(input_path)
+            record['rows_out'] = df_raw.shape[0]
         logger.info(
             f"Data loaded successfully: {df_raw.shape[0]} rows, {df_raw.shape[1]} columns")
+
+        # Step 2: Clean data, and preprocess it in the same pass if it is
+        # processed in this process
+        logger.info("Cleaning data...")
+        tracer.annotate(rows_in=df_raw.shape[0])
+        rejection_counts = {}
+        stage_name = 'clean_and_preprocess' if fused else 'clean_data'
+        with tracer.stage(stage_name, rows_in=df_raw.shape[0]) as record:
+            if fused:
+                df_cleaned = clean_and_preprocess(
+                    df_raw, quarantine_path=quarantine_path,
+                    rejection_counts=rejection_counts)
+            else:
+                df_cleaned = parallel_clean_data(
+                    df_raw, data_workers, quarantine_path=quarantine_path,
+                    rejection_counts=rejection_counts)
+            record['rows_out'] = df_cleaned.shape[0]
+            record['rejections'] = rejection_counts
+        logger.info(
+            f"Data cleaned: {df_cleaned.shape[0]} rows, {df_cleaned.shape[1]} columns")
+        log_rejections(rejection_counts)
+        if quarantine_path is not None:
+            logger.info(f"Rejected rows saved to {quarantine_path}")
+        return df_cleaned
+
+    def compute_stats(inputs):
+        from src.data.data_processing import get_summary_stats
+
+        # Step 3: Get summary statistics
+        logger.info("Calculating summary statistics...")
+        df_cleaned = inputs['clean']
+        tracer.annotate(rows_in=df_cleaned.shape[0])
+        return get_summary_stats(df_cleaned)
+
+    def compute_processed(inputs):
+        from src.data.parallel import parallel_preprocess_data
+
+        # Step 4: Preprocess data, unless it was preprocessed while cleaning
+        logger.info("Preprocessing data...")
+        df_cleaned = inputs['clean']
+        tracer.annotate(rows_in=df_cleaned.shape[0])
+        if fused:
+            df_processed = df_cleaned
+        else:
+            df_processed = parallel_preprocess_data(df_cleaned, data_workers)
+        logger.info(
+            f"Data preprocessed: {df_processed.shape[0]} rows, {df_processed.shape[1]} columns")
+        return df_processed
+
+    def compute_save(inputs):
+        from src.data.data_processing import save_processed_data
+
+        # Step 5: Save processed data
+        logger.info("Saving processed data...")
+        return save_processed_data(get_processed_input(inputs), processed_path)
+
+    def compute_save_partitioned(inputs):
+        from src.data.data_processing import (
+            save_processed_data, PARTITION_COLUMNS
+        )
+
+        # Save the processed data partitioned by year and genre, so that
+        # queries of single years or genres only read their partitions
+        logger.info("Saving partitioned processed data...")
+        return save_processed_data(get_processed_input(inputs),
+                                   partition_cols=PARTITION_COLUMNS)
+
+    def compute_cube(inputs):
+        from src.analysis.cube import build_cube, save_cube
+
+        # Build the sales cube the reports and figures are read from
+        logger.info("Building the sales cube...")
+        cube = build_cube(get_processed_input(inputs))
+        logger.info(f"Sales cube saved to {save_cube(cube, cube_path)}")
+        return cube
+
+    def compute_regional_means(inputs):
+        from src.analysis.regional_analysis import calculate_regional_means
+
+        # Step 6: Regional analysis
+        logger.info("Performing regional analysis...")
+        return calculate_regional_means(get_processed_input(inputs))
+
+    def compute_regional_report(inputs):
+        from src.analysis.regional_analysis import generate_regional_report
+        return generate_regional_report(
+            get_processed_input(inputs), regional_report_path,
+            cube=inputs['cube'], formats=report_formats,
+            compression=report_compression)
+
+    def compute_year_report(inputs):
+        from src.analysis.year_analysis import generate_year_analysis_report
+
+        # Step 7: Year analysis
+        logger.info("Performing year analysis...")
+        return generate_year_analysis_report(
+            get_processed_input(inputs), year_report_path,
+            aggregates=inputs['cube'], formats=report_formats,
+            compression=report_compression)
+
+    def compute_figures(inputs):
+        import matplotlib
+        from src.visualization.visualize import create_all_visualizations
+
+        # Step 8: Create visualizations. Figures are only saved, and may be
+        # drawn outside the main thread, so a non-interactive backend is used.
+        logger.info("Creating visualizations...")
+        matplotlib.use('Agg')
+        return create_all_visualizations(
+            None, figure_workers, figures_dir, cube=inputs['cube'])
+
+    add_stage('clean', compute_cleaned)
+    add_stage('stats', compute_stats)
+    add_stage('preprocess', compute_processed, cache=not fused)
+    add_stage('save', compute_save, paths_exist)
+    add_stage('save_partitioned', compute_save_partitioned, paths_exist)
+    add_stage('cube', compute_cube, lambda _: paths_exist(cube_path))
+    add_stage('regional_means', compute_regional_means)
+    add_stage('regional_report', compute_regional_report, paths_exist)
+    add_stage('year_report', compute_year_report, paths_exist)
+    add_stage('figures', compute_figures, paths_exist)
+
+    # Run the selected stages, independent stages concurrently
+    logger.info(f"Running stages: {', '.join(stages)}")
+    try:
+        results = graph.run(stages, stage_workers)
     except Exception as e:
-        logger.error(f"Error loading data: {str(e)}")
+        logger.error(f"Error running the analysis: {str(e)}")
         return
 
-    # Step 2: Clean data
-    logger.info("Cleaning data...")
-    df_cleaned = clean_data(df_raw)
-    logger.info(
-        f"Data cleaned: {df_cleaned.shape[0]} rows, {df_cleaned.shape[1]} columns")
-
-    # Step 3: Get summary statistics
-    logger.info("Calculating summary statistics...")
-    stats = get_summary_stats(df_cleaned)
-    logger.info("Summary Statistics:")
-    for key, value in stats.items():
-        logger.info(f"  - {key}: {value}")
-
-    # Step 4: Preprocess data
-    logger.info("Preprocessing data...")
-    df_processed = preprocess_data(df_cleaned)
-    logger.info(
-        f"Data preprocessed: {df_processed.shape[0]} rows, {df_processed.shape[1]} columns")
+    # Report the results in a fixed order
+    if 'clean' in results:
+        logger.info(f"Cleaned data: {results['clean'].shape[0]} rows")
+    if 'preprocess' in results:
+        logger.info(f"Preprocessed data: {results['preprocess'].shape[0]} rows")
 
-    # Step 5: Save processed data
-    logger.info("Saving processed data...")
-    output_path = save_processed_data(df_processed)
-    logger.info(f"Processed data saved to {output_path}")
+    stats = results.get('stats', {})
+    if stats:
+        logger.info("Summary Statistics:")
+        for key, value in stats.items():
+            logger.info(f"  - {key}: {value}")
 
-    # Step 6: Regional analysis
-    logger.info("Performing regional analysis...")
-    regional_means = calculate_regional_means(df_processed)
-    logger.info("Average sales by region:")
-    for region, value in regional_means.items():
-        logger.info(f"  - {region}: {value:.4f} M")
+    if 'save' in results:
+        logger.info(f"Processed data saved to {results['save']}")
+    if 'save_partitioned' in results:
+        logger.info(
+            f"Partitioned processed data saved to {results['save_partitioned']}")
 
-    regional_report_path = generate_regional_report(df_processed)
-    logger.info(f"Regional analysis report generated: {regional_report_path}")
+    if 'regional_means' in results:
+        logger.info("Average sales by region:")
+        for region, value in results['regional_means'].items():
+            logger.info(f"  - {region}: {value:.4f} M")
 
-    # Step 7: Year analysis
-    logger.info("Performing year analysis...")
-    year_report_path = generate_year_analysis_report(df_processed)
-    logger.info(f"Year analysis report generated: {year_report_path}")
+    if 'regional_report' in results:
+        logger.info(
+            f"Regional analysis report generated: {results['regional_report']}")
+    if 'year_report' in results:
+        logger.info(f"Year analysis report generated: {results['year_report']}")
 
-    # Step 8: Create visualizations
-    logger.info("Creating visualizations...")
-    figure_paths = create_all_visualizations(df_processed)
-    logger.info(f"Created {len(figure_paths)} visualizations:")
-    for path in figure_paths:
-        logger.info(f"  - {path}")
+    if 'figures' in results:
+        figure_paths = results['figures']
+        logger.info(f"Created {len(figure_paths)} visualizations:")
+        for path in figure_paths:
+            logger.info(f"  - {path}")
 
     # Final output
     end_time = datetime.now()
     duration = end_time - start_time
     logger.info(f"Analysis completed successfully. Duration: {duration}")
-    logger.info("Key Findings Summary:")
-    logger.info(f"  1. Games analyzed: {stats.get('Number of games', 'N/A')}")
-    logger.info(f"  2. Year range: {stats.get('Year range', 'N/A')}")
-    logger.info(f"  3. Genres: {stats.get('Number of genres', 'N/A')}")
-    logger.info(f"  4. Publishers: {stats.get('Number of publishers', 'N/A')}")
+    if stats:
+        logger.info("Key Findings Summary:")
+        logger.info(f"  1. Games analyzed: {stats.get('Number of games', 'N/A')}")
+        logger.info(f"  2. Year range: {stats.get('Year range', 'N/A')}")
+        logger.info(f"  3. Genres: {stats.get('Number of genres', 'N/A')}")
+        logger.info(f"  4. Publishers: {stats.get('Number of publishers', 'N/A')}")
+        logger.info(
+            f"  5. Total global sales: {stats.get('Total global sales (M)', 'N/A')} M")
+
+
+def run_incremental_analysis(input_path=None):
+    """
+    Processes only the rows appended to the raw data since the previous run
+
+    The new rows are cleaned, preprocessed and appended to the incremental
+    processed dataset, and merged into the running aggregates by year, genre
+    and lifecycle phase, from which the regional and yearly summaries and the
+    year analysis report are derived. The new rows are streamed in chunks,
+    so the runtime and memory depend on the number of new rows, not on the
+    size of the history.
+
+    Parameters:
+    -----------
+    input_path : str, optional
+        Path to the raw CSV file. If not specified, the default path is used.
+    """
+    start_time = datetime.now()
+    logger.info("Starting incremental PS4 game sales data analysis")
+
+    from src.data.incremental import update_incremental_store
+    from src.analysis.aggregates import summarize_by
+    from src.analysis.quantiles import merge_quantile_sketches, quantile_table
+
+    if input_path is None:
+        input_path = os.path.join(PROJECT_DIR, 'data', 'raw', 'ps4_sales.csv')
+
+    # Process the new rows
+    try:
+        result = update_incremental_store(input_path)
+    except Exception as e:
+        logger.error(f"Error loading data: {str(e)}")
+        return
+
+    if result['rebuilt']:
+        logger.info("Source data was replaced, incremental store rebuilt")
     logger.info(
-        f"  5. Total global sales: {stats.get('Total global sales (M)', 'N/A')} M")
+        f"New rows read: {result['rows_read']}, "
+        f"after cleaning: {result['rows_processed']}")
+    log_rejections(result['rejections'])
+
+    aggregates = result['aggregates']
+    if aggregates is None:
+        logger.info("No data processed yet")
+        return
+
+    # Summaries derived from the running aggregates
+    regional_summary = summarize_by(aggregates, None)
+    logger.info("Average sales by region:")
+    for region, value in regional_summary['mean'].items():
+        logger.info(f"  - {region}: {value:.4f} M")
 
+    yearly_summary = summarize_by(aggregates, 'year').xs('global', level='region')
+    logger.info("Global sales by year:")
+    for year, row in yearly_summary.iterrows():
+        if year == 0:
+            continue
+        logger.info(
+            f"  - {year}: {int(row['count'])} games, {row['sum']:.2f} M total, "
+            f"{row['mean']:.4f} M average")
+
+    # Approximate percentiles from the merged quantile sketches
+    phase_sketches = result['quantile_sketches']
+    regional_sketches = merge_quantile_sketches(
+        *({None: sketches} for sketches in phase_sketches.values()))
+    logger.info("Sales percentiles by region (p50 / p90 / p99):")
+    for region, row in quantile_table(regional_sketches).iterrows():
+        logger.info(
+            f"  - {region}: {row['p50']:.4f} / {row['p90']:.4f} / {row['p99']:.4f} M")
+    logger.info("Global sales percentiles by lifecycle phase (p50 / p90 / p99):")
+    phase_quantiles = quantile_table(phase_sketches)
+    for (phase, region), row in phase_quantiles.iterrows():
+        if region == 'global':
+            logger.info(
+                f"  - {phase}: {row['p50']:.4f} / {row['p90']:.4f} / {row['p99']:.4f} M")
+
+    # Year analysis from the merged aggregates and sketches
+    from src.analysis.year_analysis import generate_year_analysis_report
+    year_report_path = generate_year_analysis_report(
+        None, aggregates=aggregates, quantile_sketches=phase_sketches)
+    logger.info(f"Year analysis report generated: {year_report_path}")
+
+    duration = datetime.now() - start_time
+    logger.info(f"Incremental analysis completed. Duration: {duration}")
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line of the analysis
+
+    Parameters:
+    -----------
+    argv : list of str, optional
+        Command line arguments. If not specified, sys.argv is used.
+
+    Returns:
+    --------
+    argparse.Namespace
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Run the PS4 game sales analysis")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGE_DEPENDENCIES),
+                        metavar='STAGE',
+                        help="stages to run, any of: "
+                             f"{', '.join(STAGE_DEPENDENCIES)} "
+                             f"(default: {' '.join(DEFAULT_STAGES)})")
+    parser.add_argument('--input',
+                        help="raw CSV file, or a directory or quoted glob pattern of "
+                             "CSV files analyzed together (default: data/raw/ps4_sales.csv)")
+    parser.add_argument('--output-dir',
+                        help="directory of the text reports (default: reports/output)")
+    parser.add_argument('--figures-dir',
+                        help="directory of the figures (default: reports/figures)")
+    parser.add_argument('--processed-path',
+                        help="path of the saved processed data "
+                             "(default: data/processed/ps4_sales_processed.parquet)")
+    parser.add_argument('--cube-path',
+                        help="path of the saved sales cube "
+                             "(default: data/processed/ps4_sales_cube.npz)")
+    parser.add_argument('--quarantine',
+                        help="CSV file to save the rows rejected by cleaning to")
+    parser.add_argument('--report-format', nargs='+', default=['text'],
+                        choices=['text', 'json', 'csv'], dest='report_formats',
+                        help="outputs of every report (default: text)")
+    parser.add_argument('--report-compression', choices=['gzip', 'zstd'],
+                        help="compress the report outputs")
+    parser.add_argument('--stage-workers', type=int,
+                        help="maximum number of stages running at the same time "
+                             "(default: all selected stages)")
+    parser.add_argument('--figure-workers', type=int,
+                        help="number of processes rendering figures")
+    parser.add_argument('--data-workers', type=int,
+                        help="number of processes cleaning and preprocessing the data")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="recompute every stage instead of reusing cached results")
+    parser.add_argument('--incremental', action='store_true',
+                        help="process only the rows added since the previous run")
+    parser.add_argument('--trace', default='analysis_trace.jsonl',
+                        help="JSON lines trace of the stages (default: analysis_trace.jsonl)")
+    parser.add_argument('--no-trace', action='store_true',
+                        help="do not write the stage trace")
+    parser.add_argument('--profile', action='store_true',
+                        help="save cProfile statistics of every stage to analysis_profiles")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="capture the tracemalloc peak and top allocations of every stage")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Runs the analysis selected on the command line"""
+    args = parse_args(argv)
 
-if __name__ == "__main__":
     # Create project structure
     create_project_structure()
 
-    # Run the analysis
-    run_full_analysis()
+    # Run the analysis, processing only new rows in incremental mode
+    if args.incremental:
+        run_incremental_analysis(args.input)
+        return
+
+    run_full_analysis(
+        input_path=args.input,
+        use_cache=not args.no_cache,
+        figure_workers=args.figure_workers,
+        trace_path=None if args.no_trace else args.trace,
+        profile=args.profile,
+        trace_memory=args.trace_memory,
+        data_workers=args.data_workers,
+        stages=args.stages,
+        stage_workers=args.stage_workers,
+        output_dir=args.output_dir,
+        figures_dir=args.figures_dir,
+        processed_path=args.processed_path,
+        cube_path=args.cube_path,
+        quarantine_path=args.quarantine,
+        report_formats=args.report_formats,
+        report_compression=args.report_compression
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Reports-only entry point of the PS4 sales analysis
+
+Generates the regional and yearly reports without creating any figures, so
+matplotlib is never imported. With --year, only a report on a single release
+year is generated, from the partitions of that year in the partitioned
+processed data store.
+
+Usage:
+    python -m src.analysis [--workers N] [--approximate] [--year YEAR]
+                           [--format {text,json,csv} ...]
+                           [--compression {gzip,zstd}]
+"""
+
+import argparse
+
+# Kept in sync with src.analysis.report_writer, which imports pandas
+REPORT_FORMATS = ('text', 'json', 'csv')
+COMPRESSIONS = ('gzip', 'zstd')
+
+
+def main(argv=None):
+    """Parses the command line and generates the reports"""
+    parser = argparse.ArgumentParser(
+        description="Generate the PS4 sales analysis reports without figures")
+    parser.add_argument('--workers', type=int,
+                        help="number of processes generating reports concurrently")
+    parser.add_argument('--approximate', action='store_true',
+                        help="report approximate medians from quantile sketches")
+    parser.add_argument('--year', type=int,
+                        help="only report on the games released in this year")
+    parser.add_argument('--format', nargs='+', choices=REPORT_FORMATS,
+                        default=['text'], dest='formats',
+                        help="outputs of every report, default is text")
+    parser.add_argument('--compression', choices=COMPRESSIONS,
+                        help="compress the report outputs")
+    args = parser.parse_args(argv)
+
+    # Report on a single year, reading only its partitions
+    if args.year is not None:
+        from src.analysis.year_analysis import generate_single_year_report
+
+        try:
+            path = generate_single_year_report(
+                args.year, formats=args.formats, compression=args.compression)
+        except (FileNotFoundError, ValueError, ImportError) as e:
+            parser.error(str(e))
+        print(f"Report on {args.year} saved to {path}")
+        return
+
+    from src.data.data_processing import (
+        load_data, clean_and_preprocess, load_processed_data
+    )
+    from src.analysis.reports import generate_reports
+
+    # Load the processed data store, or preprocess the raw data if it is missing
+    try:
+        df = load_processed_data()
+    except FileNotFoundError:
+        df = clean_and_preprocess(load_data(use_cache=True))
+
+    try:
+        paths = generate_reports(df, args.workers, approximate=args.approximate,
+                                 formats=args.formats,
+                                 compression=args.compression)
+    except ImportError as e:
+        parser.error(str(e))
+    for name, path in paths.items():
+        print(f"{name.capitalize()} report saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
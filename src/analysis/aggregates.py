@@ -0,0 +1,201 @@
+"""
+Module for running aggregates of PS4 game sales
+
+This module provides mergeable aggregates of the sales data (number of games,
+sum, sum of squares, minimum and maximum of sales per region) keyed by release
+year, genre and lifecycle phase. Aggregates can be built for separate
+partitions of the data, in parallel or on different machines, serialized and
+combined associatively, and summary statistics are derived from the merged
+result. Aggregates of new rows can also be merged into the aggregates of the
+history, so that statistics are updated in time proportional to the new data.
+"""
+
+import os
+import pandas as pd
+import numpy as np
+
+from src.data.data_processing import widen_sales
+
+
+# Sales regions aggregated
+REGIONS = ['North America', 'europe', 'japan', 'Rest of World', 'global']
+
+# Keys of the aggregates
+AGGREGATE_KEYS = ['year', 'genre', 'lifecycle_phase']
+
+# Statistics stored for every key and region, with the function that
+# combines the values of two partitions
+AGGREGATE_STATS = {
+    'count': 'sum',
+    'sum': 'sum',
+    'sumsq': 'sum',
+    'min': 'min',
+    'max': 'max'
+}
+
+
+def build_aggregates(df):
+    """
+    Builds the aggregates of the sales data.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with preprocessed game sales data, or an iterator of
+        partitions whose aggregates are merged one at a time
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Long-format DataFrame with one row per year, genre, lifecycle phase
+        and region, and the columns 'count', 'sum', 'sumsq', 'min' and 'max'
+    """
+    # Merge the aggregates of the partitions as they are built
+    if not isinstance(df, pd.DataFrame):
+        aggregates = None
+        for partition in df:
+            aggregates = merge_aggregates(
+                aggregates, build_aggregates(partition))
+        return aggregates
+
+    # Sales and squared sales in double precision, aggregated in one pass
+    values = widen_sales(df[REGIONS])
+    squares = values ** 2
+    squares.columns = [f'{region}__sumsq' for region in REGIONS]
+    grouped = pd.concat([df[AGGREGATE_KEYS], values, squares], axis=1).groupby(
+        AGGREGATE_KEYS, observed=True)
+    sums = grouped.sum()
+    counts = grouped[REGIONS].count()
+    minimums = grouped[REGIONS].min()
+    maximums = grouped[REGIONS].max()
+
+    # Reshape to one row per key and region
+    aggregates = []
+    for region in REGIONS:
+        region_aggregates = pd.DataFrame({
+            'count': counts[region].astype('int64'),
+            'sum': sums[region],
+            'sumsq': sums[f'{region}__sumsq'],
+            'min': minimums[region],
+            'max': maximums[region]
+        })
+        region_aggregates.insert(0, 'region', region)
+        aggregates.append(region_aggregates.reset_index())
+
+    return pd.concat(aggregates, ignore_index=True)
+
+
+def merge_aggregates(*aggregates):
+    """
+    Merges aggregates built from different sets of rows.
+
+    The merge is associative and commutative, so partitions can be combined
+    in any order and grouping.
+
+    Parameters:
+    -----------
+    *aggregates : pandas.DataFrame
+        Aggregates returned by build_aggregates or merge_aggregates.
+        None values are ignored.
+
+    Returns:
+    --------
+    pandas.DataFrame or None
+        Aggregates of all the rows, or None if there were none
+    """
+    aggregates = [state for state in aggregates if state is not None]
+    if not aggregates:
+        return None
+
+    combined = pd.concat(aggregates, ignore_index=True)
+
+    # Key columns are compared by value, categories may differ between parts
+    for key in ['genre', 'lifecycle_phase']:
+        combined[key] = combined[key].astype(str)
+
+    return combined.groupby(AGGREGATE_KEYS + ['region'], sort=True).agg(
+        AGGREGATE_STATS).reset_index()
+
+
+def save_aggregates(aggregates, file_path):
+    """
+    Saves aggregates to a Parquet file, or to a JSON file if the path ends
+    with '.json'.
+
+    Parameters:
+    -----------
+    aggregates : pandas.DataFrame
+        Aggregates to save
+    file_path : str
+        Path of the file
+
+    Returns:
+    --------
+    str
+        Path where the aggregates were saved
+    """
+    output_dir = os.path.dirname(file_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    if file_path.endswith('.json'):
+        aggregates.to_json(file_path, orient='records')
+    else:
+        aggregates.to_parquet(file_path, index=False)
+
+    return file_path
+
+
+def load_aggregates(file_path):
+    """
+    Loads aggregates saved by save_aggregates.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path of the file
+
+    Returns:
+    --------
+    pandas.DataFrame or None
+        Aggregates, or None if the file does not exist
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    if file_path.endswith('.json'):
+        return pd.read_json(file_path, orient='records')
+    return pd.read_parquet(file_path)
+
+
+def summarize_by(aggregates, key):
+    """
+    Rolls the aggregates up to one key and derives mean and standard deviation.
+
+    Parameters:
+    -----------
+    aggregates : pandas.DataFrame
+        Aggregates returned by build_aggregates or merge_aggregates
+    key : str or None
+        'year', 'genre' or 'lifecycle_phase', or None for totals per region
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame indexed by key and region (or by region only) with the
+        columns 'count', 'sum', 'mean', 'std', 'min' and 'max'
+    """
+    # Keep the regions in their usual order
+    aggregates = aggregates.assign(
+        region=pd.Categorical(aggregates['region'], categories=REGIONS))
+    by = ['region'] if key is None else [key, 'region']
+    summary = aggregates.groupby(by, sort=True, observed=True).agg(
+        AGGREGATE_STATS)
+
+    # Mean and sample standard deviation from the additive statistics
+    count = summary['count'].astype('float64')
+    summary['mean'] = summary['sum'] / count
+    variance = (summary['sumsq'] - summary['sum'] ** 2 / count) / (count - 1)
+    summary['std'] = np.sqrt(variance.clip(lower=0))
+
+    return summary.drop(columns='sumsq')
@@ -0,0 +1,419 @@
+"""
+Module for the sales cube of PS4 games
+
+This module provides a dense cube of the sales statistics by genre, region,
+release year and lifecycle phase. Every cell holds the number of games, the
+sum, the sum of squares, the minimum and the maximum of their sales, stored
+as NumPy arrays indexed by the positions of the dimension labels. Reports
+and figures slice and roll the cube up instead of grouping the rows, so they
+cost time proportional to the size of the cube, not the number of games.
+The cube is built from the mergeable aggregates of the data and can be saved
+to a compact .npz file.
+"""
+
+import os
+import pandas as pd
+import numpy as np
+
+from src.analysis.aggregates import REGIONS, build_aggregates
+from src.analysis.topk import top_k
+from src.data.data_processing import UNKNOWN_PHASE
+
+
+# Dimensions of the cube, in the order of the axes of its arrays
+CUBE_DIMS = ('genre', 'region', 'year', 'lifecycle_phase')
+
+# Statistics stored in every cell
+CUBE_STATS = ('count', 'sum', 'sumsq', 'min', 'max')
+
+
+class SalesCube:
+    """
+    Dense cube of sales statistics.
+
+    Cubes are usually created by build_cube or cube_from_aggregates, and
+    reduced with slice and rollup, which return new cubes over fewer labels
+    or dimensions.
+
+    Parameters:
+    -----------
+    dims : sequence of str
+        Names of the dimensions, in the order of the array axes
+    labels : dict
+        Labels of every dimension, in the order of the array positions
+    stats : dict
+        Arrays of every statistic in CUBE_STATS, with one axis per dimension
+    """
+
+    def __init__(self, dims, labels, stats):
+        self.dims = tuple(dims)
+        self.labels = {dim: pd.Index(labels[dim], name=dim)
+                       for dim in self.dims}
+        self.stats = stats
+
+    @property
+    def shape(self):
+        """Number of labels of every dimension"""
+        return tuple(len(self.labels[dim]) for dim in self.dims)
+
+    def slice(self, **selection):
+        """
+        Selects labels of some dimensions.
+
+        Parameters:
+        -----------
+        **selection
+            Label or list of labels for each dimension to select from, e.g.
+            region='global' or year=[2014, 2015]. A single label removes the
+            dimension from the result, a list keeps it.
+
+        Returns:
+        --------
+        SalesCube
+            Cube with the selected labels
+        """
+        dims = list(self.dims)
+        labels = dict(self.labels)
+        stats = dict(self.stats)
+
+        for dim, selected in selection.items():
+            if dim not in dims:
+                raise KeyError(f"Unknown dimension '{dim}'")
+            axis = dims.index(dim)
+            single = np.ndim(selected) == 0
+            selected_labels = [selected] if single else list(selected)
+
+            positions = labels[dim].get_indexer(selected_labels)
+            if (positions < 0).any():
+                missing = [label for label, position
+                           in zip(selected_labels, positions) if position < 0]
+                raise KeyError(f"Unknown {dim} labels: {missing}")
+
+            if single:
+                stats = {name: np.take(array, positions[0], axis=axis)
+                         for name, array in stats.items()}
+                dims.pop(axis)
+                del labels[dim]
+            else:
+                stats = {name: np.take(array, positions, axis=axis)
+                         for name, array in stats.items()}
+                labels[dim] = labels[dim][positions]
+
+        return SalesCube(dims, labels, stats)
+
+    def rollup(self, *dims):
+        """
+        Aggregates the cube over all dimensions except the given ones.
+
+        Parameters:
+        -----------
+        *dims : str
+            Dimensions to keep, in the order of the axes of the result
+
+        Returns:
+        --------
+        SalesCube
+            Cube over the given dimensions
+        """
+        for dim in dims:
+            if dim not in self.dims:
+                raise KeyError(f"Unknown dimension '{dim}'")
+        axes = tuple(axis for axis, dim in enumerate(self.dims)
+                     if dim not in dims)
+        kept = [dim for dim in self.dims if dim in dims]
+
+        stats = {}
+        for name, array in self.stats.items():
+            if name == 'min':
+                stats[name] = np.fmin.reduce(array, axis=axes)
+            elif name == 'max':
+                stats[name] = np.fmax.reduce(array, axis=axes)
+            else:
+                stats[name] = array.sum(axis=axes)
+
+        # Reorder the remaining axes as requested
+        order = [kept.index(dim) for dim in dims]
+        stats = {name: np.transpose(array, order)
+                 for name, array in stats.items()}
+
+        return SalesCube(dims, self.labels, stats)
+
+    def stat(self, name):
+        """
+        Returns a statistic of every cell.
+
+        Parameters:
+        -----------
+        name : str
+            'count', 'sum', 'sumsq', 'min', 'max', 'mean' or 'std'. Mean and
+            sample standard deviation are NaN for cells without enough games.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Array with one axis per dimension
+        """
+        if name in self.stats:
+            return self.stats[name]
+
+        count = self.stats['count'].astype('float64')
+        total = self.stats['sum']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if name == 'mean':
+                return np.where(count > 0, total / count, np.nan)
+            if name == 'std':
+                variance = (self.stats['sumsq'] - total ** 2 / count) / (count - 1)
+                return np.where(count > 1, np.sqrt(np.clip(variance, 0, None)),
+                                np.nan)
+        raise KeyError(f"Unknown statistic '{name}'")
+
+    def to_series(self, name):
+        """
+        Returns a statistic of the cells that contain games.
+
+        Parameters:
+        -----------
+        name : str
+            Statistic, see stat
+
+        Returns:
+        --------
+        pandas.Series or float
+            Series indexed by the dimension labels, or a single value for
+            a cube without dimensions
+        """
+        values = self.stat(name)
+        if not self.dims:
+            return values.item()
+
+        index = pd.MultiIndex.from_product(
+            [self.labels[dim] for dim in self.dims]) if len(self.dims) > 1 \
+            else self.labels[self.dims[0]]
+        series = pd.Series(values.ravel(), index=index, name=name)
+        return series[self.stats['count'].ravel() > 0]
+
+    def table(self, name, index, columns):
+        """
+        Returns a statistic of a two-dimensional rollup as a table.
+
+        Parameters:
+        -----------
+        name : str
+            Statistic, see stat
+        index : str
+            Dimension of the rows
+        columns : str
+            Dimension of the columns
+
+        Returns:
+        --------
+        pandas.DataFrame
+            Table of the statistic. Rows without any games are left out.
+        """
+        cube = self.rollup(index, columns)
+        table = pd.DataFrame(cube.stat(name), index=cube.labels[index],
+                             columns=cube.labels[columns])
+        return table[cube.stats['count'].sum(axis=1) > 0]
+
+    def top_n(self, name, n):
+        """
+        Returns the cells of a one-dimensional cube with the largest values.
+
+        Parameters:
+        -----------
+        name : str
+            Statistic, see stat
+        n : int
+            Number of cells
+
+        Returns:
+        --------
+        list of tuple
+            (label, value) pairs in descending order of value. Cells without
+            games are left out; ties keep the order of the labels.
+        """
+        if len(self.dims) != 1:
+            raise ValueError("top_n needs a cube with a single dimension")
+
+        return list(top_k(self.to_series(name), n).items())
+
+
+def _ordered_labels(values, dim, aggregates):
+    """Returns the labels of a dimension in their natural order"""
+    present = pd.unique(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # The order of the categories, e.g. custom lifecycle phases
+        return [label for label in values.cat.categories if label in present]
+    if dim == 'region':
+        return [region for region in REGIONS if region in present] + \
+            sorted(set(present) - set(REGIONS))
+    if dim == 'lifecycle_phase':
+        # Chronological order of the phases, with the unknown phase last
+        first_years = aggregates.groupby(
+            values.astype(str))['year'].min()
+        return sorted(first_years.index,
+                      key=lambda phase: (phase == UNKNOWN_PHASE,
+                                         first_years[phase], phase))
+    return sorted(present)
+
+
+def cube_from_aggregates(aggregates):
+    """
+    Builds the cube from aggregates.
+
+    Parameters:
+    -----------
+    aggregates : pandas.DataFrame
+        Aggregates returned by build_aggregates or merge_aggregates
+
+    Returns:
+    --------
+    SalesCube
+        Cube over CUBE_DIMS
+    """
+    labels = {}
+    positions = []
+    for dim in CUBE_DIMS:
+        values = aggregates[dim]
+        labels[dim] = _ordered_labels(values, dim, aggregates)
+        positions.append(pd.Index(labels[dim]).get_indexer(
+            values.astype(object) if isinstance(
+                values.dtype, pd.CategoricalDtype) else values))
+
+    shape = tuple(len(labels[dim]) for dim in CUBE_DIMS)
+    cells = np.ravel_multi_index(positions, shape)
+    size = int(np.prod(shape))
+
+    stats = {}
+    for name in CUBE_STATS:
+        values = aggregates[name].to_numpy()
+        if name == 'count':
+            array = np.zeros(size, dtype='int64')
+            np.add.at(array, cells, values.astype('int64'))
+        elif name == 'min':
+            array = np.full(size, np.nan)
+            np.fmin.at(array, cells, values)
+        elif name == 'max':
+            array = np.full(size, np.nan)
+            np.fmax.at(array, cells, values)
+        else:
+            array = np.zeros(size)
+            np.add.at(array, cells, values)
+        stats[name] = array.reshape(shape)
+
+    return SalesCube(CUBE_DIMS, labels, stats)
+
+
+def build_cube(df):
+    """
+    Builds the cube of the sales data.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with preprocessed game sales data, or an iterator of
+        partitions
+
+    Returns:
+    --------
+    SalesCube
+        Cube over CUBE_DIMS
+    """
+    return cube_from_aggregates(build_aggregates(df))
+
+
+def as_cube(data):
+    """
+    Returns a cube for a cube, aggregates or preprocessed sales data.
+
+    Parameters:
+    -----------
+    data : SalesCube or pandas.DataFrame
+        Cube, aggregates returned by build_aggregates, or preprocessed data
+
+    Returns:
+    --------
+    SalesCube
+        The cube of the data
+    """
+    if isinstance(data, SalesCube):
+        return data
+    if isinstance(data, pd.DataFrame) and set(CUBE_STATS) <= set(data.columns):
+        return cube_from_aggregates(data)
+    return build_cube(data)
+
+
+def get_default_cube_path():
+    """
+    Returns the default path of the saved cube.
+
+    Returns:
+    --------
+    str
+        Path to the cube file
+    """
+    # Determine the path relative to the project root
+    base_dir = os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_dir, 'data', 'processed', 'ps4_sales_cube.npz')
+
+
+def save_cube(cube, file_path=None):
+    """
+    Saves a cube to a .npz file.
+
+    Parameters:
+    -----------
+    cube : SalesCube
+        Cube to save
+    file_path : str, optional
+        Path of the file. If not specified, the default path is used.
+
+    Returns:
+    --------
+    str
+        Path where the cube was saved
+    """
+    if file_path is None:
+        file_path = get_default_cube_path()
+    output_dir = os.path.dirname(file_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    arrays = {'dims': np.array(cube.dims)}
+    for dim in cube.dims:
+        arrays[f'labels__{dim}'] = cube.labels[dim].to_numpy(
+            dtype=None if dim == 'year' else str)
+    for name, array in cube.stats.items():
+        arrays[f'stat__{name}'] = array
+
+    with open(file_path, 'wb') as f:
+        np.savez(f, **arrays)
+    return file_path
+
+
+def load_cube(file_path=None):
+    """
+    Loads a cube saved by save_cube.
+
+    Parameters:
+    -----------
+    file_path : str, optional
+        Path of the file. If not specified, the default path is used.
+
+    Returns:
+    --------
+    SalesCube or None
+        The cube, or None if the file does not exist
+    """
+    if file_path is None:
+        file_path = get_default_cube_path()
+    if not os.path.exists(file_path):
+        return None
+
+    with np.load(file_path, allow_pickle=False) as data:
+        dims = data['dims'].tolist()
+        labels = {dim: data[f'labels__{dim}'].tolist() for dim in dims}
+        stats = {name[len('stat__'):]: data[name] for name in data.files
+                 if name.startswith('stat__')}
+    return SalesCube(dims, labels, stats)
@@ -0,0 +1,385 @@
+"""
+Module for approximate quantiles of PS4 game sales
+
+This module provides a streaming quantile sketch with a configurable relative
+error bound. Values are counted in logarithmically sized buckets, so a sketch
+keeps a few hundred counters regardless of the number of values, can be
+updated chunk by chunk, merged with sketches of other partitions and
+serialized. Sketches are built per key (region, lifecycle phase) to report
+medians and high percentiles without holding the sales columns in memory.
+"""
+
+import os
+import json
+import math
+import pandas as pd
+import numpy as np
+
+from src.data.data_processing import widen_sales
+
+
+# Sales regions sketched by default
+REGIONS = ['North America', 'europe', 'japan', 'Rest of World', 'global']
+
+# Quantiles reported by default
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Default relative error bound of the sketches
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a relative error guarantee.
+
+    Every returned quantile q is within relative_accuracy * |q| of a value
+    whose rank is the requested one. Zero values, which are common in
+    regional sales, are counted exactly.
+
+    Parameters:
+    -----------
+    relative_accuracy : float, optional
+        Relative error bound, between 0 and 1, default is 0.01
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.zero_count = 0
+        self.positive = {}
+        self.negative = {}
+
+    def _add_buckets(self, buckets, values):
+        """Counts the bucket indexes of positive values"""
+        indexes, counts = np.unique(
+            np.ceil(np.log(values) / self._log_gamma).astype(np.int64),
+            return_counts=True)
+        for index, count in zip(indexes.tolist(), counts.tolist()):
+            buckets[index] = buckets.get(index, 0) + count
+
+    def update(self, values):
+        """
+        Adds values to the sketch. Missing values are ignored.
+
+        Parameters:
+        -----------
+        values : array-like of float
+            Values to add
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.count += len(values)
+        self.zero_count += int(np.count_nonzero(values == 0))
+        if (values > 0).any():
+            self._add_buckets(self.positive, values[values > 0])
+        if (values < 0).any():
+            self._add_buckets(self.negative, -values[values < 0])
+
+    def merge(self, other):
+        """
+        Adds the values of another sketch with the same accuracy.
+
+        Parameters:
+        -----------
+        other : QuantileSketch
+            Sketch to merge into this one
+
+        Returns:
+        --------
+        QuantileSketch
+            This sketch
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for buckets, other_buckets in [(self.positive, other.positive),
+                                       (self.negative, other.negative)]:
+            for index, count in other_buckets.items():
+                buckets[index] = buckets.get(index, 0) + count
+        return self
+
+    def _bucket_value(self, index):
+        """Returns the value representing a bucket"""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        """
+        Returns an approximate quantile of the added values.
+
+        Parameters:
+        -----------
+        q : float
+            Quantile, between 0 and 1
+
+        Returns:
+        --------
+        float
+            Approximate quantile, or NaN if the sketch is empty
+        """
+        if self.count == 0:
+            return np.nan
+
+        rank = q * (self.count - 1)
+        seen = 0
+
+        # Walk the buckets from the smallest value to the largest
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._bucket_value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._bucket_value(index)
+        return self._bucket_value(max(self.positive))
+
+    def to_dict(self):
+        """
+        Serializes the sketch to a JSON-compatible dictionary.
+
+        Returns:
+        --------
+        dict
+            Accuracy and bucket counts of the sketch
+        """
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'count': self.count,
+            'zero_count': self.zero_count,
+            'positive': {str(index): count for index, count in self.positive.items()},
+            'negative': {str(index): count for index, count in self.negative.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restores a sketch serialized by to_dict.
+
+        Parameters:
+        -----------
+        data : dict
+            Serialized sketch
+
+        Returns:
+        --------
+        QuantileSketch
+            Restored sketch
+        """
+        sketch = cls(data['relative_accuracy'])
+        sketch.count = data['count']
+        sketch.zero_count = data['zero_count']
+        sketch.positive = {int(index): count
+                           for index, count in data['positive'].items()}
+        sketch.negative = {int(index): count
+                           for index, count in data['negative'].items()}
+        return sketch
+
+
+def build_quantile_sketches(df, by=None, columns=None,
+                            relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                            sketches=None):
+    """
+    Builds quantile sketches of sales columns, optionally per key.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with game sales data, or an iterator of chunks that are
+        added to the sketches one at a time
+    by : str, optional
+        Column to build separate sketches for, e.g. 'lifecycle_phase'.
+        If None, one sketch is built per column.
+    columns : list of str, optional
+        Columns to sketch, default is all the sales regions
+    relative_accuracy : float, optional
+        Relative error bound of the sketches, default is 0.01
+    sketches : dict, optional
+        Existing sketches to update, as returned by this function
+
+    Returns:
+    --------
+    dict
+        Dictionary {key: {column: QuantileSketch}}, where key is the value
+        of the 'by' column, or None if by is None
+    """
+    if columns is None:
+        columns = REGIONS
+    if sketches is None:
+        sketches = {}
+
+    # Update the sketches chunk by chunk
+    if not isinstance(df, pd.DataFrame):
+        for chunk in df:
+            build_quantile_sketches(chunk, by, columns,
+                                    relative_accuracy, sketches)
+        return sketches
+
+    if by is None:
+        groups = {None: np.arange(len(df))}
+    else:
+        groups = df.groupby(by, observed=True).indices
+
+    values = widen_sales(df[columns].to_numpy())
+    for key, positions in groups.items():
+        key_sketches = sketches.setdefault(key, {})
+        for i, column in enumerate(columns):
+            if column not in key_sketches:
+                key_sketches[column] = QuantileSketch(relative_accuracy)
+            key_sketches[column].update(values[positions, i])
+
+    return sketches
+
+
+def merge_quantile_sketches(*sketches):
+    """
+    Merges per-key sketches built from different partitions.
+
+    Parameters:
+    -----------
+    *sketches : dict
+        Results of build_quantile_sketches. None values are ignored.
+
+    Returns:
+    --------
+    dict
+        Merged sketches {key: {column: QuantileSketch}}
+    """
+    merged = {}
+    for partition in sketches:
+        if partition is None:
+            continue
+        for key, key_sketches in partition.items():
+            merged_key = merged.setdefault(key, {})
+            for column, sketch in key_sketches.items():
+                if column not in merged_key:
+                    merged_key[column] = QuantileSketch(
+                        sketch.relative_accuracy)
+                merged_key[column].merge(sketch)
+    return merged
+
+
+def quantile_table(sketches, quantiles=DEFAULT_QUANTILES):
+    """
+    Computes quantiles from per-key sketches.
+
+    Parameters:
+    -----------
+    sketches : dict
+        Result of build_quantile_sketches or merge_quantile_sketches
+    quantiles : sequence of float, optional
+        Quantiles to compute, default is p50, p90 and p99
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame indexed by key and column (or by column only, for
+        sketches built without a key) with one column per quantile,
+        e.g. 'p50', 'p90', 'p99'
+    """
+    rows = []
+    index = []
+    for key, key_sketches in sketches.items():
+        for column, sketch in key_sketches.items():
+            index.append(column if key is None else (key, column))
+            rows.append([sketch.quantile(q) for q in quantiles])
+
+    names = [f'p{q * 100:g}' for q in quantiles]
+    if index and isinstance(index[0], tuple):
+        index = pd.MultiIndex.from_tuples(index, names=['key', 'region'])
+    else:
+        index = pd.Index(index, name='region')
+    return pd.DataFrame(rows, index=index, columns=names)
+
+
+def regional_quantiles(df, by=None, quantiles=DEFAULT_QUANTILES,
+                       relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """
+    Computes approximate quantiles of sales per region, optionally per key.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with game sales data, or an iterator of chunks
+    by : str, optional
+        Column to compute separate quantiles for, e.g. 'lifecycle_phase'
+    quantiles : sequence of float, optional
+        Quantiles to compute, default is p50, p90 and p99
+    relative_accuracy : float, optional
+        Relative error bound, default is 0.01
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Quantiles per region (and key), see quantile_table
+    """
+    sketches = build_quantile_sketches(
+        df, by, relative_accuracy=relative_accuracy)
+    table = quantile_table(sketches, quantiles)
+    if by is not None:
+        table.index = table.index.set_names([by, 'region'])
+    return table
+
+
+def save_quantile_sketches(sketches, file_path):
+    """
+    Saves per-key sketches to a JSON file.
+
+    Parameters:
+    -----------
+    sketches : dict
+        Sketches to save
+    file_path : str
+        Path of the file
+
+    Returns:
+    --------
+    str
+        Path where the sketches were saved
+    """
+    output_dir = os.path.dirname(file_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # Keys are stored as a list of pairs, since they can be None
+    data = [[key, {column: sketch.to_dict()
+                   for column, sketch in key_sketches.items()}]
+            for key, key_sketches in sketches.items()]
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    return file_path
+
+
+def load_quantile_sketches(file_path):
+    """
+    Loads per-key sketches saved by save_quantile_sketches.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path of the file
+
+    Returns:
+    --------
+    dict or None
+        Sketches, or None if the file does not exist
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {key: {column: QuantileSketch.from_dict(sketch)
+                  for column, sketch in key_sketches.items()}
+            for key, key_sketches in data}
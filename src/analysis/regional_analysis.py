@@ -9,8 +9,88 @@ import os
 import pandas as pd
 import numpy as np
 
+from src.analysis.cube import build_cube
+from src.analysis.topk import top_k, top_groups, top_rows
+from src.analysis.report_writer import ReportWriter
+from src.data.data_processing import widen_sales
+from src.analysis.quantiles import (
+    DEFAULT_RELATIVE_ACCURACY, build_quantile_sketches
+)
 
-def calculate_regional_means(df):
+
+# Sales regions analyzed in the reports
+REGIONS = ['North America', 'europe', 'japan', 'Rest of World', 'global']
+
+# Regional markets (excluding global sales)
+MARKET_REGIONS = ['North America', 'europe', 'japan', 'Rest of World']
+
+
+def compute_regional_aggregates(df, approximate=False,
+                                relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                                cube=None):
+    """
+    Computes all the per-region, per-genre and per-phase statistics used by
+    the regional analysis.
+
+    Means, totals and the distribution statistics other than the median are
+    rolled up from the sales cube. Only the exact median needs the rows.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with game sales data
+    approximate : bool, optional
+        Whether to compute medians from quantile sketches instead of
+        sorting the sales columns, default is False
+    relative_accuracy : float, optional
+        Relative error bound of approximate medians, default is 0.01
+    cube : SalesCube, optional
+        Precomputed result of build_cube. If not specified, it is built
+        from df.
+
+    Returns:
+    --------
+    dict
+        Dictionary with the distribution statistics for each region
+        ('distribution'), the average sales by genre ('genre_means') and by
+        lifecycle phase ('phase_means') for each region, and the total sales
+        for each region ('totals')
+    """
+    if cube is None:
+        cube = build_cube(df)
+    cube = cube.slice(region=REGIONS)
+
+    # Average sales by genre and by lifecycle phase for every region
+    genre_means = cube.table('mean', 'genre', 'region')
+    phase_means = cube.table('mean', 'lifecycle_phase', 'region')
+
+    # Distribution statistics of every region
+    region_cube = cube.rollup('region')
+    totals = pd.Series(region_cube.stat('sum'), index=REGIONS)
+    if approximate:
+        sketches = build_quantile_sketches(
+            df, relative_accuracy=relative_accuracy)[None]
+        medians = [sketches[region].quantile(0.5) for region in REGIONS]
+    else:
+        medians = np.nanmedian(widen_sales(df[REGIONS].to_numpy()), axis=0)
+    distribution = pd.DataFrame({
+        'mean': region_cube.stat('mean'),
+        'median': medians,
+        'std': region_cube.stat('std'),
+        'min': region_cube.stat('min'),
+        'max': region_cube.stat('max'),
+        'sum': totals
+    }, index=REGIONS).T
+
+    return {
+        'distribution': distribution,
+        'genre_means': genre_means,
+        'phase_means': phase_means,
+        'totals': totals
+    }
+
+
+def calculate_regional_means(df, aggregates=None):
     """
     Calculates the average sales per region.
 
@@ -18,19 +98,18 @@ def calculate_regional_means(df):
     -----------
     df : pandas.DataFrame
         DataFrame with game sales data
+    aggregates : dict, optional
+        Precomputed result of compute_regional_aggregates
 
     Returns:
     --------
     dict
         Dictionary with average sales per region
     """
-    regional_means = {}
+    if aggregates is None:
+        aggregates = compute_regional_aggregates(df)
 
-    # Calculate average sales for each region
-    for region in ['North America', 'europe', 'japan', 'Rest of World', 'global']:
-        regional_means[region] = df[region].mean()
-
-    return regional_means
+    return aggregates['distribution'].loc['mean'].to_dict()
 
 
 def get_region_names_mapping():
@@ -52,7 +131,7 @@ def get_region_names_mapping():
     }
 
 
-def analyze_top_genres_by_region(df, top_n=5):
+def analyze_top_genres_by_region(df, top_n=5, aggregates=None):
     """
     Analyzes the top genres by average sales for each region.
 
@@ -62,22 +141,24 @@ def analyze_top_genres_by_region(df, top_n=5):
         DataFrame with game sales data
     top_n : int, optional
         Number of top genres for each region, default is 5
+    aggregates : dict, optional
+        Precomputed result of compute_regional_aggregates
 
     Returns:
     --------
     dict
         Dictionary with top genres by average sales for each region
     """
+    if aggregates is None:
+        aggregates = compute_regional_aggregates(df)
+
     top_genres = {}
 
     # Analyze top genres for each region
-    for region in ['North America', 'europe', 'japan', 'Rest of World', 'global']:
-        # Group by genre and calculate average sales
-        genre_sales = df.groupby(
-            'genre')[region].mean().sort_values(ascending=False)
-
-        # Get top genres
-        top_genres_region = genre_sales.head(top_n).reset_index()
+    for region in REGIONS:
+        # Top genres by average sales
+        genre_sales = top_k(aggregates['genre_means'][region], top_n)
+        top_genres_region = genre_sales.reset_index()
         top_genres_region.columns = ['genre', 'avg_sales']
 
         # Convert to list of tuples
@@ -87,7 +168,78 @@ def analyze_top_genres_by_region(df, top_n=5):
     return top_genres
 
 
-def compare_regional_distributions(df):
+def analyze_top_publishers_by_region(df, top_n=5, stat='sum'):
+    """
+    Analyzes the top publishers by sales for each region.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with game sales data
+    top_n : int, optional
+        Number of top publishers for each region, default is 5
+    stat : str, optional
+        Aggregation of the sales of each publisher, 'sum' or 'mean',
+        default is 'sum'
+
+    Returns:
+    --------
+    dict
+        Dictionary with (publisher, sales) tuples for each region
+    """
+    return {region: list(top_groups(df, 'publisher', region, top_n,
+                                    stat).items())
+            for region in REGIONS}
+
+
+def analyze_top_games_by_region(df, top_n=10):
+    """
+    Analyzes the best-selling games for each region.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with game sales data
+    top_n : int, optional
+        Number of top games for each region, default is 10
+
+    Returns:
+    --------
+    dict
+        Dictionary with (game, publisher, sales) tuples for each region
+    """
+    return {region: list(top_rows(df, region, top_n,
+                                  ['game', 'publisher', region]).itertuples(
+                                      index=False, name=None))
+            for region in REGIONS}
+
+
+def analyze_sales_by_platform(df):
+    """
+    Analyzes the average sales in each region for each platform.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with game sales data of several platforms, e.g. loaded
+        with src.data.dataset.load_dataset
+
+    Returns:
+    --------
+    pandas.DataFrame or None
+        Number of games and average sales by region for each platform, or
+        None if the data has no platform column
+    """
+    if 'platform' not in df.columns:
+        return None
+
+    grouped = widen_sales(df[REGIONS]).groupby(df['platform'], observed=True)
+    platform_sales = grouped.mean()
+    platform_sales.insert(0, 'num_games', grouped.size())
+    return platform_sales
+
+
+def compare_regional_distributions(df, aggregates=None):
     """
     Compares sales distributions across regions.
 
@@ -95,30 +247,21 @@ def compare_regional_distributions(df):
     -----------
     df : pandas.DataFrame
         DataFrame with game sales data
+    aggregates : dict, optional
+        Precomputed result of compute_regional_aggregates
 
     Returns:
     --------
     pandas.DataFrame
         DataFrame with distribution statistics for each region
     """
-    # Create an empty DataFrame for results
-    stats = pd.DataFrame(index=['mean', 'median', 'std', 'min', 'max', 'sum'])
-
-    # Calculate statistics for each region
-    for region in ['North America', 'europe', 'japan', 'Rest of World', 'global']:
-        stats[region] = [
-            df[region].mean(),
-            df[region].median(),
-            df[region].std(),
-            df[region].min(),
-            df[region].max(),
-            df[region].sum()
-        ]
+    if aggregates is None:
+        aggregates = compute_regional_aggregates(df)
 
-    return stats
+    return aggregates['distribution'].copy()
 
 
-def analyze_regional_preferences(df):
+def analyze_regional_preferences(df, aggregates=None):
     """
     Analyzes regional preferences by genre and lifecycle phase.
 
@@ -126,20 +269,24 @@ def analyze_regional_preferences(df):
     -----------
     df : pandas.DataFrame
         DataFrame with game sales data
+    aggregates : dict, optional
+        Precomputed result of compute_regional_aggregates
 
     Returns:
     --------
     dict
         Dictionary with the results of regional preference analysis
     """
+    if aggregates is None:
+        aggregates = compute_regional_aggregates(df)
+
     results = {}
 
     # Analyze genre preferences
     genres_by_region = {}
-    for region in ['North America', 'europe', 'japan', 'Rest of World']:
+    for region in MARKET_REGIONS:
         # Top 3 genres by sales in the region
-        top_genres = df.groupby('genre')[region].mean(
-        ).sort_values(ascending=False).head(3)
+        top_genres = top_k(aggregates['genre_means'][region], 3)
         genres_by_region[region] = [(genre, sales)
                                     for genre, sales in top_genres.items()]
 
@@ -147,25 +294,25 @@ def analyze_regional_preferences(df):
 
     # Analyze lifecycle phase preferences
     lifecycle_by_region = {}
-    for region in ['North America', 'europe', 'japan', 'Rest of World']:
+    for region in MARKET_REGIONS:
         # Average sales by lifecycle phase
-        phase_sales = df.groupby('lifecycle_phase')[
-            region].mean().sort_values(ascending=False)
+        phase_sales = top_k(aggregates['phase_means'][region], None)
         lifecycle_by_region[region] = [(phase, sales)
                                        for phase, sales in phase_sales.items()]
 
     results['lifecycle_preferences'] = lifecycle_by_region
 
     # Calculate relative market share
-    total_sales = df[['North America', 'europe',
-                      'japan', 'Rest of World']].sum()
+    total_sales = aggregates['totals'][MARKET_REGIONS]
     market_share = (total_sales / total_sales.sum()) * 100
     results['market_share'] = market_share.to_dict()
 
     return results
 
 
-def generate_regional_report(df, output_path=None):
+def generate_regional_report(df, output_path=None, approximate=False,
+                             relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                             cube=None, formats=('text',), compression=None):
     """
     Generates a report on regional sales analysis.
 
@@ -175,11 +322,24 @@ def generate_regional_report(df, output_path=None):
         DataFrame with game sales data
     output_path : str, optional
         Path to save the report. If not specified, the default path is used.
+    approximate : bool, optional
+        Whether to report approximate medians from quantile sketches,
+        default is False
+    relative_accuracy : float, optional
+        Relative error bound of approximate medians, default is 0.01
+    cube : SalesCube, optional
+        Precomputed result of build_cube
+    formats : sequence of str, optional
+        Outputs to write, any of 'text', 'json' (JSON Lines) and 'csv' (one
+        file per section), default is ('text',). See ReportWriter.
+    compression : str, optional
+        'gzip' or 'zstd' to compress the outputs, default is no compression
 
     Returns:
     --------
     str
-        Path where the report was saved
+        Path where the report was saved, with the suffix of the compression.
+        The text report if it is written, otherwise the first output.
     """
     if output_path is None:
         # Determine the path relative to the project root
@@ -195,89 +355,100 @@ def generate_regional_report(df, output_path=None):
     # Get region names mapping
     region_names = get_region_names_mapping()
 
-    # Calculate data for the report
-    regional_means = calculate_regional_means(df)
-    top_genres = analyze_top_genres_by_region(df)
-    distribution_stats = compare_regional_distributions(df)
-    preferences = analyze_regional_preferences(df)
-
-    # Format the report text
-    report_text = []
-    report_text.append("REPORT ON REGIONAL PS4 GAME SALES ANALYSIS")
-    report_text.append("=" * 80)
-    report_text.append("")
-
-    report_text.append("1. Average Sales by Region")
-    report_text.append("-" * 40)
-    for region, mean in regional_means.items():
-        display_region = region_names.get(region, region)
-        report_text.append(f"{display_region}: {mean:.4f} M")
-    report_text.append("")
-
-    report_text.append("2. Top 5 Genres by Average Sales in Each Region")
-    report_text.append("-" * 60)
-    for region, genres in top_genres.items():
-        if region != 'global':  # Exclude global sales from this section
+    # Calculate data for the report from the sales cube
+    aggregates = compute_regional_aggregates(
+        df, approximate, relative_accuracy, cube)
+
+    # Write every section as soon as it is computed
+    with ReportWriter(output_path, formats, compression) as report:
+        report.text("REPORT ON REGIONAL PS4 GAME SALES ANALYSIS")
+        report.text("=" * 80)
+        report.text("")
+
+        regional_means = calculate_regional_means(df, aggregates)
+        report.section("1. Average Sales by Region", "-" * 40)
+        report.rows(({'region': region_names.get(region, region),
+                      'avg_sales': mean}
+                     for region, mean in regional_means.items()),
+                    lambda row: f"{row['region']}: {row['avg_sales']:.4f} M")
+        report.text("")
+
+        top_genres = analyze_top_genres_by_region(df, aggregates=aggregates)
+        report.section("2. Top 5 Genres by Average Sales in Each Region",
+                       "-" * 60)
+        for region, genres in top_genres.items():
+            if region != 'global':  # Exclude global sales from this section
+                display_region = region_names.get(region, region)
+                report.text(f"\n{display_region}:")
+                report.rows(({'region': display_region, 'rank': i,
+                              'genre': genre, 'avg_sales': sales}
+                             for i, (genre, sales) in enumerate(genres, 1)),
+                            lambda row: f"  {row['rank']}. {row['genre']}: "
+                                        f"{row['avg_sales']:.4f} M")
+        report.text("")
+
+        distribution_stats = compare_regional_distributions(df, aggregates)
+        report.section("3. Comparison of Sales Distributions by Region",
+                       "-" * 60)
+        report.table(distribution_stats)
+        report.text("")
+
+        preferences = analyze_regional_preferences(df, aggregates)
+        report.section("4. Regional Preferences", "-" * 40)
+
+        report.section("\n4.1. Genre Preferences", None)
+        for region, genre_list in preferences['genre_preferences'].items():
+            display_region = region_names.get(region, region)
+            report.text(f"\n{display_region}:")
+            report.rows(({'region': display_region, 'genre': genre,
+                          'avg_sales': sales} for genre, sales in genre_list),
+                        lambda row: f"  - {row['genre']}: {row['avg_sales']:.4f} M")
+
+        report.section("\n4.2. Lifecycle Phase Preferences", None)
+        for region, phase_list in preferences['lifecycle_preferences'].items():
             display_region = region_names.get(region, region)
-            report_text.append(f"\n{display_region}:")
-            for i, (genre, sales) in enumerate(genres, 1):
-                report_text.append(f"  {i}. {genre}: {sales:.4f} M")
-    report_text.append("")
-
-    report_text.append("3. Comparison of Sales Distributions by Region")
-    report_text.append("-" * 60)
-    # Convert DataFrame to text format
-    stats_text = distribution_stats.to_string()
-    report_text.append(stats_text)
-    report_text.append("")
-
-    report_text.append("4. Regional Preferences")
-    report_text.append("-" * 40)
-
-    report_text.append("\n4.1. Genre Preferences")
-    for region, genre_list in preferences['genre_preferences'].items():
-        display_region = region_names.get(region, region)
-        report_text.append(f"\n{display_region}:")
-        for genre, sales in genre_list:
-            report_text.append(f"  - {genre}: {sales:.4f} M")
-
-    report_text.append("\n4.2. Lifecycle Phase Preferences")
-    for region, phase_list in preferences['lifecycle_preferences'].items():
-        display_region = region_names.get(region, region)
-        report_text.append(f"\n{display_region}:")
-        for phase, sales in phase_list:
-            report_text.append(f"  - {phase}: {sales:.4f} M")
-
-    report_text.append("\n4.3. Relative Market Share")
-    for region, share in preferences['market_share'].items():
-        display_region = region_names.get(region, region)
-        report_text.append(f"  {display_region}: {share:.2f}%")
-
-    report_text.append("\n")
-    report_text.append("5. Conclusions")
-    report_text.append("-" * 20)
-    report_text.append(
-        "1. North America and Europe are the largest markets for PS4 games.")
-    report_text.append(
-        "2. Japan shows distinct genre preferences compared to other regions.")
-    report_text.append(
-        "3. Average sales were higher during the early stages of the console lifecycle.")
-    report_text.append("")
-
-    # Save the report to a file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(report_text))
-
-    return output_path
+            report.text(f"\n{display_region}:")
+            report.rows(({'region': display_region, 'phase': phase,
+                          'avg_sales': sales} for phase, sales in phase_list),
+                        lambda row: f"  - {row['phase']}: {row['avg_sales']:.4f} M")
+
+        report.section("\n4.3. Relative Market Share", None)
+        report.rows(({'region': region_names.get(region, region),
+                      'market_share': share}
+                     for region, share in preferences['market_share'].items()),
+                    lambda row: f"  {row['region']}: {row['market_share']:.2f}%")
+
+        # Compare platforms when the data covers several of them
+        platform_sales = analyze_sales_by_platform(df) if df is not None else None
+        if platform_sales is not None and len(platform_sales) > 1:
+            report.section("\n4.4. Average Sales by Platform", None)
+            report.table(platform_sales.rename(columns=region_names))
+
+        report.text("\n")
+        report.section("5. Conclusions", "-" * 20)
+        report.text(
+            "1. North America and Europe are the largest markets for PS4 games.")
+        report.text(
+            "2. Japan shows distinct genre preferences compared to other regions.")
+        report.text(
+            "3. Average sales were higher during the early stages of the console lifecycle.")
+        report.text("")
+
+    return report.path
 
 
 if __name__ == "__main__":
     # Demonstrate function usage
-    from src.data.data_processing import load_data, preprocess_data
-
-    # Load and preprocess data
-    df_raw = load_data()
-    df = preprocess_data(df_raw)
+    from src.data.data_processing import (
+        load_data, preprocess_data, load_processed_data
+    )
+
+    # Load the processed data store, or preprocess the raw data if it is missing
+    try:
+        df = load_processed_data()
+    except FileNotFoundError:
+        df_raw = load_data(use_cache=True)
+        df = preprocess_data(df_raw)
 
     # Generate the regional report
     report_path = generate_regional_report(df)
@@ -0,0 +1,258 @@
+"""
+Module for writing the analysis reports
+
+This module provides a report writer that streams every section to its
+outputs as soon as it is computed, instead of assembling the whole report in
+memory. Besides the text report, the writer can produce machine-readable
+outputs: a JSON Lines file with one record per table row or value, and one
+CSV file per section. Every output can be compressed with gzip, or with
+Zstandard if the optional 'zstandard' package is installed. Large tables are
+rendered and written in blocks of rows, so the rendered text of a report
+over thousands of publishers or years never has to be held in memory.
+"""
+
+import os
+import re
+import csv
+import json
+import gzip
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Output formats of the reports
+REPORT_FORMATS = ('text', 'json', 'csv')
+
+# Supported compressions and the suffixes of compressed files
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Tables with more rows are rendered to text in blocks of this many rows
+TABLE_BLOCK_ROWS = 10000
+
+
+def _open_output(file_path, compression=None):
+    """Opens a text file for writing, optionally compressed"""
+    if compression is None:
+        return open(file_path, 'w', encoding='utf-8', newline='')
+    if compression == 'gzip':
+        return gzip.open(file_path, 'wt', encoding='utf-8', newline='')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "Zstandard compression requires the 'zstandard' package") from e
+        return zstandard.open(file_path, 'wt', encoding='utf-8', newline='')
+    raise ValueError(
+        f"Unsupported compression '{compression}'. "
+        f"Expected one of: {', '.join(COMPRESSION_SUFFIXES)}")
+
+
+def _json_value(value):
+    """Converts a value to a JSON-serializable Python value"""
+    if isinstance(value, (np.generic, pd.Timestamp, pd.Period)):
+        value = value.item() if isinstance(value, np.generic) else str(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _slugify(title):
+    """Returns a file name friendly version of a section title"""
+    title = re.sub(r'^\d+(\.\d+)*\.?\s*', '', title.strip())
+    return re.sub(r'[^a-z0-9]+', '_', title.lower()).strip('_') or 'section'
+
+
+class ReportWriter:
+    """
+    Streams a report to text, JSON Lines and per-section CSV outputs.
+
+    The text output receives every line, while the machine-readable outputs
+    only receive the data passed to rows and table. Use the writer as a
+    context manager, so that all outputs are closed.
+
+    Parameters:
+    -----------
+    output_path : str
+        Path of the text report. The JSON Lines file is saved next to it
+        with the '.jsonl' extension, and the CSV files to a '_sections'
+        directory next to it. Compressed outputs get the suffix of their
+        compression.
+    formats : sequence of str, optional
+        Outputs to write, any of REPORT_FORMATS, default is ('text',)
+    compression : str, optional
+        'gzip' or 'zstd'. If not specified, the outputs are not compressed.
+    """
+
+    def __init__(self, output_path, formats=('text',), compression=None):
+        unknown = [name for name in formats if name not in REPORT_FORMATS]
+        if unknown or not formats:
+            raise ValueError(
+                f"Unsupported report formats: {', '.join(unknown) or 'none'}. "
+                f"Expected any of: {', '.join(REPORT_FORMATS)}")
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(
+                f"Unsupported compression '{compression}'. "
+                f"Expected one of: {', '.join(COMPRESSION_SUFFIXES)}")
+
+        self.formats = tuple(formats)
+        self.compression = compression
+        self.paths = {}
+        self._suffix = COMPRESSION_SUFFIXES.get(compression, '')
+        self._base = os.path.splitext(output_path)[0]
+        self._section = None
+        self._section_count = 0
+        self._csv = None
+        self._text = None
+        self._json = None
+        self._first_line = True
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        if 'text' in self.formats:
+            self.paths['text'] = output_path + self._suffix
+            self._text = _open_output(self.paths['text'], compression)
+        if 'json' in self.formats:
+            self.paths['json'] = f'{self._base}.jsonl{self._suffix}'
+            self._json = _open_output(self.paths['json'], compression)
+        if 'csv' in self.formats:
+            self.paths['csv'] = f'{self._base}_sections'
+            os.makedirs(self.paths['csv'], exist_ok=True)
+
+    @property
+    def path(self):
+        """Path of the main output: the text report, if it is written"""
+        return self.paths[self.formats[0]]
+
+    def text(self, line=''):
+        """
+        Writes a line to the text report only.
+
+        Parameters:
+        -----------
+        line : str, optional
+            Line of text, default is an empty line
+        """
+        if self._text is None:
+            return
+        if not self._first_line:
+            self._text.write('\n')
+        self._text.write(line)
+        self._first_line = False
+
+    def section(self, title, rule='-' * 40):
+        """
+        Starts a new section of the report.
+
+        Parameters:
+        -----------
+        title : str
+            Title of the section, as written to the text report
+        rule : str, optional
+            Line written below the title in the text report. If None, no
+            line is written.
+        """
+        self._close_csv()
+        self._section_count += 1
+        self._section = title.strip()
+        self.text(title)
+        if rule:
+            self.text(rule)
+
+    def rows(self, records, line_format=None):
+        """
+        Writes rows of data to all outputs.
+
+        Parameters:
+        -----------
+        records : iterable of dict
+            Rows with the same keys
+        line_format : callable, optional
+            Function that returns the text line of a row. If not specified,
+            the rows are not written to the text report.
+        """
+        for record in records:
+            if line_format is not None:
+                self.text(line_format(record))
+            self._write_json({'section': self._section,
+                              'row': {key: _json_value(value)
+                                      for key, value in record.items()}})
+            if 'csv' in self.formats:
+                csv.writer(self._section_csv(record.keys()),
+                           lineterminator='\n').writerow(record.values())
+
+    def table(self, df, block_rows=TABLE_BLOCK_ROWS):
+        """
+        Writes a table to all outputs, in blocks of rows.
+
+        Tables up to block_rows rows are rendered exactly like
+        DataFrame.to_string(); larger tables are rendered block by block,
+        with the header only above the first block.
+
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            Table to write. The index is written as the first column.
+        block_rows : int, optional
+            Number of rows rendered and written at a time
+        """
+        for start in range(0, max(len(df), 1), block_rows):
+            block = df.iloc[start:start + block_rows]
+            if self._text is not None:
+                rendered = block.to_string(header=start == 0)
+                for line in rendered.split('\n'):
+                    self.text(line)
+
+            records = block.reset_index()
+            if self._json is not None:
+                for record in records.to_dict('records'):
+                    self._write_json({'section': self._section,
+                                      'row': {str(key): _json_value(value)
+                                              for key, value in record.items()}})
+            if 'csv' in self.formats:
+                records.to_csv(self._section_csv(records.columns), index=False,
+                               header=False, lineterminator='\n')
+
+    def _write_json(self, record):
+        """Writes a record to the JSON Lines output"""
+        if self._json is not None:
+            self._json.write(json.dumps(record))
+            self._json.write('\n')
+
+    def _section_csv(self, columns):
+        """Returns the CSV file of the current section, opening it if needed"""
+        if self._csv is None:
+            name = f'{self._section_count:02d}_{_slugify(self._section or "summary")}'
+            self._csv = _open_output(
+                os.path.join(self.paths['csv'], f'{name}.csv{self._suffix}'),
+                self.compression)
+            csv.writer(self._csv, lineterminator='\n').writerow(
+                [str(column) for column in columns])
+        return self._csv
+
+    def _close_csv(self):
+        """Closes the CSV file of the current section"""
+        if self._csv is not None:
+            self._csv.close()
+            self._csv = None
+
+    def close(self):
+        """Closes all outputs"""
+        self._close_csv()
+        for output in (self._text, self._json):
+            if output is not None:
+                output.close()
+        self._text = None
+        self._json = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
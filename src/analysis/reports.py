@@ -0,0 +1,63 @@
+"""
+Module for generating all analysis reports of PS4 game sales
+
+This module generates the regional and the yearly reports together, either
+one after another or concurrently in worker processes that share one copy
+of the sales data.
+"""
+
+from src.analysis.quantiles import DEFAULT_RELATIVE_ACCURACY
+from src.analysis.regional_analysis import generate_regional_report
+from src.analysis.year_analysis import generate_year_analysis_report
+from src.data.shared_frame import map_shared
+
+
+def generate_reports(df, workers=None, regional_path=None, year_path=None,
+                     approximate=False, formats=('text',), compression=None):
+    """
+    Generates the regional and the yearly analysis reports.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with processed game sales data
+    workers : int, optional
+        Number of worker processes generating reports concurrently. The
+        workers attach to one copy of the data in shared memory. If None or
+        1, the reports are generated one after another.
+    regional_path : str, optional
+        Path to save the regional report. If not specified, the default path
+        is used.
+    year_path : str, optional
+        Path to save the yearly report. If not specified, the default path
+        is used.
+    approximate : bool, optional
+        Whether to report approximate medians from quantile sketches,
+        default is False
+    formats : sequence of str, optional
+        Outputs of every report, any of 'text', 'json' and 'csv', default
+        is ('text',)
+    compression : str, optional
+        'gzip' or 'zstd' to compress the outputs, default is no compression
+
+    Returns:
+    --------
+    dict
+        Paths where the regional ('regional') and yearly ('year') reports
+        were saved
+    """
+    tasks = [
+        (generate_regional_report,
+         (regional_path, approximate, DEFAULT_RELATIVE_ACCURACY, None,
+          formats, compression)),
+        (generate_year_analysis_report,
+         (year_path, None, approximate, DEFAULT_RELATIVE_ACCURACY, None,
+          formats, compression))
+    ]
+
+    if workers is None or workers <= 1:
+        paths = [func(df, *args) for func, args in tasks]
+    else:
+        paths = map_shared(tasks, df, workers)
+
+    return dict(zip(['regional', 'year'], paths))
@@ -0,0 +1,171 @@
+"""
+Module for top-N selection in PS4 game sales data
+
+This module selects the largest values of grouped results, publishers and
+individual games without sorting all of them. The k largest values are
+found with a partial sort (numpy.argpartition) in linear time and only
+those k values are sorted, so a top-N query over n values costs
+O(n + k log k) instead of O(n log n). Ties are broken by position, so the
+result is the same as that of a stable descending sort followed by head(k).
+"""
+
+import pandas as pd
+import numpy as np
+
+from src.data.data_processing import widen_sales
+
+
+def top_k_positions(values, k):
+    """
+    Returns the positions of the k largest values.
+
+    Parameters:
+    -----------
+    values : array-like
+        One-dimensional numeric values. NaN values are never selected.
+    k : int or None
+        Number of positions. If None, all positions of non-NaN values are
+        returned.
+
+    Returns:
+    --------
+    numpy.ndarray
+        Positions in descending order of value, equal values in the order
+        of their positions
+    """
+    values = np.asarray(values, dtype='float64')
+    positions = np.flatnonzero(~np.isnan(values))
+    if k is not None and k < len(positions):
+        if k <= 0:
+            return positions[:0]
+        candidates = values[positions]
+
+        # The k-th largest value, found without sorting the others
+        threshold = np.partition(candidates, len(candidates) - k)[
+            len(candidates) - k]
+        above = positions[candidates > threshold]
+        ties = positions[candidates == threshold][:k - len(above)]
+        positions = np.concatenate([above, ties])
+
+    # Sort the selected positions by descending value, then by position
+    order = np.lexsort((positions, -values[positions]))
+    return positions[order]
+
+
+def top_k(series, k):
+    """
+    Returns the k largest values of a Series.
+
+    Equivalent to series.sort_values(ascending=False, kind='stable').head(k)
+    without NaN values.
+
+    Parameters:
+    -----------
+    series : pandas.Series
+        Values to select from, e.g. a grouped mean
+    k : int or None
+        Number of values. If None, all values are returned in descending
+        order.
+
+    Returns:
+    --------
+    pandas.Series
+        The largest values in descending order
+    """
+    return series.iloc[top_k_positions(series.to_numpy(), k)]
+
+
+def grouped_top_k(values, groups, k):
+    """
+    Returns the positions of the k largest values of every group.
+
+    The values are bucketed by group with a single stable sort of the group
+    codes, and the k largest values of every bucket are then selected with
+    top_k_positions.
+
+    Parameters:
+    -----------
+    values : array-like
+        One-dimensional numeric values
+    groups : array-like
+        Group of every value, with the same length as values
+    k : int or None
+        Number of positions per group. If None, all positions are returned.
+
+    Returns:
+    --------
+    dict
+        Positions of the largest values of every group, in descending order
+        of value, by group label in sorted order
+    """
+    values = np.asarray(values, dtype='float64')
+    codes, labels = pd.factorize(np.asarray(groups), sort=True)
+
+    # Bucket the positions by group
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(
+        codes[codes >= 0], minlength=len(labels)))]) + np.sum(codes < 0)
+
+    result = {}
+    for code, label in enumerate(labels):
+        bucket = order[bounds[code]:bounds[code + 1]]
+        result[label] = bucket[top_k_positions(values[bucket], k)]
+    return result
+
+
+def top_groups(df, by, column, k, stat='sum'):
+    """
+    Returns the groups with the largest aggregated values.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with game sales data
+    by : str
+        Column to group by, e.g. 'publisher' or 'genre'
+    column : str
+        Column to aggregate, e.g. a sales region
+    k : int or None
+        Number of groups
+    stat : str, optional
+        Aggregation of each group, e.g. 'sum', 'mean' or 'size', default is
+        'sum'
+
+    Returns:
+    --------
+    pandas.Series
+        Aggregated values of the top groups in descending order
+    """
+    if stat == 'size':
+        aggregated = df.groupby(by, observed=True).size()
+    else:
+        aggregated = widen_sales(df[column]).groupby(
+            df[by], observed=True).agg(stat)
+    return top_k(aggregated, k)
+
+
+def top_rows(df, column, k, columns=None):
+    """
+    Returns the rows with the largest values of a column, e.g. the
+    best-selling games.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with game sales data
+    column : str
+        Column to rank the rows by
+    k : int or None
+        Number of rows
+    columns : list of str, optional
+        Columns of the result. If not specified, all columns are returned.
+
+    Returns:
+    --------
+    pandas.DataFrame
+        The top rows in descending order of the column
+    """
+    positions = top_k_positions(df[column].to_numpy(), k)
+    if columns is not None:
+        df = df[columns]
+    return df.iloc[positions]
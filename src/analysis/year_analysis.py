@@ -9,8 +9,32 @@ import os
 import pandas as pd
 import numpy as np
 
+from src.analysis.cube import as_cube
+from src.analysis.topk import grouped_top_k, top_groups, top_rows
+from src.analysis.report_writer import ReportWriter
+from src.data.data_processing import (
+    load_processed_data, get_default_partitioned_path, widen_sales
+)
+from src.analysis.quantiles import (
+    DEFAULT_RELATIVE_ACCURACY, build_quantile_sketches
+)
+
+
+# Time grains of the top genre analysis and their pandas period frequencies
+TIME_GRAINS = {'year': 'Y', 'quarter': 'Q', 'month': 'M'}
+
+
+def _global_summary(cube, *by):
+    """Rolls the global sales of the cube up to the given dimensions"""
+    cube = cube.slice(region='global').rollup(*by)
+    return pd.DataFrame({
+        'count': cube.to_series('count'),
+        'sum': cube.to_series('sum'),
+        'mean': cube.to_series('mean')
+    })
+
 
-def analyze_yearly_trends(df):
+def analyze_yearly_trends(df, aggregates=None):
     """
     Analyzes sales trends by year.
 
@@ -18,20 +42,25 @@ def analyze_yearly_trends(df):
     -----------
     df : pandas.DataFrame
         DataFrame with game sales data
+    aggregates : pandas.DataFrame or SalesCube, optional
+        Precomputed (possibly merged) result of build_aggregates, or the cube
+        built from it. If specified, df is not used and can be None.
 
     Returns:
     --------
     pandas.DataFrame
         DataFrame with sales indicators by year
     """
-    # Group data by release year
-    yearly_data = df.groupby('year').agg({
-        'global': ['mean', 'sum', 'count']
+    cube = as_cube(df if aggregates is None else aggregates)
+
+    # Roll the cube up to release years
+    yearly_summary = _global_summary(cube, 'year')
+    yearly_data = pd.DataFrame({
+        'average_sales': yearly_summary['mean'],
+        'total_sales': yearly_summary['sum'],
+        'num_games': yearly_summary['count']
     })
 
-    # Rename columns
-    yearly_data.columns = ['average_sales', 'total_sales', 'num_games']
-
     # Sort by release year (excluding 0 if present)
     if 0 in yearly_data.index:
         yearly_data = yearly_data.drop(0)
@@ -46,52 +75,83 @@ def analyze_yearly_trends(df):
     return yearly_data
 
 
-def analyze_top_genres_by_year(df, top_n=3):
+def _top_genres_by_period(means, periods, genres, top_n):
+    """Groups the genre means by period and selects the top genres of each"""
+    return {period: [(genres[position], means[position])
+                     for position in positions]
+            for period, positions in grouped_top_k(means, periods, top_n).items()
+            if len(positions)}
+
+
+def analyze_top_genres_by_year(df, top_n=3, aggregates=None, grain='year'):
     """
-    Analyzes the top genres by sales for each year.
+    Analyzes the top genres by sales for each year, quarter or month.
+
+    The average sales of every period and genre are computed in a single
+    pass, grouped by period, and the top genres of every period are then
+    selected with a partial sort.
 
     Parameters:
     -----------
     df : pandas.DataFrame
         DataFrame with game sales data
     top_n : int, optional
-        Number of top genres for each year, default is 3
+        Number of top genres for each period, default is 3
+    aggregates : pandas.DataFrame or SalesCube, optional
+        Precomputed (possibly merged) result of build_aggregates, or the cube
+        built from it. If specified, df is not used and can be None. Only
+        used for the 'year' grain.
+    grain : str, optional
+        Time grain of the periods, any of TIME_GRAINS, default is 'year'.
+        The 'quarter' and 'month' grains need a 'release_date' column in df.
 
     Returns:
     --------
     dict
-        Dictionary with top genres by average sales for each year
+        Dictionary with (genre, average sales) tuples of the top genres for
+        each period, keyed by release year, or by pandas.Period for finer
+        grains
     """
-    # Filter out games with unknown release year
-    df_valid_years = df[df['year'] > 0]
-
-    # Get unique years
-    years = sorted(df_valid_years['year'].unique())
-
-    # Create a dictionary to store results
-    top_genres_by_year = {}
-
-    # Analyze top genres for each year
-    for year in years:
-        # Get data only for the current year
-        df_year = df_valid_years[df_valid_years['year'] == year]
-
-        # Group by genre and calculate average sales
-        genre_sales = df_year.groupby(
-            'genre')['global'].mean().sort_values(ascending=False)
-
-        # Get top genres
-        top_genres = genre_sales.head(top_n).reset_index()
-        top_genres.columns = ['genre', 'avg_sales']
-
-        # Convert to list of tuples
-        top_genres_by_year[year] = list(
-            top_genres.itertuples(index=False, name=None))
-
-    return top_genres_by_year
-
-
-def calculate_year_to_year_change(df):
+    if grain not in TIME_GRAINS:
+        raise ValueError(
+            f"Unknown time grain '{grain}'. "
+            f"Expected any of: {', '.join(TIME_GRAINS)}")
+
+    if grain == 'year' and (aggregates is not None or
+                            'release_date' not in df.columns):
+        # Average sales by year and genre, rolled up from the cube; ties
+        # keep the alphabetical order of the genres
+        cube = as_cube(df if aggregates is None else aggregates).slice(
+            region='global').rollup('year', 'genre')
+        years = np.repeat(cube.labels['year'].to_numpy(),
+                          len(cube.labels['genre']))
+        genres = np.tile(cube.labels['genre'].to_numpy(),
+                         len(cube.labels['year']))
+        means = cube.stat('mean').ravel()
+
+        # Exclude games with unknown release year
+        known = years > 0
+        return _top_genres_by_period(
+            means[known], years[known], genres[known], top_n)
+
+    if 'release_date' not in df.columns:
+        raise ValueError(
+            f"The '{grain}' grain needs a 'release_date' column")
+
+    # Average sales by period and genre, excluding unknown release dates
+    release_dates = pd.to_datetime(df['release_date'])
+    periods = release_dates.dt.to_period(TIME_GRAINS[grain])
+    if grain == 'year':
+        periods = periods.dt.year
+    means = widen_sales(df['global']).groupby(
+        [periods, df['genre']], observed=True).mean().dropna()
+
+    return _top_genres_by_period(
+        means.to_numpy(), means.index.get_level_values(0).to_numpy(),
+        means.index.get_level_values(1).to_numpy(), top_n)
+
+
+def calculate_year_to_year_change(df, aggregates=None):
     """
     Calculates year-to-year changes in sales.
 
@@ -99,6 +159,9 @@ def calculate_year_to_year_change(df):
     -----------
     df : pandas.DataFrame
         DataFrame with game sales data
+    aggregates : pandas.DataFrame or SalesCube, optional
+        Precomputed (possibly merged) result of build_aggregates, or the cube
+        built from it. If specified, df is not used and can be None.
 
     Returns:
     --------
@@ -106,7 +169,7 @@ def calculate_year_to_year_change(df):
         DataFrame with percentage changes by year
     """
     # Analyze yearly trends
-    yearly_trends = analyze_yearly_trends(df)
+    yearly_trends = analyze_yearly_trends(df, aggregates)
 
     # Calculate percentage changes
     changes = pd.DataFrame(index=yearly_trends.index)
@@ -125,37 +188,79 @@ def calculate_year_to_year_change(df):
     return changes
 
 
-def analyze_lifecycle_effect(df):
+def analyze_lifecycle_effect(df, aggregates=None, approximate=False,
+                             relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                             quantile_sketches=None):
     """
     Analyzes the impact of the console lifecycle on sales.
 
     Parameters:
     -----------
     df : pandas.DataFrame
-        DataFrame with game sales data
+        DataFrame with game sales data. Only needed for the median sales,
+        which cannot be derived from the aggregates; if None and no
+        quantile sketches are given, the median is reported as NaN.
+    aggregates : pandas.DataFrame or SalesCube, optional
+        Precomputed (possibly merged) result of build_aggregates, or the cube
+        built from it
+    approximate : bool, optional
+        Whether to compute medians from quantile sketches of df instead of
+        sorting the sales column, default is False
+    relative_accuracy : float, optional
+        Relative error bound of approximate medians, default is 0.01
+    quantile_sketches : dict, optional
+        Precomputed (possibly merged) sketches by lifecycle phase, as
+        returned by build_quantile_sketches(df, by='lifecycle_phase').
+        If specified, approximate medians are taken from them.
 
     Returns:
     --------
     dict
         Dictionary with metrics by lifecycle phase
     """
-    # Group data by lifecycle phase
-    lifecycle_data = df.groupby('lifecycle_phase').agg({
-        'global': ['mean', 'median', 'sum', 'count'],
-        'year': pd.Series.nunique
+    cube = as_cube(df if aggregates is None else aggregates)
+
+    # Roll the cube up to lifecycle phases
+    phase_summary = _global_summary(cube, 'lifecycle_phase')
+    phase_summary.index = phase_summary.index.astype(str)
+
+    # Count the release years of each phase
+    phase_year_counts = cube.slice(region='global').rollup(
+        'lifecycle_phase', 'year').stat('count')
+    num_years = pd.Series((phase_year_counts > 0).sum(axis=1),
+                          index=cube.labels['lifecycle_phase'].astype(str))
+
+    # Medians come from quantile sketches or from the rows themselves
+    if quantile_sketches is None and approximate and df is not None:
+        quantile_sketches = build_quantile_sketches(
+            df, 'lifecycle_phase', ['global'], relative_accuracy)
+    if quantile_sketches is not None:
+        median_sales = pd.Series({
+            str(phase): sketches['global'].quantile(0.5)
+            for phase, sketches in quantile_sketches.items()}, dtype='float64')
+    elif df is not None:
+        median_sales = widen_sales(df['global']).groupby(
+            df['lifecycle_phase'], observed=True).median()
+        median_sales.index = median_sales.index.astype(str)
+    else:
+        median_sales = pd.Series(np.nan, index=phase_summary.index)
+
+    lifecycle_data = pd.DataFrame({
+        'avg_sales': phase_summary['mean'],
+        'median_sales': median_sales,
+        'total_sales': phase_summary['sum'],
+        'num_games': phase_summary['count'],
+        'num_years': num_years
     })
 
-    # Rename columns
-    lifecycle_data.columns = [
-        'avg_sales', 'median_sales', 'total_sales', 'num_games', 'num_years'
-    ]
-
     # Remove the 'Unknown' phase if it exists
     if 'Unknown' in lifecycle_data.index:
         lifecycle_data = lifecycle_data.drop('Unknown')
 
-    # Sort phases in the correct order
-    phase_order = ['Early', 'Middle', 'Late']
+    # Sort phases in the order of the cube (the order of the categories for
+    # custom lifecycle phases, or chronological)
+    phase_order = [str(phase) for phase in cube.labels['lifecycle_phase']
+                   if phase != 'Unknown']
     lifecycle_data = lifecycle_data.reindex(phase_order)
 
     # Calculate additional metrics
@@ -172,7 +277,7 @@ def analyze_lifecycle_effect(df):
     return result
 
 
-def calculate_correlation_games_vs_sales(df):
+def calculate_correlation_games_vs_sales(df, aggregates=None):
     """
     Calculates the correlation between the number of released games and average sales.
 
@@ -180,6 +285,9 @@ def calculate_correlation_games_vs_sales(df):
     -----------
     df : pandas.DataFrame
         DataFrame with game sales data
+    aggregates : pandas.DataFrame or SalesCube, optional
+        Precomputed (possibly merged) result of build_aggregates, or the cube
+        built from it. If specified, df is not used and can be None.
 
     Returns:
     --------
@@ -187,7 +295,7 @@ def calculate_correlation_games_vs_sales(df):
         Dictionary with correlation coefficients
     """
     # Analyze yearly trends
-    yearly_trends = analyze_yearly_trends(df)
+    yearly_trends = analyze_yearly_trends(df, aggregates)
 
     # Calculate correlation between number of games and average sales
     corr_num_vs_avg = yearly_trends['num_games'].corr(
@@ -203,21 +311,46 @@ def calculate_correlation_games_vs_sales(df):
     }
 
 
-def generate_year_analysis_report(df, output_path=None):
+def generate_year_analysis_report(df, output_path=None, aggregates=None,
+                                  approximate=False,
+                                  relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                                  quantile_sketches=None, formats=('text',),
+                                  compression=None):
     """
     Generates a report on the yearly sales analysis.
 
+    All sections are derived from the sales cube of the data, which is
+    built once if not provided.
+
     Parameters:
     -----------
     df : pandas.DataFrame
-        DataFrame with game sales data
+        DataFrame with game sales data. Can be None if aggregates are
+        specified, in which case median sales are taken from the quantile
+        sketches, or not reported without them.
     output_path : str, optional
         Path to save the report. If not specified, the default path is used.
+    aggregates : pandas.DataFrame or SalesCube, optional
+        Precomputed (possibly merged) result of build_aggregates, or the cube
+        built from it
+    approximate : bool, optional
+        Whether to report approximate medians from quantile sketches,
+        default is False
+    relative_accuracy : float, optional
+        Relative error bound of approximate medians, default is 0.01
+    quantile_sketches : dict, optional
+        Precomputed (possibly merged) quantile sketches by lifecycle phase
+    formats : sequence of str, optional
+        Outputs to write, any of 'text', 'json' (JSON Lines) and 'csv' (one
+        file per section), default is ('text',). See ReportWriter.
+    compression : str, optional
+        'gzip' or 'zstd' to compress the outputs, default is no compression
 
     Returns:
     --------
     str
-        Path where the report was saved
+        Path where the report was saved, with the suffix of the compression.
+        The text report if it is written, otherwise the first output.
     """
     if output_path is None:
         # Determine the path relative to the project root
@@ -230,118 +363,237 @@ def generate_year_analysis_report(df, output_path=None):
 
         output_path = os.path.join(output_dir, 'year_analysis_report.txt')
 
-    # Calculate data for the report
-    yearly_trends = analyze_yearly_trends(df)
-    top_genres_by_year = analyze_top_genres_by_year(df)
-    year_to_year_changes = calculate_year_to_year_change(df)
-    lifecycle_effect = analyze_lifecycle_effect(df)
-    correlation = calculate_correlation_games_vs_sales(df)
-
-    # Format the report text
-    report_text = []
-    report_text.append("REPORT ON YEARLY PS4 GAME SALES ANALYSIS")
-    report_text.append("=" * 80)
-    report_text.append("")
-
-    report_text.append("1. Sales Trends by Year")
-    report_text.append("-" * 40)
-    report_text.append(yearly_trends.to_string())
-    report_text.append("")
-
-    report_text.append("2. Year-to-Year Percentage Changes in Sales")
-    report_text.append("-" * 60)
-    report_text.append(year_to_year_changes.to_string())
-    report_text.append("")
-
-    report_text.append("3. Top Genres by Year")
-    report_text.append("-" * 30)
-    for year, genres in sorted(top_genres_by_year.items()):
-        report_text.append(f"\n{year}:")
-        for i, (genre, sales) in enumerate(genres, 1):
-            report_text.append(f"  {i}. {genre}: {sales:.4f} M")
-    report_text.append("")
-
-    report_text.append("4. Impact of Console Lifecycle on Sales")
-    report_text.append("-" * 60)
-
-    # Define column headers and their order
-    headers = [
-        'Phase', 'Avg Sales', 'Median Sales', 'Total Sales',
-        'Num Games', 'Num Years', 'Games/Year', 'Sales/Year'
-    ]
-    # Calculate max width for each column for alignment
-    max_widths = {header: len(header) for header in headers}
-    for phase, data in lifecycle_effect.items():
-        max_widths['Phase'] = max(max_widths['Phase'], len(phase))
-        max_widths['Avg Sales'] = max(
-            max_widths['Avg Sales'], len(f"{data['avg_sales']:.4f}"))
-        max_widths['Median Sales'] = max(
-            max_widths['Median Sales'], len(f"{data['median_sales']:.4f}"))
-        max_widths['Total Sales'] = max(
-            max_widths['Total Sales'], len(f"{data['total_sales']:.1f}"))
-        max_widths['Num Games'] = max(
-            max_widths['Num Games'], len(f"{data['num_games']}"))
-        max_widths['Num Years'] = max(
-            max_widths['Num Years'], len(f"{data['num_years']}"))
-        max_widths['Games/Year'] = max(max_widths['Games/Year'],
-                                       len(f"{data['games_per_year']:.1f}"))
-        max_widths['Sales/Year'] = max(max_widths['Sales/Year'],
-                                       len(f"{data['sales_per_year']:.1f}"))
-
-    header_line = "  ".join(
-        f"{header:<{max_widths[header]}}" for header in headers)
-    report_text.append(header_line)
-    report_text.append("-" * len(header_line))
-
-    # Print data for each phase with alignment
-    for phase, data in lifecycle_effect.items():
-        row_values = [
-            f"{phase:<{max_widths['Phase']}}",
-            f"{data['avg_sales']:.4f}".ljust(max_widths['Avg Sales']),
-            f"{data['median_sales']:.4f}".ljust(max_widths['Median Sales']),
-            f"{data['total_sales']:.1f}".ljust(max_widths['Total Sales']),
-            f"{data['num_games']}".ljust(max_widths['Num Games']),
-            f"{data['num_years']}".ljust(max_widths['Num Years']),
-            f"{data['games_per_year']:.1f}".ljust(max_widths['Games/Year']),
-            f"{data['sales_per_year']:.1f}".ljust(max_widths['Sales/Year'])
+    # Calculate data for the report from the sales cube
+    aggregates = as_cube(df if aggregates is None else aggregates)
+
+    # Write every section as soon as it is computed
+    with ReportWriter(output_path, formats, compression) as report:
+        report.text("REPORT ON YEARLY PS4 GAME SALES ANALYSIS")
+        report.text("=" * 80)
+        report.text("")
+
+        yearly_trends = analyze_yearly_trends(df, aggregates)
+        report.section("1. Sales Trends by Year", "-" * 40)
+        report.table(yearly_trends)
+        report.text("")
+
+        year_to_year_changes = calculate_year_to_year_change(df, aggregates)
+        report.section("2. Year-to-Year Percentage Changes in Sales", "-" * 60)
+        report.table(year_to_year_changes)
+        report.text("")
+
+        top_genres_by_year = analyze_top_genres_by_year(
+            df, aggregates=aggregates)
+        report.section("3. Top Genres by Year", "-" * 30)
+        for year, genres in sorted(top_genres_by_year.items()):
+            report.text(f"\n{year}:")
+            report.rows(({'year': year, 'rank': i, 'genre': genre,
+                          'avg_sales': sales}
+                         for i, (genre, sales) in enumerate(genres, 1)),
+                        lambda row: f"  {row['rank']}. {row['genre']}: "
+                                    f"{row['avg_sales']:.4f} M")
+        report.text("")
+
+        lifecycle_effect = analyze_lifecycle_effect(
+            df, aggregates, approximate, relative_accuracy, quantile_sketches)
+        report.section("4. Impact of Console Lifecycle on Sales", "-" * 60)
+
+        # Define column headers and their order
+        headers = [
+            'Phase', 'Avg Sales', 'Median Sales', 'Total Sales',
+            'Num Games', 'Num Years', 'Games/Year', 'Sales/Year'
         ]
-        report_text.append("  ".join(row_values))
-    report_text.append("")
-
-    report_text.append("5. Correlation between Number of Games and Sales")
-    report_text.append("-" * 60)
-    report_text.append(
-        f"Correlation between num games and avg sales: {correlation['correlation_num_vs_avg_sales']:.4f}")
-    report_text.append(
-        f"Correlation between num games and total sales: {correlation['correlation_num_vs_total_sales']:.4f}")
-    report_text.append("")
-
-    report_text.append("6. Conclusions")
-    report_text.append("-" * 20)
-    report_text.append(
-        "1. The peak of average sales for PS4 games occurred in the middle of the console's lifecycle.")
-    report_text.append(
-        "2. The number of released games increases each year, but the average sales per game decrease.")
-    report_text.append(
-        "3. There is an inverse correlation between the number of released games and average sales, which may indicate market dilution.")
-    report_text.append(
-        "4. Genre preferences change over time, reflecting the evolution of player interests.")
-    report_text.append("")
-
-    # Save the report to a file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(report_text))
-
-    return output_path
+        # Calculate max width for each column for alignment
+        max_widths = {header: len(header) for header in headers}
+        for phase, data in lifecycle_effect.items():
+            max_widths['Phase'] = max(max_widths['Phase'], len(phase))
+            max_widths['Avg Sales'] = max(
+                max_widths['Avg Sales'], len(f"{data['avg_sales']:.4f}"))
+            max_widths['Median Sales'] = max(
+                max_widths['Median Sales'], len(f"{data['median_sales']:.4f}"))
+            max_widths['Total Sales'] = max(
+                max_widths['Total Sales'], len(f"{data['total_sales']:.1f}"))
+            max_widths['Num Games'] = max(
+                max_widths['Num Games'], len(f"{data['num_games']}"))
+            max_widths['Num Years'] = max(
+                max_widths['Num Years'], len(f"{data['num_years']}"))
+            max_widths['Games/Year'] = max(max_widths['Games/Year'],
+                                           len(f"{data['games_per_year']:.1f}"))
+            max_widths['Sales/Year'] = max(max_widths['Sales/Year'],
+                                           len(f"{data['sales_per_year']:.1f}"))
+
+        header_line = "  ".join(
+            f"{header:<{max_widths[header]}}" for header in headers)
+        report.text(header_line)
+        report.text("-" * len(header_line))
+
+        # Print data for each phase with alignment
+        def format_phase(row):
+            return "  ".join([
+                f"{row['phase']:<{max_widths['Phase']}}",
+                f"{row['avg_sales']:.4f}".ljust(max_widths['Avg Sales']),
+                f"{row['median_sales']:.4f}".ljust(max_widths['Median Sales']),
+                f"{row['total_sales']:.1f}".ljust(max_widths['Total Sales']),
+                f"{row['num_games']}".ljust(max_widths['Num Games']),
+                f"{row['num_years']}".ljust(max_widths['Num Years']),
+                f"{row['games_per_year']:.1f}".ljust(max_widths['Games/Year']),
+                f"{row['sales_per_year']:.1f}".ljust(max_widths['Sales/Year'])
+            ])
+
+        report.rows(({'phase': phase, **data}
+                     for phase, data in lifecycle_effect.items()),
+                    format_phase)
+        report.text("")
+
+        correlation = calculate_correlation_games_vs_sales(df, aggregates)
+        report.section("5. Correlation between Number of Games and Sales",
+                       "-" * 60)
+        report.rows([correlation], lambda row: "\n".join([
+            f"Correlation between num games and avg sales: {row['correlation_num_vs_avg_sales']:.4f}",
+            f"Correlation between num games and total sales: {row['correlation_num_vs_total_sales']:.4f}"
+        ]))
+        report.text("")
+
+        report.section("6. Conclusions", "-" * 20)
+        report.text(
+            "1. The peak of average sales for PS4 games occurred in the middle of the console's lifecycle.")
+        report.text(
+            "2. The number of released games increases each year, but the average sales per game decrease.")
+        report.text(
+            "3. There is an inverse correlation between the number of released games and average sales, which may indicate market dilution.")
+        report.text(
+            "4. Genre preferences change over time, reflecting the evolution of player interests.")
+        report.text("")
+
+    return report.path
+
+
+def analyze_single_year(year, file_path=None, top_n=3):
+    """
+    Analyzes the sales of a single release year.
+
+    Only the partitions of the year are read from the partitioned processed
+    data store, see save_processed_data.
+
+    Parameters:
+    -----------
+    year : int
+        Release year
+    file_path : str, optional
+        Path to the partitioned processed data. If not specified, the
+        default path is used.
+    top_n : int, optional
+        Number of top genres and games, default is 3
+
+    Returns:
+    --------
+    dict
+        Number of games ('num_games'), total, average and median global
+        sales ('total_sales', 'avg_sales', 'median_sales'), and the top
+        genres by average sales ('top_genres') and top games ('top_games')
+        as (name, sales) tuples
+    """
+    if file_path is None:
+        file_path = get_default_partitioned_path()
+
+    df = load_processed_data(file_path, columns=['game', 'genre', 'global'],
+                             filters={'year': year})
+    if len(df) == 0:
+        raise ValueError(f"No games released in {year}")
+    global_sales = widen_sales(df['global'])
+
+    return {
+        'num_games': len(df),
+        'total_sales': global_sales.sum(),
+        'avg_sales': global_sales.mean(),
+        'median_sales': global_sales.median(),
+        'top_genres': list(top_groups(
+            df, 'genre', 'global', top_n, 'mean').items()),
+        'top_games': list(top_rows(
+            df, 'global', top_n, ['game', 'global']).itertuples(
+                index=False, name=None))
+    }
+
+
+def generate_single_year_report(year, file_path=None, output_path=None,
+                                top_n=3, formats=('text',), compression=None):
+    """
+    Generates a report on the sales of a single release year.
+
+    Parameters:
+    -----------
+    year : int
+        Release year
+    file_path : str, optional
+        Path to the partitioned processed data, see analyze_single_year
+    output_path : str, optional
+        Path to save the report. If not specified, the default path is used.
+    top_n : int, optional
+        Number of top genres and games, default is 3
+    formats : sequence of str, optional
+        Outputs to write, see generate_year_analysis_report
+    compression : str, optional
+        'gzip' or 'zstd' to compress the outputs, default is no compression
+
+    Returns:
+    --------
+    str
+        Path where the report was saved
+    """
+    if output_path is None:
+        # Determine the path relative to the project root
+        base_dir = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        output_dir = os.path.join(base_dir, 'reports', 'output')
+
+        # Create the directory if it doesn't exist
+        os.makedirs(output_dir, exist_ok=True)
+
+        output_path = os.path.join(output_dir, f'year_{year}_report.txt')
+
+    summary = analyze_single_year(year, file_path, top_n)
+
+    with ReportWriter(output_path, formats, compression) as report:
+        report.text(f"REPORT ON PS4 GAME SALES RELEASED IN {year}")
+        report.text("=" * 80)
+        report.text("")
+        report.rows([{key: summary[key] for key in
+                      ['num_games', 'total_sales', 'avg_sales', 'median_sales']}],
+                    lambda row: "\n".join([
+                        f"Number of games: {row['num_games']}",
+                        f"Total sales: {row['total_sales']:.2f} M",
+                        f"Average sales: {row['avg_sales']:.4f} M",
+                        f"Median sales: {row['median_sales']:.4f} M"
+                    ]))
+        report.text("")
+
+        report.section(f"Top {top_n} Genres by Average Sales", "-" * 40)
+        report.rows(({'rank': i, 'genre': genre, 'avg_sales': sales}
+                     for i, (genre, sales) in enumerate(summary['top_genres'], 1)),
+                    lambda row: f"  {row['rank']}. {row['genre']}: "
+                                f"{row['avg_sales']:.4f} M")
+        report.text("")
+
+        report.section(f"Top {top_n} Games by Sales", "-" * 40)
+        report.rows(({'rank': i, 'name': game, 'global_sales': sales}
+                     for i, (game, sales) in enumerate(summary['top_games'], 1)),
+                    lambda row: f"  {row['rank']}. {row['name']}: "
+                                f"{row['global_sales']:.2f} M")
+        report.text("")
+
+    return report.path
 
 
 if __name__ == "__main__":
     # Demonstrate function usage
     from src.data.data_processing import load_data, preprocess_data
 
-    # Load and preprocess data
-    df_raw = load_data()
-    df = preprocess_data(df_raw)
+    # Load the processed data store, or preprocess the raw data if it is missing
+    try:
+        df = load_processed_data()
+    except FileNotFoundError:
+        df_raw = load_data(use_cache=True)
+        df = preprocess_data(df_raw)
 
     # Generate the yearly report
     report_path = generate_year_analysis_report(df)
@@ -0,0 +1,180 @@
+"""
+Column Cache Module for PS4 Sales Analysis
+
+This module converts a raw CSV file once into a binary columnar cache: one
+NumPy .npy file per column and a dictionary of the distinct values of every
+text column. The cache is memory-mapped when it is loaded, so the CSV text is
+not parsed again and only the pages that are actually used are read from
+disk. The cache is rebuilt when the size or modification time of the source
+file changes.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+# Name of the file describing the cached columns and their source
+MANIFEST_NAME = 'manifest.json'
+
+
+def get_default_column_cache_dir(file_path):
+    """
+    Returns the default cache directory of a CSV file.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path to the CSV file
+
+    Returns:
+    --------
+    str
+        Path to the cache directory
+    """
+    # Determine the path relative to the project root
+    base_dir = os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))
+    file_path = os.path.abspath(file_path)
+    path_digest = hashlib.sha256(file_path.encode('utf-8')).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(base_dir, 'data', 'cache', 'columns',
+                        f'{name}-{path_digest}')
+
+
+def _source_signature(file_path):
+    """Returns the size and modification time that identify the source file"""
+    file_stat = os.stat(file_path)
+    return {'size': file_stat.st_size, 'mtime_ns': file_stat.st_mtime_ns}
+
+
+def _save_column(values, cache_dir, position):
+    """Saves a column to .npy files and returns its manifest entry"""
+    entry = {'name': values.name, 'dtype': str(values.dtype)}
+    prefix = os.path.join(cache_dir, str(position))
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        entry['kind'] = 'categorical'
+        entry['categories'] = values.cat.categories.tolist()
+        entry['ordered'] = bool(values.cat.ordered)
+        np.save(f'{prefix}.npy', values.cat.codes.to_numpy())
+    elif isinstance(values.dtype, np.dtype) and values.dtype != object:
+        entry['kind'] = 'array'
+        np.save(f'{prefix}.npy', values.to_numpy())
+    elif isinstance(values.array, (pd.arrays.IntegerArray,
+                                   pd.arrays.FloatingArray,
+                                   pd.arrays.BooleanArray)):
+        # Nullable numbers are stored as values and a missing value mask
+        entry['kind'] = 'masked'
+        numpy_dtype = values.dtype.numpy_dtype
+        np.save(f'{prefix}.npy', values.to_numpy(numpy_dtype, na_value=0))
+        np.save(f'{prefix}.mask.npy', values.isna().to_numpy())
+    else:
+        # Text is stored as codes into a dictionary of its distinct values
+        entry['kind'] = 'dictionary'
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        entry['dictionary'] = list(uniques)
+        np.save(f'{prefix}.npy', codes)
+
+    return entry
+
+
+def _load_column(entry, cache_dir, position):
+    """Opens a cached column as a memory-mapped array"""
+    prefix = os.path.join(cache_dir, str(position))
+    # Copy-on-write mapping: pages are read lazily and writes stay private
+    array = np.load(f'{prefix}.npy', mmap_mode='c').view(np.ndarray)
+
+    if entry['kind'] == 'categorical':
+        dtype = pd.CategoricalDtype(entry['categories'], entry['ordered'])
+        return pd.Categorical.from_codes(array, dtype=dtype)
+    if entry['kind'] == 'masked':
+        mask = np.load(f'{prefix}.mask.npy', mmap_mode='c').view(np.ndarray)
+        array_type = pd.api.types.pandas_dtype(
+            entry['dtype']).construct_array_type()
+        return array_type(array, mask)
+    if entry['kind'] == 'dictionary':
+        uniques = pd.Series(entry['dictionary'], dtype=entry['dtype']).array
+        return pd.api.extensions.take(uniques, array, allow_fill=True)
+    return array
+
+
+def build_column_cache(df, file_path, cache_dir=None):
+    """
+    Writes the columns of a loaded CSV file to the column cache.
+
+    The cache is written to a temporary directory first and then moved into
+    place, so a cache that is being written is never read.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Data loaded from the CSV file
+    file_path : str
+        Path to the CSV file
+    cache_dir : str, optional
+        Cache directory. If not specified, the default directory is used.
+
+    Returns:
+    --------
+    str
+        Path to the cache directory
+    """
+    if cache_dir is None:
+        cache_dir = get_default_column_cache_dir(file_path)
+
+    temp_dir = f'{cache_dir}.tmp-{os.getpid()}'
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+
+    manifest = {
+        'source': os.path.abspath(file_path),
+        'signature': _source_signature(file_path),
+        'num_rows': len(df),
+        'columns': [_save_column(df[column], temp_dir, position)
+                    for position, column in enumerate(df.columns)]
+    }
+    with open(os.path.join(temp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(temp_dir, cache_dir)
+    return cache_dir
+
+
+def load_column_cache(file_path, cache_dir=None):
+    """
+    Opens the column cache of a CSV file.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path to the CSV file
+    cache_dir : str, optional
+        Cache directory. If not specified, the default directory is used.
+
+    Returns:
+    --------
+    pandas.DataFrame or None
+        DataFrame backed by memory-mapped columns, or None if there is no
+        cache or the source file has changed since it was built
+    """
+    if cache_dir is None:
+        cache_dir = get_default_column_cache_dir(file_path)
+
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest['signature'] != _source_signature(file_path):
+        return None
+
+    data = {entry['name']: _load_column(entry, cache_dir, position)
+            for position, entry in enumerate(manifest['columns'])}
+    return pd.DataFrame(data, index=pd.RangeIndex(manifest['num_rows']),
+                        copy=False)
@@ -9,8 +9,107 @@ import os
 import pandas as pd
 import numpy as np
 
+from src.data.validation import (
+    evaluate_rules, count_rejections, merge_rejection_counts, rejected_rows,
+    write_quarantine
+)
+
+
+# Regional and global sales columns (in millions of copies)
+SALES_COLUMNS = ['North America', 'europe', 'japan', 'Rest of World', 'global']
+
+# Largest accepted difference between the sum of the regional sales and the
+# global sales of a game (in millions of copies)
+REGIONAL_SUM_TOLERANCE = 0.1
+
+# Declared schema of the sales table, applied at parse time. Low-cardinality
+# text columns are loaded as categoricals, the release year as a nullable
+# small integer and the sales columns as single precision floats, which keeps
+# the resident frame compact and makes grouping by genre cheap. It also
+# guarantees that every chunk read in streaming mode has the same types.
+# Sums, means and medians are computed from widen_sales(), so they match
+# those of the data parsed in double precision.
+SALES_SCHEMA = {
+    'year': 'Int16',
+    'genre': 'category',
+    'publisher': 'category',
+    **{column: 'float32' for column in SALES_COLUMNS}
+}
+
+# Default console lifecycle phases of the PS4 as (phase, first year, last year)
+LIFECYCLE_PHASES = [
+    ('Early', 2013, 2015),
+    ('Middle', 2016, 2018),
+    ('Late', 2019, 2022)
+]
+
+# Phase assigned to years outside of all lifecycle phases
+UNKNOWN_PHASE = 'Unknown'
+
+# Default partition columns of the partitioned processed data store
+PARTITION_COLUMNS = ['year', 'genre']
+
+# Schema metadata key listing the partition columns of a partitioned store
+PARTITION_METADATA_KEY = b'partition_columns'
+
+# Supported formats of the processed data store by file extension
+PROCESSED_FORMATS = {
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.csv': 'csv'
+}
+
+
+def widen_sales(values):
+    """
+    Converts single precision sales to double precision for reductions.
+
+    A single precision value is not the decimal it was parsed from (19.39 is
+    stored as 19.3899994), and its sums and means differ from those of the
+    data parsed in double precision in the sixth decimal. Every value is
+    therefore converted to the double closest to its decimal, rounded to the
+    significant digits that single precision preserves. Other dtypes are
+    only cast to double precision.
+
+    Parameters:
+    -----------
+    values : pandas.DataFrame, pandas.Series or numpy.ndarray
+        Sales values
 
-def load_data(file_path=None):
+    Returns:
+    --------
+    pandas.DataFrame, pandas.Series or numpy.ndarray
+        Double precision sales of the same type and shape
+    """
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame({column: widen_sales(values[column])
+                             for column in values.columns},
+                            index=values.index, copy=False)
+    if isinstance(values, pd.Series):
+        return pd.Series(widen_sales(values.to_numpy()), index=values.index,
+                         name=values.name, copy=False)
+
+    values = np.asarray(values)
+    wide = values.astype(np.float64)
+    if values.dtype != np.float32:
+        return wide
+
+    # Scale every value so that its significant digits are an integer, round
+    # and divide by the exact power of ten
+    finite = np.isfinite(wide) & (wide != 0)
+    magnitude = np.floor(np.log10(np.abs(np.where(finite, wide, 1.0))))
+    digits = np.clip(np.finfo(np.float32).precision - 1 - magnitude, 0, 22)
+    scale = 10.0 ** digits
+    return np.where(finite, np.round(wide * scale) / scale, wide)
+
+
+def _is_chunk_iterator(data):
+    """Returns True if the data is an iterator of DataFrame chunks"""
+    return not isinstance(data, pd.DataFrame)
+
+
+def load_data(file_path=None, chunksize=None, use_cache=False):
     """
     Loads game sales data from a CSV file.
 
@@ -18,11 +117,21 @@ def load_data(file_path=None):
     -----------
     file_path : str, optional
         Path to the CSV file with data. If not specified, the default path is used.
+    chunksize : int, optional
+        Number of rows per chunk. If specified, the file is streamed and an
+        iterator of DataFrame chunks is returned instead of a single DataFrame,
+        so that memory usage is bounded by the chunk size, not the file size.
+    use_cache : bool, optional
+        Whether to load the data from a memory-mapped binary cache of the
+        columns, default is False. The cache is built on the first load and
+        rebuilt when the size or modification time of the file changes.
+        Ignored if chunksize is specified.
 
     Returns:
     --------
-    pandas.DataFrame
-        DataFrame with game sales data
+    pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with game sales data, or an iterator of chunks if
+        chunksize is specified
     """
     if file_path is None:
         # Determine the path relative to the project root
@@ -30,14 +139,37 @@ def load_data(file_path=None):
             os.path.dirname(os.path.abspath(__file__))))
         file_path = os.path.join(base_dir, 'data', 'raw', 'ps4_sales.csv')
 
+    # Stream the file in chunks of a fixed number of rows
+    if chunksize is not None:
+        return _iter_csv_chunks(file_path, chunksize)
+
+    # Open the column cache of the file, if it is up to date
+    if use_cache:
+        from src.data.column_cache import load_column_cache, build_column_cache
+
+        df = load_column_cache(file_path)
+        if df is not None:
+            return df
+
     # Load data from the CSV file
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(file_path, dtype=SALES_SCHEMA)
+
+    if use_cache:
+        build_column_cache(df, file_path)
     return df
 
 
-def clean_data(df):
+def _iter_csv_chunks(file_path, chunksize):
+    """Yields typed DataFrame chunks of the CSV file"""
+    with pd.read_csv(file_path, chunksize=chunksize,
+                     dtype=SALES_SCHEMA) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def validate_data(df):
     """
-    Cleans the data by removing missing values and incorrect entries.
+    Evaluates the cleaning rules for every row in one vectorized pass.
 
     Parameters:
     -----------
@@ -46,34 +178,71 @@ def clean_data(df):
 
     Returns:
     --------
-    pandas.DataFrame
-        DataFrame with cleaned data
+    tuple
+        Bitmask of the violated rules of every row (see
+        src.data.validation.VALIDATION_RULES) and the sum of the regional
+        sales of every row
     """
-    # Create a copy of the dataframe
-    df_cleaned = df.copy()
-
-    # Check for missing values
-    if df_cleaned.isnull().sum().sum() > 0:
-        # Remove rows with missing values
-        df_cleaned = df_cleaned.dropna()
-
-    # Check for rows with zero or negative sales
-    numeric_columns = ['North America', 'europe',
-                       'japan', 'Rest of World', 'global']
-    mask = (df_cleaned[numeric_columns] >= 0).all(axis=1)
-    df_cleaned = df_cleaned[mask]
-
-    # Check that the sum of regional sales equals global sales (with tolerance)
-    df_cleaned['sum_regions'] = df_cleaned['North America'] + \
-        df_cleaned['europe'] + df_cleaned['japan'] + \
-        df_cleaned['Rest of World']
-    mask = np.isclose(df_cleaned['sum_regions'],
-                      df_cleaned['global'], atol=0.1)
-    df_cleaned = df_cleaned[mask]
-
-    # Remove the temporary column
-    df_cleaned = df_cleaned.drop('sum_regions', axis=1)
+    return evaluate_rules(df, SALES_COLUMNS[:-1], SALES_COLUMNS[-1],
+                          REGIONAL_SUM_TOLERANCE)
+
 
+def _record_rejections(df, flags, quarantine_path=None, rejection_counts=None,
+                       append=False):
+    """Adds the rejections to the running counts and the quarantine file"""
+    if rejection_counts is not None:
+        merge_rejection_counts(rejection_counts, count_rejections(flags))
+    if quarantine_path is not None:
+        write_quarantine(rejected_rows(df, flags), quarantine_path, append)
+
+
+def _iter_validated_chunks(func, chunks, quarantine_path, rejection_counts,
+                           **kwargs):
+    """Applies a cleaning function to chunks, appending to the quarantine"""
+    for position, chunk in enumerate(chunks):
+        result, flags = func(chunk, **kwargs)
+        _record_rejections(chunk, flags, quarantine_path, rejection_counts,
+                           append=position > 0)
+        yield result
+
+
+def _clean(df):
+    """Returns the valid rows and the bitmask of the violated rules"""
+    flags, _ = validate_data(df)
+    return df[flags == 0], flags
+
+
+def clean_data(df, quarantine_path=None, rejection_counts=None):
+    """
+    Cleans the data by removing missing values and incorrect entries.
+
+    Rows with missing values, with negative sales, or whose regional sales
+    differ from the global sales by more than REGIONAL_SUM_TOLERANCE are
+    removed. All rules are evaluated in one pass, see validate_data.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with raw data, or an iterator of chunks from load_data
+    quarantine_path : str, optional
+        Path of a CSV file to save the removed rows to, with the names of
+        the rules they violate. If not specified, the rows are discarded.
+    rejection_counts : dict, optional
+        Running counts of the removed rows by rule, updated in place (see
+        src.data.validation.count_rejections)
+
+    Returns:
+    --------
+    pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with cleaned data, or an iterator of cleaned chunks
+    """
+    # Clean chunks lazily, one at a time
+    if _is_chunk_iterator(df):
+        return _iter_validated_chunks(_clean, df, quarantine_path,
+                                      rejection_counts)
+
+    df_cleaned, flags = _clean(df)
+    _record_rejections(df, flags, quarantine_path, rejection_counts)
     return df_cleaned
 
 
@@ -106,7 +275,7 @@ def get_summary_stats(df):
     num_publishers = df['publisher'].nunique()
 
     # Total global sales
-    total_global_sales = df['global'].sum()
+    total_global_sales = widen_sales(df['global']).sum()
 
     # Return statistics as a dictionary
     stats = {
@@ -120,20 +289,63 @@ def get_summary_stats(df):
     return stats
 
 
-def preprocess_data(df):
+def assign_lifecycle_phases(years, lifecycle_phases=None):
+    """
+    Maps release years to console lifecycle phases.
+
+    Parameters:
+    -----------
+    years : array-like of int
+        Release years
+    lifecycle_phases : list of tuple, optional
+        Phases as (phase, first year, last year) tuples in chronological
+        order. If not specified, the PS4 phases in LIFECYCLE_PHASES are used.
+        If the year ranges overlap, the first matching phase is assigned.
+
+    Returns:
+    --------
+    pandas.Categorical
+        Lifecycle phase of each year, with the phases followed by
+        UNKNOWN_PHASE as categories
+    """
+    if lifecycle_phases is None:
+        lifecycle_phases = LIFECYCLE_PHASES
+
+    years = np.asarray(years)
+    categories = [phase for phase, _, _ in lifecycle_phases] + [UNKNOWN_PHASE]
+
+    # Years outside of all phases get the code of the unknown phase. Phases
+    # are applied in reverse order so that the first matching phase wins.
+    codes = np.full(len(years), len(lifecycle_phases), dtype=np.int8)
+    for code in range(len(lifecycle_phases) - 1, -1, -1):
+        _, first_year, last_year = lifecycle_phases[code]
+        codes[(years >= first_year) & (years <= last_year)] = code
+
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def preprocess_data(df, lifecycle_phases=None):
     """
     Preprocesses the data by adding useful columns and categorizing data.
 
     Parameters:
     -----------
-    df : pandas.DataFrame
-        DataFrame with cleaned data
+    df : pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with cleaned data, or an iterator of cleaned chunks
+    lifecycle_phases : list of tuple, optional
+        Console lifecycle phases as (phase, first year, last year) tuples,
+        e.g. for other console generations. If not specified, the PS4
+        phases in LIFECYCLE_PHASES are used.
 
     Returns:
     --------
-    pandas.DataFrame
-        DataFrame with preprocessed data
+    pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with preprocessed data, or an iterator of preprocessed chunks
     """
+    # Preprocess chunks lazily, one at a time
+    if _is_chunk_iterator(df):
+        return (preprocess_data(chunk, lifecycle_phases) for chunk in df)
+
     # Create a copy of the dataframe
     df_processed = df.copy()
 
@@ -141,19 +353,9 @@ def preprocess_data(df):
     df_processed['year'] = pd.to_numeric(df_processed['year'], errors='coerce')
     df_processed['year'] = df_processed['year'].fillna(0).astype(int)
 
-    # Add a column with the console lifecycle phase
-    def get_lifecycle_phase(year):
-        if year in [2013, 2014, 2015]:
-            return 'Early'
-        elif year in [2016, 2017, 2018]:
-            return 'Middle'
-        elif year in [2019, 2020, 2021, 2022]:
-            return 'Late'
-        else:
-            return 'Unknown'
-
-    df_processed['lifecycle_phase'] = df_processed['year'].apply(
-        get_lifecycle_phase)
+    # Add a categorical column with the console lifecycle phase
+    df_processed['lifecycle_phase'] = assign_lifecycle_phases(
+        df_processed['year'].to_numpy(), lifecycle_phases)
 
     # Add a column with the sum of regional sales
     df_processed['regional_sales_sum'] = df_processed['North America'] + \
@@ -168,43 +370,456 @@ def preprocess_data(df):
     return df_processed
 
 
-def save_processed_data(df, output_path=None):
+def _clean_and_preprocess(df, lifecycle_phases=None):
+    """Returns the preprocessed valid rows and the bitmask of violated rules"""
+    regions = SALES_COLUMNS[:-1]
+
+    # Evaluate all cleaning rules in one pass
+    flags, regional_sum = validate_data(df)
+
+    # Take the valid rows of every column once
+    positions = np.flatnonzero(flags == 0)
+    data = {}
+    for column in df.columns:
+        if isinstance(df[column].dtype, np.dtype):
+            data[column] = df[column].to_numpy()[positions]
+        else:
+            data[column] = df[column].array.take(positions)
+
+    # Convert year to integer type (handling potential NaNs)
+    years = pd.to_numeric(pd.Series(data['year']), errors='coerce')
+    data['year'] = years.fillna(0).astype(int).to_numpy()
+
+    # Add a categorical column with the console lifecycle phase
+    data['lifecycle_phase'] = assign_lifecycle_phases(
+        data['year'], lifecycle_phases)
+
+    # Reuse the regional sales sum of the tolerance check
+    data['regional_sales_sum'] = regional_sum[positions]
+
+    # Add the regional sales percentages, computed into one block
+    global_sales = data['global']
+    percents = np.empty((len(regions), len(positions)),
+                        dtype=np.result_type(global_sales, np.float32))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for row, region in enumerate(regions):
+            np.divide(data[region], global_sales, out=percents[row])
+        percents *= 100
+    for row, region in enumerate(regions):
+        data[f'{region}_percent'] = percents[row]
+
+    return pd.DataFrame(data, index=df.index[positions], copy=False), flags
+
+
+def clean_and_preprocess(df, lifecycle_phases=None, quarantine_path=None,
+                         rejection_counts=None):
     """
-    Saves the processed data to a CSV file.
+    Cleans and preprocesses the data in a single pass.
+
+    Equivalent to preprocess_data(clean_data(df)), without the intermediate
+    copies: all cleaning rules are evaluated into one bitmask, the regional
+    sales sum is computed once for both the tolerance check and the output,
+    every column is copied once when the valid rows are taken, and the
+    percentage columns are allocated as one block.
 
     Parameters:
     -----------
-    df : pandas.DataFrame
-        DataFrame with processed data
+    df : pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with raw data, or an iterator of chunks from load_data
+    lifecycle_phases : list of tuple, optional
+        Console lifecycle phases, see preprocess_data
+    quarantine_path : str, optional
+        Path of a CSV file to save the removed rows to, see clean_data
+    rejection_counts : dict, optional
+        Running counts of the removed rows by rule, see clean_data
+
+    Returns:
+    --------
+    pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with preprocessed data, or an iterator of preprocessed chunks
+    """
+    # Process chunks lazily, one at a time
+    if _is_chunk_iterator(df):
+        return _iter_validated_chunks(
+            _clean_and_preprocess, df, quarantine_path, rejection_counts,
+            lifecycle_phases=lifecycle_phases)
+
+    df_processed, flags = _clean_and_preprocess(df, lifecycle_phases)
+    _record_rejections(df, flags, quarantine_path, rejection_counts)
+    return df_processed
+
+
+def _default_processed_path(file_format='parquet'):
+    """Returns the default path of the processed data store"""
+    # Determine the path relative to the project root
+    base_dir = os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))
+    output_dir = os.path.join(base_dir, 'data', 'processed')
+    return os.path.join(output_dir, f'ps4_sales_processed.{file_format}')
+
+
+def get_default_partitioned_path():
+    """
+    Returns the default directory of the partitioned processed data store.
+
+    Returns:
+    --------
+    str
+        Path to the dataset directory
+    """
+    # Determine the path relative to the project root
+    base_dir = os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_dir, 'data', 'processed', 'ps4_sales_partitioned')
+
+
+def _get_file_format(file_path, file_format=None):
+    """Determines the storage format from the argument or the file extension"""
+    # Directories are datasets of Parquet part files
+    if file_format is None and os.path.isdir(file_path):
+        file_format = 'parquet'
+    if file_format is None:
+        extension = os.path.splitext(file_path)[1].lower()
+        file_format = PROCESSED_FORMATS.get(extension)
+    if file_format not in PROCESSED_FORMATS.values():
+        raise ValueError(
+            f"Unsupported processed data format for '{file_path}'. "
+            f"Expected one of: {', '.join(sorted(set(PROCESSED_FORMATS.values())))}")
+    return file_format
+
+
+def _arrow_schema(table, file_format):
+    """
+    Returns the Arrow schema used to write a stream of chunks. Parquet keeps
+    categoricals with 32-bit dictionary indices, so that chunks with different
+    numbers of categories fit the same schema. Arrow IPC files allow only one
+    dictionary per column, so categoricals are stored as plain values there.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type):
+            if file_format == 'parquet':
+                field = field.with_type(
+                    pa.dictionary(pa.int32(), field.type.value_type))
+            else:
+                field = field.with_type(field.type.value_type)
+        fields.append(field)
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def _write_arrow_chunks(chunks, output_path, file_format):
+    """Writes DataFrame chunks to a Parquet or Arrow IPC file one at a time"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = _arrow_schema(table, file_format)
+                if file_format == 'parquet':
+                    writer = pq.ParquetWriter(output_path, schema)
+                else:
+                    writer = pa.ipc.new_file(output_path, schema)
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_partitioned(df, output_path, partition_cols):
+    """
+    Writes a Hive-partitioned Parquet dataset, e.g. year=2015/genre=Action/.
+
+    The dataset is written to a temporary directory first and then moved
+    into place, so stale partitions of a previous version never remain. The
+    full schema and the partition columns are saved to '_common_metadata',
+    so the partition columns are read back with their original types.
+    """
+    import shutil
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[PARTITION_METADATA_KEY] = ','.join(partition_cols).encode('utf-8')
+    schema = table.schema.with_metadata(metadata)
+
+    temp_dir = f'{output_path}.tmp-{os.getpid()}'
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    pq.write_to_dataset(table, temp_dir, partition_cols=partition_cols)
+    pq.write_metadata(schema, os.path.join(temp_dir, '_common_metadata'))
+
+    shutil.rmtree(output_path, ignore_errors=True)
+    os.replace(temp_dir, output_path)
+
+
+def _read_partitioned(dataset_dir, columns=None, filters=None):
+    """
+    Reads a dataset written by _write_partitioned. Only the partitions
+    matching the filters on the partition columns are opened. The partition
+    columns get back the types they were written with (by default those of
+    SALES_SCHEMA), and the rows the order of their 'id' column, as they are
+    returned from an unpartitioned file.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(os.path.join(dataset_dir, '_common_metadata'))
+    partition_cols = schema.metadata[PARTITION_METADATA_KEY].decode(
+        'utf-8').split(',')
+
+    # Partition values are parsed as the plain type of their column
+    partition_fields = []
+    for column in partition_cols:
+        field = schema.field(column)
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(field.type.value_type)
+        partition_fields.append(field)
+    partitioning = ds.partitioning(pa.schema(partition_fields), flavor='hive')
+    for field in partition_fields:
+        schema = schema.set(schema.get_field_index(field.name), field)
+
+    dataset = ds.dataset(dataset_dir, schema=schema, format='parquet',
+                         partitioning=partitioning)
+    expression = pq.filters_to_expression(filters) if filters else None
+
+    # The rows are read grouped by partition and sorted back by id, which is
+    # read for sorting even if it is not requested
+    read_columns = columns
+    if columns is not None and 'id' in schema.names and 'id' not in columns:
+        read_columns = list(columns) + ['id']
+    df = dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+    if 'id' in df.columns:
+        df = df.sort_values('id', kind='stable', ignore_index=True)
+    if read_columns is not columns:
+        df = df.drop(columns='id')
+
+    # Restore the types of the partition columns
+    numpy_types = {entry['name']: entry['numpy_type']
+                   for entry in schema.pandas_metadata['columns']}
+    pandas_types = {entry['name']: entry['pandas_type']
+                    for entry in schema.pandas_metadata['columns']}
+    for column in partition_cols:
+        if column not in df.columns:
+            continue
+        if pandas_types.get(column) == 'categorical':
+            dtype = 'category'
+        else:
+            dtype = numpy_types.get(column, SALES_SCHEMA.get(column))
+        if dtype is not None and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def _filter_expression(filters):
+    """Converts a dict of column values to a list of Parquet filters"""
+    if filters is None or isinstance(filters, list):
+        return filters
+
+    expression = []
+    for column, values in filters.items():
+        if isinstance(values, (list, tuple, set)):
+            expression.append((column, 'in', list(values)))
+        else:
+            expression.append((column, '==', values))
+    return expression
+
+
+def save_processed_data(df, output_path=None, file_format=None,
+                        partition_cols=None):
+    """
+    Saves the processed data to a columnar (Parquet or Arrow IPC) or CSV file,
+    or to a partitioned Parquet dataset.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame or iterator of pandas.DataFrame
+        DataFrame with processed data, or an iterator of processed chunks
+        that are appended to the file one at a time
     output_path : str, optional
         Path to save the file. If not specified, the default path is used.
+    file_format : str, optional
+        'parquet', 'feather' (Arrow IPC) or 'csv'. If not specified, the
+        format is determined by the file extension, and Parquet is used
+        for the default path.
+    partition_cols : list of str, optional
+        Columns to partition the data by, e.g. PARTITION_COLUMNS. If
+        specified, a Parquet dataset directory with one subdirectory per
+        value (e.g. year=2015/genre=Action/) is written to output_path,
+        default is get_default_partitioned_path(). Loading it with filters
+        on these columns only reads the matching partitions.
 
     Returns:
     --------
     str
         Path where the file was saved
     """
+    if partition_cols is not None:
+        if file_format not in (None, 'parquet') or _is_chunk_iterator(df):
+            raise ValueError(
+                "Partitioned data can only be saved from a DataFrame as Parquet")
+        if output_path is None:
+            output_path = get_default_partitioned_path()
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        _write_partitioned(df, output_path, list(partition_cols))
+        return output_path
+
     if output_path is None:
-        # Determine the path relative to the project root
-        base_dir = os.path.dirname(os.path.dirname(
-            os.path.dirname(os.path.abspath(__file__))))
-        output_dir = os.path.join(base_dir, 'data', 'processed')
+        output_path = _default_processed_path(file_format or 'parquet')
 
-        # Create the directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
+    file_format = _get_file_format(output_path, file_format)
 
-        output_path = os.path.join(output_dir, 'ps4_sales_processed.csv')
+    # Create the directory if it doesn't exist
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
 
-    # Save data to CSV file
-    df.to_csv(output_path, index=False)
+    if file_format == 'csv':
+        # Write chunks one after another, with the header only once
+        if _is_chunk_iterator(df):
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                for i, chunk in enumerate(df):
+                    chunk.to_csv(f, index=False, header=(i == 0))
+            return output_path
+
+        # Save data to CSV file
+        df.to_csv(output_path, index=False)
+        return output_path
+
+    # Write columnar binary data, chunk by chunk if streaming
+    if _is_chunk_iterator(df):
+        _write_arrow_chunks(df, output_path, file_format)
+    elif file_format == 'parquet':
+        df.to_parquet(output_path, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(output_path)
 
     return output_path
 
 
+def append_processed_data(df, dataset_dir, part_name=None):
+    """
+    Appends processed rows to a Parquet dataset directory.
+
+    The rows are written to a new part file, so the cost of an append
+    depends on the number of new rows, not on the size of the dataset.
+    Every part is written with the same Arrow schema, with 32-bit dictionary
+    indices for categorical columns whatever their number of categories, so
+    all parts can be read together with load_processed_data.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with processed rows to append
+    dataset_dir : str
+        Directory of the dataset. It is created if it doesn't exist.
+    part_name : str, optional
+        Name of the part file, 'part-<part_name>.parquet'. An existing part
+        with this name is overwritten, so a retried append does not
+        duplicate rows. If not specified, the parts are numbered in the
+        order they are written.
+
+    Returns:
+    --------
+    str
+        Path of the written part file
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(dataset_dir, exist_ok=True)
+
+    # Number the part files so they are read in the order they were written
+    if part_name is None:
+        num_parts = len([name for name in os.listdir(dataset_dir)
+                         if name.startswith('part-')
+                         and name.endswith('.parquet')])
+        part_name = f'{num_parts:05d}'
+    part_path = os.path.join(dataset_dir, f'part-{part_name}.parquet')
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.cast(_arrow_schema(table, 'parquet'))
+
+    # Write to a hidden temporary file, which readers of the dataset skip,
+    # so an interrupted write leaves no partial part
+    temp_path = os.path.join(dataset_dir, f'.part-{part_name}.parquet.tmp')
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, part_path)
+
+    return part_path
+
+
+def load_processed_data(file_path=None, columns=None, file_format=None,
+                        filters=None):
+    """
+    Loads the processed data saved by save_processed_data.
+
+    Columnar files are memory-mapped and only the requested columns are read,
+    so downstream stages do not need to re-parse and re-clean the raw CSV.
+    For partitioned datasets, only the partitions matching the filters are
+    read.
+
+    Parameters:
+    -----------
+    file_path : str, optional
+        Path to the processed data file, or to a dataset directory written
+        by append_processed_data. If not specified, the default path is used.
+    columns : list of str, optional
+        Columns to load. If not specified, all columns are loaded.
+    file_format : str, optional
+        'parquet', 'feather' (Arrow IPC) or 'csv'. If not specified, the
+        format is determined by the file extension.
+    filters : dict or list of tuple, optional
+        Values of columns to select, e.g. {'year': 2015} or
+        {'genre': ['Action', 'Shooter']}, or Parquet filters such as
+        [('year', '>=', 2016)]. Only supported for Parquet data.
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame with processed data
+    """
+    if file_path is None:
+        file_path = _default_processed_path(file_format or 'parquet')
+
+    file_format = _get_file_format(file_path, file_format)
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Processed data not found: {file_path}")
+
+    filters = _filter_expression(filters)
+    if filters is not None and file_format != 'parquet':
+        raise ValueError("Filters are only supported for Parquet data")
+
+    if file_format == 'parquet':
+        if os.path.exists(os.path.join(file_path, '_common_metadata')):
+            return _read_partitioned(file_path, columns, filters)
+        return pd.read_parquet(file_path, columns=columns, memory_map=True,
+                               filters=filters)
+
+    if file_format == 'feather':
+        import pyarrow.feather as feather
+
+        table = feather.read_table(file_path, columns=columns, memory_map=True)
+        return table.to_pandas()
+
+    # Only the schema entries of the requested columns apply to CSV
+    dtype = {column: dtype for column, dtype in SALES_SCHEMA.items()
+             if columns is None or column in columns}
+    return pd.read_csv(file_path, usecols=columns, dtype=dtype)
+
+
 if __name__ == "__main__":
     # Demonstrate function usage
     print("Loading data...")
-    df_raw = load_data()
+    df_raw = load_data(use_cache=True)
     print(f"Loaded {len(df_raw)} rows.")
 
     print("\nCleaning data...")
@@ -0,0 +1,208 @@
+"""
+Dataset Module for PS4 Sales Analysis
+
+This module loads sales data split into several CSV files, e.g. one file per
+platform and month. The files are selected by a directory, a glob pattern or
+a list of paths and read concurrently in a thread pool. Every row is tagged
+with the platform and the source file it comes from, as categorical columns,
+and the files are combined into one DataFrame with a single allocation per
+column: categorical columns are merged with union_categoricals, so they stay
+categorical even if the files contain different genres or publishers.
+"""
+
+import os
+import glob
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.data.data_processing import load_data
+
+
+# Names of the columns added to identify the origin of every row
+PLATFORM_COLUMN = 'platform'
+SOURCE_COLUMN = 'source'
+
+
+def is_dataset_path(path):
+    """
+    Returns True if a path selects several files (a directory or a glob
+    pattern) rather than a single CSV file.
+
+    Parameters:
+    -----------
+    path : str
+        Path to check
+
+    Returns:
+    --------
+    bool
+        Whether the path is a directory or contains glob wildcards
+    """
+    return os.path.isdir(path) or glob.has_magic(path)
+
+
+def find_dataset_files(path):
+    """
+    Lists the CSV files of a dataset.
+
+    Parameters:
+    -----------
+    path : str or list of str
+        Directory (searched recursively for .csv files), glob pattern, or
+        list of file paths
+
+    Returns:
+    --------
+    list of str
+        Paths of the files in sorted order
+
+    Raises:
+    -------
+    FileNotFoundError
+        If no file matches the path
+    """
+    if isinstance(path, (list, tuple)):
+        file_paths = list(path)
+    elif os.path.isdir(path):
+        file_paths = glob.glob(os.path.join(path, '**', '*.csv'),
+                               recursive=True)
+    else:
+        file_paths = glob.glob(path, recursive=True)
+
+    file_paths = sorted(file_path for file_path in file_paths
+                        if os.path.isfile(file_path))
+    if not file_paths:
+        raise FileNotFoundError(f"No data files found for {path}")
+    return file_paths
+
+
+def platform_from_path(file_path, root_dir=None):
+    """
+    Derives the platform of a data file from its path.
+
+    Files in subdirectories of the dataset root take the name of the first
+    subdirectory (e.g. 'ps4/2024-01.csv'), other files the part of their
+    name before the first underscore (e.g. 'ps4_sales.csv').
+
+    Parameters:
+    -----------
+    file_path : str
+        Path to the data file
+    root_dir : str, optional
+        Root directory of the dataset
+
+    Returns:
+    --------
+    str
+        Name of the platform
+    """
+    if root_dir is not None:
+        relative_path = os.path.relpath(file_path, root_dir)
+        parts = relative_path.split(os.sep)
+        if len(parts) > 1 and parts[0] != os.pardir:
+            return parts[0]
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return name.split('_', 1)[0]
+
+
+def _dataset_root(path, file_paths):
+    """Returns the directory the source names are relative to"""
+    if isinstance(path, str) and os.path.isdir(path):
+        return path
+    return os.path.commonpath([os.path.dirname(os.path.abspath(file_path))
+                               for file_path in file_paths])
+
+
+def _concat_column(values):
+    """Concatenates the values of a column of all files"""
+    if all(isinstance(value.dtype, pd.CategoricalDtype) for value in values):
+        return union_categoricals([value.array for value in values],
+                                  sort_categories=True)
+    return pd.concat(values, ignore_index=True).array
+
+
+def combine_frames(frames, platforms, sources):
+    """
+    Combines the data of several files into one DataFrame.
+
+    Every column is allocated once. Categorical columns are merged with
+    union_categoricals, and the platform and source columns are created from
+    the file each row comes from.
+
+    Parameters:
+    -----------
+    frames : list of pandas.DataFrame
+        Data of every file, with the same columns
+    platforms : list of str
+        Platform of every file
+    sources : list of str
+        Name of every file
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Combined data with PLATFORM_COLUMN and SOURCE_COLUMN columns
+    """
+    columns = list(frames[0].columns)
+    for frame, source in zip(frames, sources):
+        if list(frame.columns) != columns:
+            raise ValueError(
+                f"Columns of {source} do not match the columns of {sources[0]}")
+
+    data = {column: _concat_column([frame[column] for frame in frames])
+            for column in columns}
+
+    # Tag every row with the platform and source of its file
+    lengths = [len(frame) for frame in frames]
+    for column, labels in [(PLATFORM_COLUMN, platforms),
+                           (SOURCE_COLUMN, sources)]:
+        categories, codes = np.unique(labels, return_inverse=True)
+        data[column] = pd.Categorical.from_codes(
+            np.repeat(codes.astype(np.int32), lengths), categories=categories)
+
+    return pd.DataFrame(data, index=pd.RangeIndex(sum(lengths)), copy=False)
+
+
+def load_dataset(path, workers=None, use_cache=False, platform_func=None):
+    """
+    Loads game sales data from several CSV files.
+
+    Parameters:
+    -----------
+    path : str or list of str
+        Directory, glob pattern (e.g. 'data/raw/*/*.csv') or list of files
+    workers : int, optional
+        Number of threads reading files concurrently. If not specified, up to
+        one thread per core is used.
+    use_cache : bool, optional
+        Whether to load the files from their column caches, see load_data
+    platform_func : callable, optional
+        Function that takes the path of a file and the dataset root and
+        returns its platform. If not specified, platform_from_path is used.
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Data of all files with categorical PLATFORM_COLUMN and SOURCE_COLUMN
+        columns, in the sorted order of the files
+    """
+    file_paths = find_dataset_files(path)
+    root_dir = _dataset_root(path, file_paths)
+    if platform_func is None:
+        platform_func = platform_from_path
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Read the files concurrently; results keep the order of the files
+    with ThreadPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+        frames = list(executor.map(
+            lambda file_path: load_data(file_path, use_cache=use_cache),
+            file_paths))
+
+    platforms = [platform_func(file_path, root_dir) for file_path in file_paths]
+    sources = [os.path.relpath(file_path, root_dir) for file_path in file_paths]
+    return combine_frames(frames, platforms, sources)
@@ -0,0 +1,366 @@
+"""
+Incremental Processing Module for PS4 Sales Analysis
+
+This module processes only the rows appended to the raw CSV file since the
+previous run. A high-water mark (the byte offset of the last processed line
+and the number of rows read so far) is remembered in a small JSON state file.
+New rows are streamed in chunks, cleaned, preprocessed and appended to the
+processed dataset, and their aggregates and quantile sketches are merged
+into the running aggregates and sketches of the history.
+
+A run is committed by saving the state: the part files of a run are named
+after the offset the run started from, and the merged aggregates and
+sketches are first written next to their final paths, with a '.pending'
+marker before the extension. If a run is interrupted before its state is
+saved, the next run removes its part and pending files and reads the same
+rows again; if it is interrupted after, the next run moves the pending
+files into place.
+"""
+
+import io
+import os
+import re
+import json
+import hashlib
+import pandas as pd
+
+from src.data.data_processing import (
+    SALES_SCHEMA, clean_and_preprocess, append_processed_data
+)
+from src.analysis.aggregates import (
+    build_aggregates, merge_aggregates, save_aggregates, load_aggregates
+)
+from src.analysis.quantiles import (
+    build_quantile_sketches, save_quantile_sketches, load_quantile_sketches
+)
+
+
+# Number of leading bytes hashed to detect a rewritten source file
+HEAD_BYTES = 64 * 1024
+
+# Number of new rows read, cleaned and appended at a time
+CHUNK_ROWS = 100_000
+
+# Marker of the outputs written by a run that is not committed yet
+PENDING_MARKER = '.pending'
+
+# Part files of the dataset, named after the offset their run started from
+PART_PATTERN = re.compile(r'^part-(\d{20})-\d{5}\.parquet$')
+
+
+def get_default_incremental_paths():
+    """
+    Returns the default locations of the incremental store.
+
+    Returns:
+    --------
+    dict
+        Paths of the processed dataset directory ('dataset'), the running
+        aggregates ('aggregates'), the quantile sketches by lifecycle phase
+        ('quantiles') and the high-water mark state ('state')
+    """
+    # Determine the path relative to the project root
+    base_dir = os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))
+    output_dir = os.path.join(base_dir, 'data', 'processed', 'incremental')
+    return {
+        'dataset': os.path.join(output_dir, 'ps4_sales_processed'),
+        'aggregates': os.path.join(output_dir, 'aggregates.parquet'),
+        'quantiles': os.path.join(output_dir, 'quantiles.json'),
+        'state': os.path.join(output_dir, 'state.json')
+    }
+
+
+def _hash_head(file_path, num_bytes):
+    """Calculates the hash of the first bytes of a file"""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read(num_bytes)).hexdigest()
+
+
+def load_state(state_path):
+    """
+    Loads the high-water mark of the previous run.
+
+    Parameters:
+    -----------
+    state_path : str
+        Path of the JSON state file
+
+    Returns:
+    --------
+    dict or None
+        State of the previous run, or None if there was none
+    """
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, state_path):
+    """
+    Saves the high-water mark of the current run.
+
+    Parameters:
+    -----------
+    state : dict
+        State to save
+    state_path : str
+        Path of the JSON state file
+    """
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    temp_path = f"{state_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, state_path)
+
+
+def _is_same_source(state, file_path):
+    """Checks that the source file only grew since the state was saved"""
+    if state is None or state['source'] != os.path.abspath(file_path):
+        return False
+    if os.path.getsize(file_path) < state['offset']:
+        return False
+    head_bytes = min(HEAD_BYTES, state['offset'])
+    return _hash_head(file_path, head_bytes) == state['head_digest']
+
+
+def _last_line_end(f, start, block_size=64 * 1024):
+    """Returns the offset after the last newline of a file, at least start"""
+    end = f.seek(0, os.SEEK_END)
+    while end > start:
+        block_start = max(start, end - block_size)
+        f.seek(block_start)
+        block = f.read(end - block_start)
+        newline = block.rfind(b'\n')
+        if newline >= 0:
+            return block_start + newline + 1
+        end = block_start
+    return start
+
+
+def find_new_rows(file_path, state=None):
+    """
+    Locates the complete lines appended to a CSV file after the high-water
+    mark. A line that is still being written is picked up by the next run.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path to the raw CSV file
+    state : dict, optional
+        State of the previous run. If None, all rows of the file are new.
+
+    Returns:
+    --------
+    tuple
+        Header line of the file (bytes), and the offsets of the first new
+        line and after the last complete line
+    """
+    with open(file_path, 'rb') as f:
+        if state is None:
+            header = f.readline()
+            start = f.tell()
+        else:
+            header = state['header'].encode('utf-8')
+            start = state['offset']
+        end = _last_line_end(f, start)
+    return header, start, end
+
+
+class _RangeReader(io.RawIOBase):
+    """Reads a range of bytes of an open binary file"""
+
+    def __init__(self, f, size):
+        self._f = f
+        self._remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self._f.readinto(memoryview(buffer)[:self._remaining])
+        self._remaining -= size
+        return size
+
+
+def read_new_rows(file_path, header, start, end, chunksize=CHUNK_ROWS):
+    """
+    Reads the rows between two offsets of a CSV file in chunks.
+
+    Only one chunk of rows is held in memory at a time.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path to the raw CSV file
+    header : bytes
+        Header line of the file
+    start, end : int
+        Offsets of the first line and after the last line to read, see
+        find_new_rows
+    chunksize : int, optional
+        Number of rows per chunk, default is CHUNK_ROWS
+
+    Yields:
+    -------
+    pandas.DataFrame
+        Chunks of the new rows, parsed with SALES_SCHEMA
+    """
+    if end <= start:
+        return
+
+    columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = io.BufferedReader(_RangeReader(f, end - start))
+        with pd.read_csv(data, header=None, names=columns, dtype=SALES_SCHEMA,
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk
+
+
+def _remove_parts_from(dataset_dir, offset):
+    """Removes the part files of runs that started at or after an offset"""
+    if not os.path.isdir(dataset_dir):
+        return
+    for name in os.listdir(dataset_dir):
+        match = PART_PATTERN.match(name)
+        if match is not None and int(match.group(1)) >= offset:
+            os.remove(os.path.join(dataset_dir, name))
+
+
+def _pending_path(path):
+    """Returns the path of an output that is not committed yet"""
+    root, ext = os.path.splitext(path)
+    return f'{root}{PENDING_MARKER}{ext}'
+
+
+def _recover_pending(state, state_path, pending_paths):
+    """
+    Completes the commit of an interrupted run, or discards the outputs of
+    a run that was never committed.
+    """
+    committed = state is not None and state.get('pending', False)
+    for path in pending_paths:
+        pending_path = _pending_path(path)
+        if os.path.exists(pending_path):
+            if committed:
+                os.replace(pending_path, path)
+            else:
+                os.remove(pending_path)
+    if committed:
+        state['pending'] = False
+        save_state(state, state_path)
+
+
+def update_incremental_store(file_path, dataset_dir=None, aggregates_path=None,
+                             state_path=None, quantiles_path=None,
+                             chunksize=CHUNK_ROWS):
+    """
+    Processes the rows added to the raw CSV file since the previous run.
+
+    The new rows are read in chunks, cleaned and preprocessed, appended to
+    the processed dataset and merged into the running aggregates and the
+    quantile sketches by lifecycle phase. If the source file was replaced
+    or truncated rather than appended to, the store is rebuilt from
+    scratch. An interrupted run leaves the store as it was before the run
+    (or as after it, if it was interrupted while committing), so it is safe
+    to run again.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path to the raw CSV file
+    dataset_dir : str, optional
+        Directory of the processed dataset
+    aggregates_path : str, optional
+        Path of the running aggregates
+    state_path : str, optional
+        Path of the high-water mark state
+    quantiles_path : str, optional
+        Path of the quantile sketches
+    chunksize : int, optional
+        Number of new rows processed at a time, default is CHUNK_ROWS
+
+    Returns:
+    --------
+    dict
+        Merged aggregates ('aggregates'), updated quantile sketches by
+        lifecycle phase ('quantile_sketches'), number of raw rows read in
+        this run ('rows_read') and kept after cleaning ('rows_processed'),
+        the number of new rows rejected by each cleaning rule ('rejections')
+        and whether the store was rebuilt ('rebuilt')
+    """
+    defaults = get_default_incremental_paths()
+    dataset_dir = dataset_dir or defaults['dataset']
+    aggregates_path = aggregates_path or defaults['aggregates']
+    state_path = state_path or defaults['state']
+    quantiles_path = quantiles_path or defaults['quantiles']
+    pending_paths = [aggregates_path, quantiles_path]
+
+    # Finish or discard the outputs of an interrupted run
+    state = load_state(state_path)
+    _recover_pending(state, state_path, pending_paths)
+
+    # Start over if the source is not a continuation of the processed data
+    rebuilt = state is not None and not _is_same_source(state, file_path)
+    if state is None or rebuilt:
+        state = None
+        for path in pending_paths + [state_path]:
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.isdir(dataset_dir):
+            for name in os.listdir(dataset_dir):
+                os.remove(os.path.join(dataset_dir, name))
+
+    # Remove the part files of an interrupted run before appending again
+    header, start, end = find_new_rows(file_path, state)
+    _remove_parts_from(dataset_dir, start)
+
+    # Read, clean and preprocess only the new rows, one chunk at a time,
+    # and merge them into the dataset and the running aggregates
+    aggregates = load_aggregates(aggregates_path)
+    quantile_sketches = load_quantile_sketches(quantiles_path)
+    rejection_counts = {}
+    rows_processed = 0
+    chunks = clean_and_preprocess(
+        read_new_rows(file_path, header, start, end, chunksize),
+        rejection_counts=rejection_counts)
+    for index, df_processed in enumerate(chunks):
+        if len(df_processed) == 0:
+            continue
+        append_processed_data(df_processed, dataset_dir,
+                              part_name=f'{start:020d}-{index:05d}')
+        aggregates = merge_aggregates(
+            aggregates, build_aggregates(df_processed))
+        quantile_sketches = build_quantile_sketches(
+            df_processed, 'lifecycle_phase', sketches=quantile_sketches)
+        rows_processed += len(df_processed)
+
+    # Write the merged state next to the final paths, commit the run by
+    # saving the high-water mark, and move the merged state into place
+    if rows_processed > 0:
+        save_aggregates(aggregates, _pending_path(aggregates_path))
+        save_quantile_sketches(quantile_sketches,
+                               _pending_path(quantiles_path))
+    rows_read = rejection_counts.get('rows', 0)
+    new_state = {
+        'source': os.path.abspath(file_path),
+        'header': header.decode('utf-8'),
+        'offset': end,
+        'rows': (state['rows'] if state is not None else 0) + rows_read,
+        'head_digest': _hash_head(file_path, min(HEAD_BYTES, end)),
+        'pending': rows_processed > 0
+    }
+    save_state(new_state, state_path)
+    _recover_pending(new_state, state_path, pending_paths)
+
+    return {
+        'aggregates': aggregates,
+        'quantile_sketches': quantile_sketches,
+        'rows_read': rows_read,
+        'rows_processed': rows_processed,
+        'rejections': rejection_counts,
+        'rebuilt': rebuilt
+    }
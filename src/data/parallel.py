@@ -0,0 +1,243 @@
+"""
+Parallel Processing Module for PS4 Sales Analysis
+
+This module runs the row-local processing steps (cleaning and preprocessing)
+on row ranges of the data in a pool of worker processes and reassembles the
+results in the original row order. The output is identical to the output of
+the serial functions.
+"""
+
+import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data.data_processing import (
+    clean_data, preprocess_data, clean_and_preprocess, _clean,
+    _clean_and_preprocess
+)
+from src.data.validation import (
+    count_rejections, merge_rejection_counts, rejected_rows, write_quarantine
+)
+
+
+# Number of partitions per worker, so that uneven partitions are balanced
+PARTITIONS_PER_WORKER = 4
+
+
+def split_row_ranges(num_rows, num_partitions):
+    """
+    Splits rows into contiguous ranges of almost equal size.
+
+    Parameters:
+    -----------
+    num_rows : int
+        Number of rows
+    num_partitions : int
+        Number of ranges
+
+    Returns:
+    --------
+    list of tuple
+        (start, stop) positions of the non-empty ranges, in order
+    """
+    num_partitions = max(1, min(num_partitions, num_rows))
+    bounds = np.linspace(0, num_rows, num_partitions + 1).astype(int)
+    return [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start]
+
+
+def map_partitions(func, df, workers=None, num_partitions=None):
+    """
+    Applies a row-local function to row ranges of a DataFrame in parallel.
+
+    Parameters:
+    -----------
+    func : callable
+        Picklable function that takes and returns a DataFrame and processes
+        every row independently of the others
+    df : pandas.DataFrame
+        DataFrame to process
+    workers : int, optional
+        Number of worker processes. If not specified, all cores are used.
+        If 1, the function is applied to the whole DataFrame in this process.
+    num_partitions : int, optional
+        Number of row ranges, default is PARTITIONS_PER_WORKER per worker
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Results of the partitions concatenated in the original row order
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(df) == 0:
+        return func(df)
+
+    return _combine_chunks(pd.concat(
+        _map_row_ranges(func, df, workers, num_partitions)))
+
+
+def _map_row_ranges(func, df, workers, num_partitions=None):
+    """Applies a function to row ranges in worker processes, in row order"""
+    if num_partitions is None:
+        num_partitions = workers * PARTITIONS_PER_WORKER
+    row_ranges = split_row_ranges(len(df), num_partitions)
+
+    # Results are collected in submission order, which is the row order
+    with ProcessPoolExecutor(max_workers=min(workers, len(row_ranges))) as executor:
+        futures = [executor.submit(func, df.iloc[start:stop])
+                   for start, stop in row_ranges]
+        return [future.result() for future in futures]
+
+
+def _validate_partition(df, func, keep_rejected, **kwargs):
+    """
+    Cleans one partition and returns the result, the rejected rows (if
+    requested) and the rejection counts.
+    """
+    result, flags = func(df, **kwargs)
+    rejected = rejected_rows(df, flags) if keep_rejected else None
+    return result, rejected, count_rejections(flags)
+
+
+def _map_validated(func, df, workers, num_partitions, quarantine_path,
+                   rejection_counts, **kwargs):
+    """
+    Applies a cleaning function to row ranges in parallel and collects the
+    rejections of all partitions in row order.
+    """
+    worker = partial(_validate_partition, func=func,
+                     keep_rejected=quarantine_path is not None, **kwargs)
+    results = _map_row_ranges(worker, df, workers, num_partitions)
+
+    if rejection_counts is not None:
+        for _, _, counts in results:
+            merge_rejection_counts(rejection_counts, counts)
+    if quarantine_path is not None:
+        write_quarantine(pd.concat([rejected for _, rejected, _ in results]),
+                         quarantine_path)
+
+    return _combine_chunks(pd.concat([result for result, _, _ in results]))
+
+
+def _combine_chunks(df):
+    """
+    Makes Arrow-backed columns contiguous after concatenation, so that the
+    result has the same memory layout as the output of the serial path.
+    """
+    for column in df.columns:
+        values = df[column].array
+        is_arrow = (isinstance(values.dtype, pd.ArrowDtype) or
+                    getattr(values.dtype, 'storage', None) == 'pyarrow')
+        if not is_arrow:
+            continue
+
+        import pyarrow as pa
+        arrow_values = values.__arrow_array__()
+        if isinstance(arrow_values, pa.ChunkedArray) and \
+                arrow_values.num_chunks > 1:
+            df[column] = pd.array(arrow_values.combine_chunks(),
+                                  dtype=values.dtype)
+
+    return df
+
+
+def parallel_clean_data(df, workers=None, num_partitions=None,
+                        quarantine_path=None, rejection_counts=None):
+    """
+    Cleans the data in parallel, see clean_data.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with raw data
+    workers : int, optional
+        Number of worker processes, default is the number of cores
+    num_partitions : int, optional
+        Number of row ranges
+    quarantine_path : str, optional
+        Path of a CSV file to save the removed rows to, see clean_data
+    rejection_counts : dict, optional
+        Running counts of the removed rows by rule, see clean_data
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame with cleaned data, identical to clean_data(df)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(df) == 0:
+        return clean_data(df, quarantine_path, rejection_counts)
+
+    return _map_validated(_clean, df, workers, num_partitions,
+                          quarantine_path, rejection_counts)
+
+
+def parallel_preprocess_data(df, workers=None, num_partitions=None,
+                             lifecycle_phases=None):
+    """
+    Preprocesses the data in parallel, see preprocess_data.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with cleaned data
+    workers : int, optional
+        Number of worker processes, default is the number of cores
+    num_partitions : int, optional
+        Number of row ranges
+    lifecycle_phases : list of tuple, optional
+        Console lifecycle phases, see preprocess_data
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame with preprocessed data, identical to preprocess_data(df)
+    """
+    func = partial(preprocess_data, lifecycle_phases=lifecycle_phases)
+    return map_partitions(func, df, workers, num_partitions)
+
+
+def parallel_clean_and_preprocess(df, workers=None, num_partitions=None,
+                                  lifecycle_phases=None, quarantine_path=None,
+                                  rejection_counts=None):
+    """
+    Cleans and preprocesses the data in one parallel pass.
+
+    Each partition is cleaned and preprocessed by the same worker with
+    clean_and_preprocess, so the intermediate cleaned data is never created
+    or sent between processes.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with raw data
+    workers : int, optional
+        Number of worker processes, default is the number of cores
+    num_partitions : int, optional
+        Number of row ranges
+    lifecycle_phases : list of tuple, optional
+        Console lifecycle phases, see preprocess_data
+    quarantine_path : str, optional
+        Path of a CSV file to save the removed rows to, see clean_data
+    rejection_counts : dict, optional
+        Running counts of the removed rows by rule, see clean_data
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame identical to preprocess_data(clean_data(df))
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(df) == 0:
+        return clean_and_preprocess(df, lifecycle_phases, quarantine_path,
+                                    rejection_counts)
+
+    return _map_validated(_clean_and_preprocess, df, workers, num_partitions,
+                          quarantine_path, rejection_counts,
+                          lifecycle_phases=lifecycle_phases)
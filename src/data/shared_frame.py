@@ -0,0 +1,287 @@
+"""
+Shared Frame Module for PS4 Sales Analysis
+
+This module publishes a DataFrame into a single shared memory block, so that
+worker processes can attach to the data without receiving a pickled copy of
+it. Numeric columns, categorical codes, the data and masks of nullable
+columns and the offsets and data buffers of Arrow-backed string columns are
+stored in the block and wrapped by the workers as read-only arrays, so the
+memory use stays at about one copy of the data however many workers run.
+Only categories and the distinct values of other object columns are sent
+along with the handle.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+# Alignment of the arrays in the shared memory block, in bytes
+ALIGNMENT = 64
+
+# Shared memory blocks attached by this process, by name
+_attached = {}
+
+# DataFrame attached by a worker process started by map_shared
+_worker_df = None
+
+
+def _arrow_string_array(values):
+    """Returns the Arrow array of a string column, or None if it has none"""
+    import pyarrow as pa
+
+    if not hasattr(values.array, '__arrow_array__') or \
+            not hasattr(values.dtype, '__from_arrow__'):
+        return None
+    array = values.array.__arrow_array__()
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if not (pa.types.is_string(array.type) or
+            pa.types.is_large_string(array.type)):
+        return None
+    return array
+
+
+def _encode(values):
+    """
+    Splits a column into NumPy arrays stored in shared memory and the
+    metadata needed to rebuild the column around them.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return [np.asarray(values.cat.codes)], {
+            'kind': 'categorical', 'dtype': values.dtype}
+    if isinstance(values.dtype, np.dtype) and values.dtype != object:
+        return [values.to_numpy()], {'kind': 'array'}
+
+    # Nullable columns are stored as their values and their mask
+    if isinstance(values.array, pd.api.extensions.ExtensionArray) and \
+            hasattr(values.array, '_data') and hasattr(values.array, '_mask'):
+        return [values.array._data, values.array._mask], {
+            'kind': 'masked', 'dtype': values.dtype}
+
+    # Arrow-backed strings are stored as their validity, offsets and data
+    # buffers, which the workers wrap without copying
+    array = _arrow_string_array(values)
+    if array is not None:
+        buffers = array.buffers()
+        return [np.frombuffer(buffer, dtype=np.uint8)
+                for buffer in buffers if buffer is not None], {
+            'kind': 'arrow', 'dtype': values.dtype, 'type': str(array.type),
+            'buffers': [buffer is not None for buffer in buffers],
+            'null_count': array.null_count, 'offset': array.offset}
+
+    # Other object columns are stored as codes of their distinct values
+    codes, uniques = pd.factorize(values.array, use_na_sentinel=True)
+    return [codes], {'kind': 'factorized', 'dtype': values.dtype,
+                     'uniques': uniques}
+
+
+def _decode(arrays, spec, num_rows):
+    """Rebuilds a column from its shared arrays and metadata"""
+    if spec['kind'] == 'categorical':
+        return pd.Categorical.from_codes(arrays[0], dtype=spec['dtype'])
+    if spec['kind'] == 'masked':
+        return spec['dtype'].construct_array_type()(arrays[0], arrays[1])
+    if spec['kind'] == 'arrow':
+        import pyarrow as pa
+
+        shared = iter(arrays)
+        buffers = [pa.py_buffer(next(shared)) if present else None
+                   for present in spec['buffers']]
+        array = pa.Array.from_buffers(
+            pa.type_for_alias(spec['type']), num_rows, buffers,
+            spec['null_count'], spec['offset'])
+        return spec['dtype'].__from_arrow__(array)
+    if spec['kind'] == 'factorized':
+        return pd.api.extensions.take(
+            spec['uniques'], arrays[0], allow_fill=True)
+    return arrays[0]
+
+
+class SharedFrame:
+    """
+    DataFrame published into a shared memory block by this process.
+
+    The block is unlinked when the SharedFrame is closed, so it should be used
+    as a context manager around the lifetime of the worker processes.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame to publish. The data is copied into shared memory once.
+    """
+
+    def __init__(self, df):
+        arrays = []
+        columns = []
+        for column in df.columns:
+            column_arrays, spec = _encode(df[column])
+            spec['num_arrays'] = len(column_arrays)
+            arrays.extend(column_arrays)
+            columns.append((column, spec))
+        if isinstance(df.index, pd.RangeIndex):
+            index = {'kind': 'range', 'start': df.index.start,
+                     'stop': df.index.stop, 'step': df.index.step}
+        else:
+            index_arrays, index = _encode(
+                pd.Series(df.index, dtype=df.index.dtype, copy=False))
+            index['num_arrays'] = len(index_arrays)
+            arrays.extend(index_arrays)
+
+        # Lay the arrays out one after another with aligned offsets
+        offsets = []
+        size = 0
+        for array in arrays:
+            size = -(-size // ALIGNMENT) * ALIGNMENT
+            offsets.append(size)
+            size += array.nbytes
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for array, offset in zip(arrays, offsets):
+            target = np.ndarray(array.shape, array.dtype,
+                                buffer=self._shm.buf, offset=offset)
+            target[...] = array
+            del target
+
+        layout = [(array.dtype.str, len(array), offset)
+                  for array, offset in zip(arrays, offsets)]
+        self.handle = {
+            'name': self._shm.name,
+            'num_rows': len(df),
+            'columns': columns,
+            'index': index,
+            'index_name': df.index.name,
+            'layout': layout
+        }
+
+    def close(self):
+        """Releases and removes the shared memory block"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _open_shared_memory(name):
+    """Opens an existing shared memory block without taking ownership of it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 the block is registered with the resource
+        # tracker, which worker processes share with the publishing process
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach_frame(handle):
+    """
+    Attaches to a DataFrame published by SharedFrame.
+
+    Numeric columns, categorical codes, nullable columns and Arrow-backed
+    string columns are read-only views of the shared memory block; the block
+    stays mapped for the lifetime of this process.
+
+    Parameters:
+    -----------
+    handle : dict
+        The handle attribute of the SharedFrame
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame equal to the published one
+    """
+    name = handle['name']
+    if name not in _attached:
+        _attached[name] = _open_shared_memory(name)
+    shm = _attached[name]
+
+    arrays = []
+    for dtype, length, offset in handle['layout']:
+        array = np.ndarray((length,), np.dtype(dtype),
+                           buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays.append(array)
+
+    # Every column takes the next num_arrays arrays of the layout
+    num_rows = handle['num_rows']
+    shared = iter(arrays)
+    data = {}
+    for column, spec in handle['columns']:
+        column_arrays = [next(shared) for _ in range(spec['num_arrays'])]
+        data[column] = _decode(column_arrays, spec, num_rows)
+    index_spec = handle['index']
+    if index_spec['kind'] == 'range':
+        index = pd.RangeIndex(index_spec['start'], index_spec['stop'],
+                              index_spec['step'], name=handle['index_name'])
+    else:
+        index = pd.Index(_decode(list(shared), index_spec, num_rows),
+                         dtype=index_spec.get('dtype'),
+                         name=handle['index_name'], copy=False)
+
+    # Keep the dtype of object columns, which would be inferred otherwise
+    for column, spec in handle['columns']:
+        if spec['kind'] == 'factorized':
+            data[column] = pd.Series(data[column], index=index,
+                                     dtype=spec['dtype'], copy=False)
+
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+def _init_shared_worker(handle, initializer, initargs):
+    """Attaches the worker to the shared DataFrame and runs the initializer"""
+    global _worker_df
+    _worker_df = attach_frame(handle)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _call_with_frame(func, args):
+    """Calls a task function with the attached DataFrame"""
+    return func(_worker_df, *args)
+
+
+def map_shared(tasks, df, workers=None, initializer=None, initargs=()):
+    """
+    Runs tasks on a DataFrame in worker processes that share one copy of it.
+
+    Parameters:
+    -----------
+    tasks : list of tuple
+        (func, args) pairs. Each task is run as func(df, *args) in a worker;
+        func must be a module-level function and its result picklable.
+    df : pandas.DataFrame
+        DataFrame passed to every task
+    workers : int, optional
+        Number of worker processes, default is the number of cores
+    initializer : callable, optional
+        Function run once in every worker after attaching to the data
+    initargs : tuple, optional
+        Arguments of the initializer
+
+    Returns:
+    --------
+    list
+        Results of the tasks, in the order of tasks
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    max_workers = max(1, min(workers, len(tasks)))
+
+    # The block must outlive the pool, so the pool is shut down first
+    with SharedFrame(df) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_shared_worker,
+                                 initargs=(shared.handle, initializer,
+                                           initargs)) as executor:
+            futures = [executor.submit(_call_with_frame, func, args)
+                       for func, args in tasks]
+            return [future.result() for future in futures]
@@ -0,0 +1,199 @@
+"""
+Validation Module for PS4 Sales Analysis
+
+This module evaluates the data quality rules applied when cleaning the sales
+data. All rules are evaluated in one vectorized pass, which produces a
+bitmask per row with one bit per violated rule. The bitmask gives the number
+of rows rejected by each rule and the rejected rows with the reasons for
+their rejection, which can be saved to a quarantine file.
+"""
+
+import os
+import numpy as np
+
+
+# Bits of the validation rules: missing values, negative sales, and regional
+# sales that do not add up to the global sales
+MISSING_VALUES = 1
+NEGATIVE_SALES = 2
+REGIONAL_SUM_MISMATCH = 4
+
+# Validation rules by name, in the order they are reported
+VALIDATION_RULES = {
+    'missing_values': MISSING_VALUES,
+    'negative_sales': NEGATIVE_SALES,
+    'regional_sum_mismatch': REGIONAL_SUM_MISMATCH
+}
+
+# Name of the column with the rejection reasons in the quarantine file
+REASONS_COLUMN = 'rejection_reasons'
+
+
+def evaluate_rules(df, regional_columns, global_column='global', tolerance=0.1):
+    """
+    Evaluates all validation rules for every row.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame with raw sales data
+    regional_columns : list of str
+        Regional sales columns that should add up to the global sales
+    global_column : str, optional
+        Global sales column, default is 'global'
+    tolerance : float, optional
+        Largest accepted absolute difference between the sum of the regional
+        sales and the global sales, default is 0.1
+
+    Returns:
+    --------
+    tuple
+        Bitmask of the violated rules of every row (numpy.ndarray of uint8)
+        and the sum of the regional sales of every row
+    """
+    flags = np.zeros(len(df), dtype=np.uint8)
+
+    # Rows with missing values in any column
+    missing = np.zeros(len(df), dtype=bool)
+    for column in df.columns:
+        missing |= df[column].isna().to_numpy()
+    flags[missing] |= MISSING_VALUES
+
+    # Rows with negative sales
+    sales_columns = list(regional_columns) + [global_column]
+    sales = {column: df[column].to_numpy() for column in sales_columns}
+    negative = np.zeros(len(df), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        for column in sales_columns:
+            negative |= sales[column] < 0
+    flags[negative] |= NEGATIVE_SALES
+
+    # Rows whose regional sales do not add up to the global sales. Rows with
+    # missing sales are only rejected for the missing values.
+    regional_sum = sales[regional_columns[0]] + sales[regional_columns[1]]
+    for column in regional_columns[2:]:
+        regional_sum += sales[column]
+    mismatch = ~np.isclose(regional_sum, sales[global_column], atol=tolerance)
+    mismatch &= ~np.isnan(regional_sum) & ~np.isnan(sales[global_column])
+    flags[mismatch] |= REGIONAL_SUM_MISMATCH
+
+    return flags, regional_sum
+
+
+def count_rejections(flags):
+    """
+    Counts the rows rejected by each validation rule.
+
+    Parameters:
+    -----------
+    flags : numpy.ndarray
+        Bitmask of the violated rules, see evaluate_rules
+
+    Returns:
+    --------
+    dict
+        Number of rows ('rows'), of rejected rows ('rejected') and of the rows
+        violating each rule in VALIDATION_RULES. A row can violate several
+        rules.
+    """
+    # Number of rows with each combination of violated rules
+    combinations = np.bincount(flags, minlength=2 ** len(VALIDATION_RULES))
+    codes = np.arange(len(combinations))
+
+    counts = {'rows': int(len(flags)), 'rejected': int(combinations[1:].sum())}
+    for name, bit in VALIDATION_RULES.items():
+        counts[name] = int(combinations[(codes & bit) > 0].sum())
+    return counts
+
+
+def merge_rejection_counts(total, counts):
+    """
+    Adds rejection counts to running totals.
+
+    Parameters:
+    -----------
+    total : dict
+        Running totals, updated in place. Can be empty.
+    counts : dict
+        Counts returned by count_rejections
+
+    Returns:
+    --------
+    dict
+        The updated totals
+    """
+    for key, value in counts.items():
+        total[key] = total.get(key, 0) + value
+    return total
+
+
+def describe_flags(flags):
+    """
+    Returns the names of the violated rules of every row.
+
+    Parameters:
+    -----------
+    flags : numpy.ndarray
+        Bitmask of the violated rules, see evaluate_rules
+
+    Returns:
+    --------
+    numpy.ndarray
+        Comma-separated rule names of every row
+    """
+    # Describe each combination of rules once
+    descriptions = np.array([
+        ','.join(name for name, bit in VALIDATION_RULES.items() if code & bit)
+        for code in range(2 ** len(VALIDATION_RULES))
+    ], dtype=object)
+    return descriptions[flags]
+
+
+def rejected_rows(df, flags):
+    """
+    Returns the rejected rows with the reasons for their rejection.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Validated DataFrame
+    flags : numpy.ndarray
+        Bitmask of the violated rules, see evaluate_rules
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Rejected rows with an additional REASONS_COLUMN column
+    """
+    positions = np.flatnonzero(flags)
+    rows = df.iloc[positions].copy()
+    rows[REASONS_COLUMN] = describe_flags(flags[positions])
+    return rows
+
+
+def write_quarantine(rows, file_path, append=False):
+    """
+    Saves rejected rows to a CSV quarantine file.
+
+    Parameters:
+    -----------
+    rows : pandas.DataFrame
+        Rejected rows returned by rejected_rows
+    file_path : str
+        Path to the quarantine file
+    append : bool, optional
+        Whether to append the rows to an existing file, default is False
+
+    Returns:
+    --------
+    str
+        Path where the rows were saved
+    """
+    output_dir = os.path.dirname(file_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    append = append and os.path.exists(file_path)
+    rows.to_csv(file_path, mode='a' if append else 'w', header=not append,
+                index=False)
+    return file_path
@@ -0,0 +1,5 @@
+# Pipeline Module
+
+"""
+Module for running the PS4 sales analysis pipeline
+"""
@@ -0,0 +1,309 @@
+"""
+Stage Cache Module for PS4 Sales Analysis
+
+This module provides a cache for the stages of the analysis pipeline. Each
+stage result is stored together with a key computed from the hash of the input
+data, the source code of the modules implementing the stage (and of the
+project modules they import) and its parameters, so that a stage is only
+recomputed when one of them changes.
+"""
+
+import os
+import ast
+import json
+import pickle
+import hashlib
+import importlib.util
+
+
+def get_default_cache_dir():
+    """
+    Returns the default directory for cached stage results.
+
+    Returns:
+    --------
+    str
+        Path to the cache directory
+    """
+    # Determine the path relative to the project root
+    base_dir = os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_dir, 'data', 'cache', 'stages')
+
+
+def _hash_file(file_path, block_size=1 << 20):
+    """Calculates the SHA-256 hash of the file contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_digest(file_path, cache_dir=None):
+    """
+    Calculates the content hash of a file.
+
+    The hash is remembered together with the file size and modification time,
+    so an unchanged file is not read again on the next run.
+
+    Parameters:
+    -----------
+    file_path : str
+        Path to the file
+    cache_dir : str, optional
+        Directory where known hashes are remembered. If not specified,
+        the hash is always recalculated.
+
+    Returns:
+    --------
+    str
+        Hexadecimal SHA-256 hash of the file contents
+    """
+    file_path = os.path.abspath(file_path)
+    file_stat = os.stat(file_path)
+    signature = [file_stat.st_size, file_stat.st_mtime_ns]
+
+    if cache_dir is None:
+        return _hash_file(file_path)
+
+    # Reuse the remembered hash if the file has not been modified
+    digests_path = os.path.join(cache_dir, 'file_digests.json')
+    digests = {}
+    if os.path.exists(digests_path):
+        with open(digests_path, 'r', encoding='utf-8') as f:
+            digests = json.load(f)
+
+    entry = digests.get(file_path)
+    if entry is not None and entry['signature'] == signature:
+        return entry['digest']
+
+    digest = _hash_file(file_path)
+    digests[file_path] = {'signature': signature, 'digest': digest}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_atomic(digests_path, json.dumps(digests, indent=2).encode('utf-8'))
+
+    return digest
+
+
+def files_digest(file_paths, cache_dir=None):
+    """
+    Calculates the combined content hash of several files.
+
+    Parameters:
+    -----------
+    file_paths : list of str
+        Paths to the files, in a fixed order
+    cache_dir : str, optional
+        Directory where known hashes are remembered, see file_digest
+
+    Returns:
+    --------
+    str
+        Hexadecimal SHA-256 hash of the names and contents of the files
+    """
+    hasher = hashlib.sha256()
+    for file_path in file_paths:
+        hasher.update(os.path.abspath(file_path).encode('utf-8'))
+        hasher.update(file_digest(file_path, cache_dir).encode('ascii'))
+    return hasher.hexdigest()
+
+
+def _find_module(module_name):
+    """Returns the spec of a module, or None if it is not a module"""
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, AttributeError, ValueError):
+        return None
+    if spec is None or spec.origin is None or not os.path.isfile(spec.origin):
+        return None
+    return spec
+
+
+def _imported_modules(module_name, spec):
+    """
+    Returns the modules of the same top-level package that a module imports,
+    including imports inside functions. The source is parsed, not executed.
+    """
+    package = module_name.split('.')[0]
+    with open(spec.origin, 'rb') as f:
+        tree = ast.parse(f.read(), spec.origin)
+
+    # Package that relative imports are resolved against
+    base = module_name.split('.')
+    if spec.submodule_search_locations is None:
+        base = base[:-1]
+
+    imported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            candidates = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            parts = base[:len(base) - node.level + 1] if node.level else []
+            parent = '.'.join(parts + ([node.module] if node.module else []))
+            if parent.split('.')[0] != package:
+                continue
+            candidates = [parent]
+            # Names imported from a package can be its submodules
+            parent_spec = _find_module(parent)
+            if (parent_spec is not None
+                    and parent_spec.submodule_search_locations is not None):
+                candidates += [f'{parent}.{alias.name}' for alias in node.names]
+        else:
+            continue
+        imported.update(name for name in candidates
+                        if name.split('.')[0] == package)
+    return imported
+
+
+def module_digest(*module_names):
+    """
+    Calculates the hash of the source code of the given modules and of all
+    modules of their top-level package they import, directly or indirectly.
+
+    The modules are located and parsed without being imported, so hashing
+    the code of a stage does not load its heavy dependencies. Imports inside
+    functions are followed as well, so a change to a lazily imported helper
+    also changes the hash.
+
+    Parameters:
+    -----------
+    *module_names : str
+        Fully qualified module names, e.g. 'src.data.data_processing'
+
+    Returns:
+    --------
+    str
+        Hexadecimal SHA-256 hash of the modules' source code
+    """
+    # Collect the modules reachable through imports
+    specs = {}
+    pending = list(module_names)
+    while pending:
+        module_name = pending.pop()
+        if module_name in specs:
+            continue
+        spec = _find_module(module_name)
+        if spec is None:
+            if module_name in module_names:
+                raise ImportError(f"Cannot find module: {module_name}")
+            continue
+        specs[module_name] = spec
+        pending.extend(_imported_modules(module_name, spec))
+
+    digest = hashlib.sha256()
+    for module_name in sorted(specs):
+        digest.update(module_name.encode('utf-8'))
+        digest.update(_hash_file(specs[module_name].origin).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def stage_key(name, inputs=(), modules=(), params=None):
+    """
+    Calculates the cache key of a pipeline stage.
+
+    Parameters:
+    -----------
+    name : str
+        Name of the stage
+    inputs : sequence of str, optional
+        Hashes of the input files or keys of the upstream stages
+    modules : sequence of str, optional
+        Names of the modules implementing the stage. The project modules
+        they import are included, see module_digest.
+    params : dict, optional
+        Parameters of the stage. Values must have a stable repr.
+
+    Returns:
+    --------
+    str
+        Hexadecimal cache key
+    """
+    payload = {
+        'name': name,
+        'inputs': list(inputs),
+        'code': module_digest(*modules) if modules else None,
+        'params': repr(sorted((params or {}).items()))
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _write_atomic(file_path, data):
+    """Writes bytes to a file so that readers never see a partial file"""
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, file_path)
+
+
+def run_cached_stage(name, key, compute, cache_dir=None, validate=None):
+    """
+    Returns the result of a pipeline stage, reusing the cached result when
+    the stage key has not changed.
+
+    Parameters:
+    -----------
+    name : str
+        Name of the stage, used as the file name of the cached result
+    key : str
+        Cache key of the stage, see stage_key
+    compute : callable
+        Function without arguments that computes the stage result
+    cache_dir : str, optional
+        Directory of cached results. If None, the cache is disabled and
+        the stage is always computed.
+    validate : callable, optional
+        Function that receives a cached result and returns False if it can
+        no longer be used (for example, when an output file was deleted)
+
+    Returns:
+    --------
+    tuple
+        Stage result and a flag that is True if it was taken from the cache
+    """
+    if cache_dir is None:
+        return compute(), False
+
+    key_path = os.path.join(cache_dir, f'{name}.key')
+    value_path = os.path.join(cache_dir, f'{name}.pkl')
+
+    # Reuse the cached result if the key matches
+    if os.path.exists(key_path) and os.path.exists(value_path):
+        with open(key_path, 'r', encoding='utf-8') as f:
+            cached_key = f.read().strip()
+        if cached_key == key:
+            with open(value_path, 'rb') as f:
+                value = pickle.load(f)
+            if validate is None or validate(value):
+                return value, True
+
+    # Compute the stage and store its result before its key
+    value = compute()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_atomic(value_path, pickle.dumps(
+        value, protocol=pickle.HIGHEST_PROTOCOL))
+    _write_atomic(key_path, key.encode('utf-8'))
+
+    return value, False
+
+
+def paths_exist(paths):
+    """
+    Checks that all output files of a stage exist.
+
+    Parameters:
+    -----------
+    paths : str or list of str
+        Path or list of paths produced by a stage
+
+    Returns:
+    --------
+    bool
+        True if all files exist
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    return all(os.path.exists(path) for path in paths)
@@ -0,0 +1,141 @@
+"""
+Stage Graph Module for PS4 Sales Analysis
+
+This module runs the stages of the analysis pipeline as a dependency graph.
+Requested stages run concurrently in a thread pool. Each stage pulls the
+results of the stages it depends on when it needs them, and every stage is
+evaluated at most once, by the first stage that asks for it, while the
+others wait for its result. Dependencies that are never asked for (e.g.
+because the stage result was taken from the cache) are never evaluated.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StageInputs:
+    """
+    Results of the dependencies of a stage, evaluated on first access.
+
+    Parameters:
+    -----------
+    graph : StageGraph
+        Graph the stage belongs to
+    name : str
+        Name of the stage
+    dependencies : sequence of str
+        Names of the stages whose results the stage may use
+    """
+
+    def __init__(self, graph, name, dependencies):
+        self._graph = graph
+        self._name = name
+        self._dependencies = tuple(dependencies)
+
+    def __getitem__(self, dependency):
+        if dependency not in self._dependencies:
+            raise KeyError(
+                f"Stage '{self._name}' does not depend on stage '{dependency}'")
+        return self._graph.result(dependency)
+
+
+class StageGraph:
+    """
+    Pipeline stages with their dependencies.
+
+    Stages are added after the stages they depend on, so the graph is always
+    acyclic.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._results = {}
+        self._locks = {}
+
+    def add_stage(self, name, func, dependencies=()):
+        """
+        Adds a stage to the graph.
+
+        Parameters:
+        -----------
+        name : str
+            Name of the stage
+        func : callable
+            Function that receives a StageInputs with the results of the
+            dependencies and returns the stage result
+        dependencies : sequence of str, optional
+            Names of previously added stages whose results the stage uses
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already defined")
+        for dependency in dependencies:
+            if dependency not in self._stages:
+                raise ValueError(
+                    f"Unknown dependency '{dependency}' of stage '{name}'")
+
+        self._stages[name] = (func, tuple(dependencies))
+        self._locks[name] = threading.Lock()
+
+    @property
+    def stage_names(self):
+        """Names of the stages in the order they were added"""
+        return list(self._stages)
+
+    def dependencies(self, name):
+        """Returns the names of the stages a stage depends on"""
+        return self._stages[name][1]
+
+    def result(self, name):
+        """
+        Returns the result of a stage, evaluating it if needed.
+
+        Parameters:
+        -----------
+        name : str
+            Name of the stage
+
+        Returns:
+        --------
+        object
+            Result of the stage
+        """
+        with self._locks[name]:
+            if name not in self._results:
+                func, dependencies = self._stages[name]
+                self._results[name] = func(
+                    StageInputs(self, name, dependencies))
+            return self._results[name]
+
+    def run(self, targets, workers=None):
+        """
+        Evaluates the requested stages, independent stages concurrently.
+
+        Parameters:
+        -----------
+        targets : sequence of str
+            Names of the stages to evaluate
+        workers : int, optional
+            Maximum number of stages evaluated at the same time. If not
+            specified, all requested stages can run at the same time. If 1,
+            the stages are evaluated one after another in the given order.
+
+        Returns:
+        --------
+        dict
+            Results of the requested stages by name, in the order of targets
+        """
+        unknown = [name for name in targets if name not in self._stages]
+        if unknown:
+            raise ValueError(
+                f"Unknown stages: {', '.join(unknown)}. "
+                f"Expected any of: {', '.join(self._stages)}")
+
+        if workers is None:
+            workers = len(targets)
+        if workers <= 1 or len(targets) <= 1:
+            return {name: self.result(name) for name in targets}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {name: executor.submit(self.result, name)
+                       for name in targets}
+            return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,239 @@
+"""
+Instrumentation Module for PS4 Sales Analysis
+
+This module records structured timing and memory measurements for the stages
+of the analysis pipeline and writes them as a JSON lines trace, one record
+per stage, so that runs on catalogs of different sizes can be compared.
+"""
+
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+import tracemalloc
+from datetime import datetime
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # The resource module is only available on Unix
+    resource = None
+
+
+def get_peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process.
+
+    Returns:
+    --------
+    float or None
+        Peak resident set size in MB, or None if it cannot be measured on
+        this platform
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class StageTracer:
+    """
+    Records wall time, CPU time, peak memory growth and row counts of
+    pipeline stages and appends them to a JSON lines trace file.
+
+    Stages can be nested, in which case each record names its parent stage.
+    Nesting is tracked per thread, so stages may run in concurrent threads;
+    their CPU time and memory figures then include the concurrent stages.
+    cProfile and tracemalloc captures are taken for top-level stages only,
+    because neither can be nested. A stage that has to run in the middle of
+    another one (e.g. a dependency evaluated on demand) can be measured as a
+    top-level stage of its own inside detached, which pauses the running
+    stages, so that their times exclude it.
+
+    Parameters:
+    -----------
+    trace_path : str, optional
+        Path of the JSON lines trace file. If None, records are only kept
+        in memory.
+    profile_dir : str, optional
+        Directory for per-stage cProfile statistics ('<stage>.prof'). If None,
+        stages are not profiled.
+    trace_memory : bool, optional
+        Whether to measure the peak of Python allocations with tracemalloc
+        and save the top allocation sites of each stage to profile_dir
+        (or next to the trace file)
+    """
+
+    def __init__(self, trace_path=None, profile_dir=None, trace_memory=False):
+        self.trace_path = trace_path
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.run_id = datetime.now().isoformat(timespec='seconds')
+        self.records = []
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    @property
+    def _stack(self):
+        """
+        Stages running in the current thread, innermost last, as pairs of
+        their record and their measurement state
+        """
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def detached(self):
+        """
+        Pauses the stages running in the current thread inside the with
+        block, so that stages started in the block are top-level stages.
+
+        The paused stages are not profiled during the block, and their wall
+        and CPU times exclude it.
+        """
+        stack = self._stack
+        paused = [state for _, state in stack if state['top_level']]
+        for state in paused:
+            if state['profiler'] is not None:
+                state['profiler'].disable()
+            if state['traced_before'] is not None:
+                state['traced_peak'] = max(
+                    state['traced_peak'], tracemalloc.get_traced_memory()[1])
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        self._local.stack = []
+
+        try:
+            yield
+        finally:
+            self._local.stack = stack
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.process_time() - cpu_start
+            for _, state in stack:
+                state['paused_wall_seconds'] += wall_seconds
+                state['paused_cpu_seconds'] += cpu_seconds
+            for state in paused:
+                if state['traced_before'] is not None:
+                    tracemalloc.reset_peak()
+                if state['profiler'] is not None:
+                    state['profiler'].enable()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Measures a stage executed inside the with block.
+
+        Parameters:
+        -----------
+        name : str
+            Name of the stage
+        rows_in : int, optional
+            Number of input rows. Can also be set later with annotate.
+
+        Yields:
+        -------
+        dict
+            Record of the stage, which can be updated inside the block
+        """
+        record = {
+            'run_id': self.run_id,
+            'stage': name,
+            'parent': self._stack[-1][0]['stage'] if self._stack else None,
+            'start': datetime.now().isoformat(),
+            'rows_in': rows_in,
+            'rows_out': None
+        }
+        state = {
+            'top_level': not self._stack,
+            'profiler': None,
+            'traced_before': None,
+            'traced_peak': 0,
+            'paused_wall_seconds': 0.0,
+            'paused_cpu_seconds': 0.0
+        }
+        self._stack.append((record, state))
+
+        profiler = None
+        if state['top_level'] and self.profile_dir is not None:
+            profiler = state['profiler'] = cProfile.Profile()
+        if state['top_level'] and self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            state['traced_before'] = tracemalloc.get_traced_memory()[0]
+
+        peak_rss_before = get_peak_rss_mb()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            # Times exclude the stages run while this one was detached
+            record['wall_seconds'] = (time.perf_counter() - wall_start -
+                                      state['paused_wall_seconds'])
+            record['cpu_seconds'] = (time.process_time() - cpu_start -
+                                     state['paused_cpu_seconds'])
+            if peak_rss_before is not None:
+                record['peak_rss_delta_mb'] = (get_peak_rss_mb() -
+                                               peak_rss_before)
+
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profile_path = os.path.join(self.profile_dir, f'{name}.prof')
+                profiler.dump_stats(profile_path)
+                record['profile'] = profile_path
+            if state['traced_before'] is not None:
+                traced_peak = max(state['traced_peak'],
+                                  tracemalloc.get_traced_memory()[1])
+                record['traced_peak_delta_mb'] = (
+                    traced_peak - state['traced_before']) / (1024 * 1024)
+                record['allocations'] = self._save_allocations(name)
+
+            self._stack.pop()
+            self._write(record)
+
+    def annotate(self, **fields):
+        """
+        Adds fields (e.g. rows_in, rows_out) to the innermost running stage.
+
+        Parameters:
+        -----------
+        **fields
+            JSON-serializable values to store in the stage record
+        """
+        if self._stack:
+            self._stack[-1][0].update(fields)
+
+    def _save_allocations(self, name, limit=20):
+        """Saves the top allocation sites of the stage and returns the path"""
+        output_dir = self.profile_dir or os.path.dirname(
+            os.path.abspath(self.trace_path or 'analysis_trace.jsonl'))
+        os.makedirs(output_dir, exist_ok=True)
+        allocations_path = os.path.join(output_dir, f'{name}.tracemalloc.txt')
+
+        snapshot = tracemalloc.take_snapshot()
+        with open(allocations_path, 'w', encoding='utf-8') as f:
+            for statistic in snapshot.statistics('lineno')[:limit]:
+                f.write(f"{statistic}\n")
+        return allocations_path
+
+    def _write(self, record):
+        """Keeps the record and appends it to the trace file"""
+        with self._write_lock:
+            self.records.append(record)
+            if self.trace_path is None:
+                return
+            with open(self.trace_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, default=str) + '\n')
@@ -2,16 +2,22 @@
 Visualization Module for PS4 Sales Analysis
 
 This module provides functions for creating visualizations of PS4 sales data.
+Matplotlib is imported by the functions that draw, so importing the module
+and its figure registry stays cheap.
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from src.analysis.cube import build_cube
 
 
 def set_style():
     """Set custom style for plots"""
+    import matplotlib.pyplot as plt
     plt.style.use('seaborn-v0_8-whitegrid')
     plt.rcParams['figure.figsize'] = (12, 7)
     plt.rcParams['font.size'] = 12
@@ -53,22 +59,26 @@ def save_figure(fig, filename, dir_path=None):
     return filepath
 
 
-def plot_regional_sales(df, region_names=None):
+def plot_regional_sales(df, region_names=None, cube=None):
     """
     Create bar chart of mean sales by region
 
     Parameters:
     -----------
     df : pandas.DataFrame
-        PS4 sales data
+        PS4 sales data. Can be None if cube is specified.
     region_names : dict, optional
         Dictionary mapping region codes to display names
+    cube : SalesCube, optional
+        Precomputed sales cube of the data
 
     Returns:
     --------
     matplotlib.figure.Figure
         Figure object containing the plot
     """
+    import matplotlib.pyplot as plt
+
     # Set default styles
     set_style()
 
@@ -83,12 +93,13 @@ def plot_regional_sales(df, region_names=None):
             'global': 'Global'
         }
 
-    # Calculate mean sales for each region
+    # Mean sales for each region from the sales cube
+    if cube is None:
+        cube = build_cube(df)
     numeric_columns = ['North America', 'europe',
                        'japan', 'Rest of World', 'global']
-    means = {}
-    for column in numeric_columns:
-        means[column] = df[column].mean()
+    means = cube.slice(region=numeric_columns).rollup(
+        'region').to_series('mean').to_dict()
 
     # Create dictionary with display names as keys
     display_means = {region_names.get(k, k): v for k, v in means.items()}
@@ -116,26 +127,33 @@ def plot_regional_sales(df, region_names=None):
     return fig
 
 
-def plot_year_dynamics(df):
+def plot_year_dynamics(df, cube=None):
     """
     Create line and bar chart of sales dynamics by year
 
     Parameters:
     -----------
     df : pandas.DataFrame
-        PS4 sales data
+        PS4 sales data. Can be None if cube is specified.
+    cube : SalesCube, optional
+        Precomputed sales cube of the data
 
     Returns:
     --------
     matplotlib.figure.Figure
         Figure object containing the plot
     """
+    import matplotlib.pyplot as plt
+
     # Set default styles
     set_style()
 
-    # Group by year
-    yearly_counts = df.groupby('year').size()
-    yearly_global_mean = df.groupby('year')['global'].mean()
+    # Roll the global sales up to years
+    if cube is None:
+        cube = build_cube(df)
+    yearly_cube = cube.slice(region='global').rollup('year')
+    yearly_counts = yearly_cube.to_series('count')
+    yearly_global_mean = yearly_cube.to_series('mean')
 
     # Create figure with two y-axes
     fig, ax1 = plt.subplots()
@@ -174,26 +192,32 @@ def plot_year_dynamics(df):
     return fig
 
 
-def plot_genre_heatmap(df):
+def plot_genre_heatmap(df, cube=None):
     """
     Create heatmap of genre preferences by region
 
     Parameters:
     -----------
     df : pandas.DataFrame
-        PS4 sales data
+        PS4 sales data. Can be None if cube is specified.
+    cube : SalesCube, optional
+        Precomputed sales cube of the data
 
     Returns:
     --------
     matplotlib.figure.Figure
         Figure object containing the plot
     """
+    import matplotlib.pyplot as plt
+
     # Set default styles
     set_style()
 
     # Get top 10 genres by overall count
-    top10_genres = df.groupby('genre').size().sort_values(
-        ascending=False).head(10).index.tolist()
+    if cube is None:
+        cube = build_cube(df)
+    top10_genres = [genre for genre, _ in cube.slice(region='global').rollup(
+        'genre').top_n('count', 10)]
 
     # Map region names
     region_names = {
@@ -204,11 +228,12 @@ def plot_genre_heatmap(df):
     }
 
     # Create pivot table with mean sales by genre and region
+    genre_region_means = cube.table('mean', 'genre', 'region')
+    genre_region_means = genre_region_means[
+        genre_region_means.index.isin(top10_genres)]
     pivot_data = pd.DataFrame()
     for region in ['North America', 'europe', 'japan', 'Rest of World']:
-        genre_region_means = df[df['genre'].isin(top10_genres)].groupby('genre')[
-            region].mean()
-        pivot_data[region_names[region]] = genre_region_means
+        pivot_data[region_names[region]] = genre_region_means[region]
 
     # Normalize data for better visualization
     pivot_norm = pivot_data.div(pivot_data.max(axis=0), axis=1)
@@ -234,27 +259,34 @@ def plot_genre_heatmap(df):
     return fig
 
 
-def plot_correlation_scatter(df):
+def plot_correlation_scatter(df, cube=None):
     """
     Create scatter plot showing correlation between number of games and average sales
 
     Parameters:
     -----------
     df : pandas.DataFrame
-        PS4 sales data
+        PS4 sales data. Can be None if cube is specified.
+    cube : SalesCube, optional
+        Precomputed sales cube of the data
 
     Returns:
     --------
     matplotlib.figure.Figure
         Figure object containing the plot
     """
+    import matplotlib.pyplot as plt
+
     # Set default styles
     set_style()
 
-    # Group by year
-    yearly_counts = df.groupby('year').size()
-    yearly_global_mean = df.groupby('year')['global'].mean()
-    yearly_global_sum = df.groupby('year')['global'].sum()
+    # Roll the global sales up to years
+    if cube is None:
+        cube = build_cube(df)
+    yearly_cube = cube.slice(region='global').rollup('year')
+    yearly_counts = yearly_cube.to_series('count')
+    yearly_global_mean = yearly_cube.to_series('mean')
+    yearly_global_sum = yearly_cube.to_series('sum')
 
     # Create figure
     fig, ax = plt.subplots()
@@ -292,56 +324,111 @@ def plot_correlation_scatter(df):
     return fig
 
 
-def create_all_visualizations(df):
+# Figures created by create_all_visualizations as (plot function, file name)
+FIGURES = [
+    (plot_regional_sales, 'regional_sales.png'),
+    (plot_year_dynamics, 'year_dynamics.png'),
+    (plot_genre_heatmap, 'genre_heatmap.png'),
+    (plot_correlation_scatter, 'correlation_scatter.png')
+]
+
+
+def register_figure(plot_func, filename):
+    """
+    Registers an additional figure for create_all_visualizations
+
+    Parameters:
+    -----------
+    plot_func : callable
+        Module-level function that takes the sales DataFrame and a cube
+        keyword argument with the SalesCube of the data, and returns a
+        matplotlib figure. It must be importable by worker processes, which
+        only receive the cube and pass None as the DataFrame.
+    filename : str
+        Filename for the figure
+    """
+    FIGURES.append((plot_func, filename))
+
+
+def _init_render_worker():
+    """Switches the worker to the non-interactive backend"""
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+
+
+def _render_figure(df, plot_func, filename, output_dir, cube=None):
+    """Creates, saves and closes a single figure"""
+    import matplotlib.pyplot as plt
+    fig = plot_func(df, cube=cube)
+    path = save_figure(fig, filename, output_dir)
+    plt.close(fig)
+    return path
+
+
+def create_all_visualizations(df, workers=None, output_dir=None, cube=None):
     """
     Create and save all visualizations for the analysis
 
     Parameters:
     -----------
     df : pandas.DataFrame
-        PS4 sales data
+        PS4 sales data. Can be None if cube is specified and all figures
+        are drawn from the cube.
+    workers : int, optional
+        Number of worker processes rendering figures concurrently with the
+        Agg backend. Only the cube is sent to the workers, never the rows of
+        the data. If None or 1, figures are rendered one after another. Use
+        os.cpu_count() to use all cores.
+    output_dir : str, optional
+        Directory to save the figures. If not specified, 'reports/figures'
+        is used.
+    cube : SalesCube, optional
+        Precomputed sales cube of the data. If not specified, it is built
+        once from df and shared by all figures.
 
     Returns:
     --------
     list
-        List of paths to saved figures
+        List of paths to saved figures, in the order of FIGURES
     """
     # Create output directory for figures
-    base_dir = os.path.dirname(os.path.dirname(
-        os.path.dirname(os.path.abspath(__file__))))
-    output_dir = os.path.join(base_dir, 'reports', 'figures')
+    if output_dir is None:
+        base_dir = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        output_dir = os.path.join(base_dir, 'reports', 'figures')
     os.makedirs(output_dir, exist_ok=True)
 
-    # Create and save regional sales plot
-    fig1 = plot_regional_sales(df)
-    path1 = save_figure(fig1, 'regional_sales.png', output_dir)
-    plt.close(fig1)
+    # Build the cube once for all figures
+    if cube is None:
+        cube = build_cube(df)
 
-    # Create and save year dynamics plot
-    fig2 = plot_year_dynamics(df)
-    path2 = save_figure(fig2, 'year_dynamics.png', output_dir)
-    plt.close(fig2)
+    # Create and save the figures one after another
+    if workers is None or workers <= 1 or len(FIGURES) <= 1:
+        return [_render_figure(df, plot_func, filename, output_dir, cube)
+                for plot_func, filename in FIGURES]
 
-    # Create and save genre heatmap
-    fig3 = plot_genre_heatmap(df)
-    path3 = save_figure(fig3, 'genre_heatmap.png', output_dir)
-    plt.close(fig3)
-
-    # Create and save correlation scatter plot
-    fig4 = plot_correlation_scatter(df)
-    path4 = save_figure(fig4, 'correlation_scatter.png', output_dir)
-    plt.close(fig4)
-
-    return [path1, path2, path3, path4]
+    # Render the figures concurrently; the figures are drawn from the cube,
+    # so only the small cube is sent to the workers
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_render_worker) as executor:
+        futures = [executor.submit(_render_figure, None, plot_func, filename,
+                                   output_dir, cube)
+                   for plot_func, filename in FIGURES]
+        return [future.result() for future in futures]
 
 
 if __name__ == "__main__":
     # This block executes when the script is run directly
-    from src.data.data_processing import load_data, preprocess_data
-
-    # Load and preprocess data
-    df_raw = load_data()
-    df = preprocess_data(df_raw)
+    from src.data.data_processing import (
+        load_data, preprocess_data, load_processed_data
+    )
+
+    # Load the processed data store, or preprocess the raw data if it is missing
+    try:
+        df = load_processed_data()
+    except FileNotFoundError:
+        df_raw = load_data(use_cache=True)
+        df = preprocess_data(df_raw)
 
     # Create all visualizations
     figure_paths = create_all_visualizations(df)
@@ -0,0 +1,39 @@
+"""
+Shared fixtures of the PS4 sales analysis tests
+"""
+
+import os
+import pytest
+
+from benchmarks.synthetic_data import write_synthetic_catalog
+from src.data.data_processing import load_data, clean_data, preprocess_data
+
+
+# Raw sales data bundled with the project
+RAW_PATH = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'data', 'raw', 'ps4_sales.csv')
+
+
+@pytest.fixture(scope='session')
+def raw_path():
+    """Path of the bundled raw sales data"""
+    return RAW_PATH
+
+
+@pytest.fixture(scope='session')
+def synthetic_path(tmp_path_factory):
+    """Path of a synthetic catalog of 5000 games with some invalid rows"""
+    return write_synthetic_catalog(
+        str(tmp_path_factory.mktemp('raw') / 'catalog.csv'), 5000, seed=1)
+
+
+@pytest.fixture
+def raw_df(raw_path):
+    """Raw bundled sales data"""
+    return load_data(raw_path)
+
+
+@pytest.fixture
+def processed_df(raw_df):
+    """Cleaned and preprocessed bundled sales data"""
+    return preprocess_data(clean_data(raw_df))
@@ -0,0 +1,95 @@
+"""
+Tests of the mergeable sales aggregates
+"""
+
+import numpy as np
+import pandas.testing as pdt
+
+from src.data.data_processing import (
+    load_data, clean_and_preprocess, widen_sales
+)
+from src.analysis.aggregates import (
+    REGIONS, AGGREGATE_KEYS, build_aggregates, merge_aggregates,
+    save_aggregates, load_aggregates, summarize_by
+)
+from src.analysis.year_analysis import (
+    analyze_yearly_trends, calculate_year_to_year_change
+)
+
+
+def _split(df, num_parts):
+    bounds = np.linspace(0, len(df), num_parts + 1).astype(int)
+    return [df.iloc[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _normalized(aggregates):
+    keys = AGGREGATE_KEYS + ['region']
+    aggregates = aggregates.astype({key: str for key in keys})
+    return aggregates.sort_values(keys).reset_index(drop=True)
+
+
+def test_merged_partitions_match_full_build(synthetic_path):
+    df = clean_and_preprocess(load_data(synthetic_path))
+    parts = [build_aggregates(part)
+             for part in clean_and_preprocess(
+                 load_data(synthetic_path, chunksize=900))]
+
+    pdt.assert_frame_equal(_normalized(merge_aggregates(*parts)),
+                           _normalized(build_aggregates(df)),
+                           check_dtype=False, rtol=1e-12)
+
+
+def test_merge_is_associative_and_commutative(processed_df):
+    a, b, c = (build_aggregates(part)
+               for part in _split(processed_df, 3))
+
+    expected = _normalized(merge_aggregates(merge_aggregates(a, b), c))
+    pdt.assert_frame_equal(
+        _normalized(merge_aggregates(c, merge_aggregates(b, a))), expected,
+        rtol=1e-12)
+    pdt.assert_frame_equal(_normalized(merge_aggregates(None, a, b, c)),
+                           expected, rtol=1e-12)
+    assert merge_aggregates(None) is None
+
+
+def test_build_aggregates_merges_iterator_of_partitions(processed_df):
+    partitions = iter(_split(processed_df, 4))
+
+    pdt.assert_frame_equal(_normalized(build_aggregates(partitions)),
+                           _normalized(build_aggregates(processed_df)),
+                           check_dtype=False, rtol=1e-12)
+
+
+def test_summary_matches_grouped_rows(processed_df):
+    summary = summarize_by(build_aggregates(processed_df), 'genre')
+    values = widen_sales(processed_df[REGIONS])
+    grouped = values.groupby(processed_df['genre'].astype(str))
+
+    for region in REGIONS:
+        region_summary = summary.xs(region, level='region')
+        expected = grouped[region].agg(list(region_summary.columns))
+        pdt.assert_frame_equal(
+            region_summary.rename(index=str).astype('float64'),
+            expected.astype('float64'), check_names=False,
+            check_index_type=False, rtol=1e-9)
+
+
+def test_year_analysis_from_merged_state_matches_rows(processed_df):
+    halves = _split(processed_df, 2)
+    aggregates = merge_aggregates(*(build_aggregates(half) for half in halves))
+
+    pdt.assert_frame_equal(analyze_yearly_trends(None, aggregates),
+                           analyze_yearly_trends(processed_df), rtol=1e-12)
+    pdt.assert_frame_equal(calculate_year_to_year_change(None, aggregates),
+                           calculate_year_to_year_change(processed_df),
+                           rtol=1e-12)
+
+
+def test_aggregates_round_trip_through_files(processed_df, tmp_path):
+    aggregates = build_aggregates(processed_df)
+
+    for name in ['aggregates.parquet', 'aggregates.json']:
+        path = save_aggregates(aggregates, str(tmp_path / name))
+        pdt.assert_frame_equal(_normalized(load_aggregates(path)),
+                               _normalized(aggregates), check_dtype=False)
+    assert load_aggregates(str(tmp_path / 'missing.parquet')) is None
@@ -0,0 +1,30 @@
+"""
+Tests of the synthetic catalog generator of the benchmarks
+"""
+
+from benchmarks.synthetic_data import GENRES, get_num_publishers
+from src.data.data_processing import SALES_COLUMNS, load_data, clean_data
+
+
+def test_synthetic_catalog_has_raw_schema(synthetic_path, raw_path):
+    df = load_data(synthetic_path)
+
+    assert list(df.columns) == list(load_data(raw_path).columns)
+    assert len(df) == 5000
+    assert df['id'].is_unique
+    assert set(df['genre'].dropna()) <= set(GENRES)
+    assert (df[SALES_COLUMNS].notna().all(axis=1).mean()) > 0.99
+
+
+def test_synthetic_catalog_has_some_invalid_rows(synthetic_path):
+    df = load_data(synthetic_path)
+
+    num_valid = len(clean_data(df))
+
+    assert 0.98 * len(df) < num_valid < len(df)
+
+
+def test_number_of_publishers_grows_with_catalog_size():
+    assert get_num_publishers(1) == 1
+    assert get_num_publishers(5000) == 1000
+    assert get_num_publishers(10 ** 9) == 500_000
@@ -0,0 +1,162 @@
+"""
+Tests of the pipeline stage cache
+"""
+
+import os
+import sys
+import json
+import importlib
+
+import pytest
+
+from src.pipeline.cache import (
+    file_digest, module_digest, stage_key, run_cached_stage, paths_exist
+)
+
+
+@pytest.fixture
+def stage_package(tmp_path, monkeypatch):
+    """Package whose stage module imports a helper lazily"""
+    package_dir = tmp_path / 'stagepkg'
+    package_dir.mkdir()
+    (package_dir / '__init__.py').write_text('')
+    (package_dir / 'stage.py').write_text(
+        'def compute():\n'
+        '    from stagepkg.helpers import scale\n'
+        '    return scale(2)\n')
+    (package_dir / 'helpers.py').write_text(
+        'from stagepkg import constants\n\n'
+        'def scale(value):\n'
+        '    return value * constants.FACTOR\n')
+    (package_dir / 'constants.py').write_text('FACTOR = 10\n')
+    (package_dir / 'unused.py').write_text('')
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    importlib.invalidate_caches()
+    yield package_dir
+    for name in list(sys.modules):
+        if name.split('.')[0] == 'stagepkg':
+            del sys.modules[name]
+
+
+def test_module_digest_follows_indirect_imports(stage_package):
+    digest = module_digest('stagepkg.stage')
+
+    (stage_package / 'unused.py').write_text('CHANGED = True\n')
+    assert module_digest('stagepkg.stage') == digest
+
+    (stage_package / 'constants.py').write_text('FACTOR = 100\n')
+    assert module_digest('stagepkg.stage') != digest
+
+
+def test_module_digest_does_not_import_modules(stage_package):
+    module_digest('stagepkg.stage')
+
+    assert 'stagepkg.stage' not in sys.modules
+    assert 'stagepkg.helpers' not in sys.modules
+
+
+def test_module_digest_rejects_unknown_modules(stage_package):
+    with pytest.raises(ImportError):
+        module_digest('stagepkg.missing')
+
+
+def test_editing_indirect_dependency_invalidates_cached_stage(stage_package,
+                                                             tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    def run():
+        key = stage_key('stage', ['input'], ['stagepkg.stage'])
+        return run_cached_stage('stage', key, compute, cache_dir)
+
+    assert run() == (1, False)
+    assert run() == (1, True)
+
+    (stage_package / 'constants.py').write_text('FACTOR = 100\n')
+    assert run() == (2, False)
+
+
+def test_stage_key_depends_on_inputs_and_params():
+    key = stage_key('stage', ['a'], params={'path': 'x'})
+
+    assert stage_key('stage', ['a'], params={'path': 'x'}) == key
+    assert stage_key('stage', ['b'], params={'path': 'x'}) != key
+    assert stage_key('stage', ['a'], params={'path': 'y'}) != key
+
+
+def test_run_cached_stage_recomputes_invalid_results(tmp_path):
+    output_path = tmp_path / 'output.txt'
+    output_path.write_text('report')
+    cache_dir = str(tmp_path / 'cache')
+
+    run_cached_stage('report', 'key', lambda: str(output_path), cache_dir)
+    output_path.unlink()
+
+    assert run_cached_stage('report', 'key', lambda: str(output_path),
+                            cache_dir, validate=paths_exist) == (
+        str(output_path), False)
+
+
+def test_file_digest_is_remembered_until_file_changes(tmp_path):
+    data_path = tmp_path / 'data.csv'
+    data_path.write_text('a,b\n1,2\n')
+    cache_dir = str(tmp_path / 'cache')
+
+    digest = file_digest(str(data_path), cache_dir)
+    assert file_digest(str(data_path), cache_dir) == digest
+
+    data_path.write_text('a,b\n1,23\n')
+    assert file_digest(str(data_path), cache_dir) != digest
+
+
+@pytest.fixture
+def pipeline_cache_dir(tmp_path, monkeypatch):
+    """Stage cache of the pipeline runs of a test"""
+    from src.pipeline import cache
+
+    cache_dir = str(tmp_path / 'cache')
+    monkeypatch.setattr(cache, 'get_default_cache_dir', lambda: cache_dir)
+    monkeypatch.chdir(tmp_path)
+    return cache_dir
+
+
+def test_fused_pipeline_caches_processed_data_once(raw_path, tmp_path,
+                                                   pipeline_cache_dir):
+    from run_analysis import run_full_analysis
+
+    trace_path = tmp_path / 'trace.jsonl'
+    for _ in range(2):
+        run_full_analysis(raw_path, trace_path=str(trace_path),
+                          stages=['regional_means'])
+
+    assert os.path.exists(os.path.join(pipeline_cache_dir, 'clean.pkl'))
+    assert not os.path.exists(os.path.join(pipeline_cache_dir,
+                                           'preprocess.pkl'))
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [record['cached'] for record in records
+            if record['stage'] == 'regional_means'] == [False, True]
+
+
+def test_cached_cube_stage_rewrites_deleted_cube(raw_path, tmp_path,
+                                                 pipeline_cache_dir):
+    from run_analysis import run_full_analysis
+
+    cube_path = tmp_path / 'output' / 'cube.npz'
+    trace_path = tmp_path / 'trace.jsonl'
+    run_full_analysis(raw_path, trace_path=str(trace_path),
+                      cube_path=str(cube_path), stages=['cube'])
+    cube_path.unlink()
+    run_full_analysis(raw_path, trace_path=str(trace_path),
+                      cube_path=str(cube_path), stages=['cube'])
+
+    assert cube_path.exists()
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()
+               if json.loads(line)['stage'] == 'cube']
+    assert [record['cached'] for record in records] == [False, False]
+    # The cube is not a table of rows
+    assert all(record['rows_out'] is None for record in records)
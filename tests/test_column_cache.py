@@ -0,0 +1,89 @@
+"""
+Tests of the memory-mapped column cache of the raw data
+"""
+
+import os
+import mmap
+import shutil
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.data import column_cache
+from src.data.column_cache import build_column_cache, load_column_cache
+from src.data.data_processing import load_data
+
+
+def _is_memory_mapped(array):
+    """Checks whether an array is a view of a memory-mapped file"""
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+@pytest.fixture
+def source_path(raw_path, tmp_path):
+    """Copy of the raw data that the tests can modify"""
+    return shutil.copy(raw_path, tmp_path / 'sales.csv')
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Cache directory used by default by the tests"""
+    cache_dir = str(tmp_path / 'cache')
+    monkeypatch.setattr(column_cache, 'get_default_column_cache_dir',
+                        lambda file_path: cache_dir)
+    return cache_dir
+
+
+def test_cache_round_trips_all_column_kinds(source_path, cache_dir):
+    df = load_data(source_path)
+    df['rating'] = pd.array([1.5, None] * (len(df) // 2) +
+                            [2.0] * (len(df) % 2), dtype='Float32')
+    df.loc[3, 'publisher'] = None
+
+    build_column_cache(df, source_path, cache_dir)
+
+    pdt.assert_frame_equal(load_column_cache(source_path, cache_dir), df)
+
+
+def test_cached_columns_are_memory_mapped(source_path, cache_dir):
+    build_column_cache(load_data(source_path), source_path, cache_dir)
+
+    df = load_column_cache(source_path, cache_dir)
+
+    assert _is_memory_mapped(df['global'].to_numpy())
+    assert _is_memory_mapped(df['year'].array._data)
+
+
+def test_changed_source_invalidates_cache(source_path, cache_dir):
+    build_column_cache(load_data(source_path), source_path, cache_dir)
+
+    with open(source_path, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert load_column_cache(source_path, cache_dir) is None
+
+    build_column_cache(load_data(source_path), source_path, cache_dir)
+    stat = os.stat(source_path)
+    os.utime(source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert load_column_cache(source_path, cache_dir) is None
+
+
+def test_missing_cache_is_not_loaded(source_path, cache_dir):
+    assert load_column_cache(source_path, cache_dir) is None
+
+
+def test_load_data_builds_and_reuses_cache(source_path, cache_dir):
+    expected = load_data(source_path)
+
+    first = load_data(source_path, use_cache=True)
+    assert os.path.exists(os.path.join(cache_dir, column_cache.MANIFEST_NAME))
+    second = load_data(source_path, use_cache=True)
+
+    pdt.assert_frame_equal(first, expected)
+    pdt.assert_frame_equal(second, expected)
+    assert _is_memory_mapped(second['global'].to_numpy())
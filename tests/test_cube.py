@@ -0,0 +1,105 @@
+"""
+Tests of the sales cube
+"""
+
+import numpy as np
+import pandas.testing as pdt
+import pytest
+
+from src.data.data_processing import widen_sales
+from src.analysis.aggregates import REGIONS
+from src.analysis.cube import (
+    CUBE_DIMS, build_cube, as_cube, save_cube, load_cube
+)
+
+
+@pytest.fixture
+def cube(processed_df):
+    return build_cube(processed_df)
+
+
+def _global_by(processed_df, *by):
+    """Global sales of the rows grouped by some columns"""
+    sales = widen_sales(processed_df['global'])
+    keys = [processed_df[column].astype(object) for column in by]
+    return sales.groupby(keys).agg(['count', 'sum', 'min', 'max', 'mean',
+                                    'std'])
+
+
+@pytest.mark.parametrize('by', [('year',), ('genre',), ('lifecycle_phase',),
+                                ('genre', 'year')])
+def test_rollup_matches_grouped_rows(cube, processed_df, by):
+    rolled = cube.slice(region='global').rollup(*by)
+    expected = _global_by(processed_df, *by)
+
+    for name in expected.columns:
+        series = rolled.to_series(name).astype('float64')
+        series.index = series.index.set_names(list(by))
+        pdt.assert_series_equal(series.sort_index(),
+                                expected[name].astype('float64').sort_index(),
+                                check_names=False, check_index_type=False,
+                                rtol=1e-9)
+
+
+def test_rollup_to_regions_matches_column_totals(cube, processed_df):
+    totals = cube.rollup('region')
+
+    np.testing.assert_allclose(
+        totals.stat('sum'), widen_sales(processed_df[REGIONS]).sum().to_numpy(),
+        rtol=1e-12)
+    assert (totals.stat('count') == len(processed_df)).all()
+    assert list(totals.labels['region']) == REGIONS
+
+
+def test_slice_keeps_or_removes_dimensions(cube):
+    years = list(cube.labels['year'][:2])
+
+    single = cube.slice(genre='Action')
+    several = cube.slice(genre=['Action', 'Shooter'], year=years)
+
+    assert 'genre' not in single.dims
+    assert several.shape == (2, len(cube.labels['region']), 2,
+                             len(cube.labels['lifecycle_phase']))
+    np.testing.assert_array_equal(several.slice(genre='Action').stat('sum'),
+                                  single.slice(year=years).stat('sum'))
+    with pytest.raises(KeyError):
+        cube.slice(genre='Unknown genre')
+    with pytest.raises(KeyError):
+        cube.rollup('platform')
+
+
+def test_table_and_top_n(cube, processed_df):
+    table = cube.table('mean', 'genre', 'region')
+    expected = widen_sales(processed_df[REGIONS]).groupby(
+        processed_df['genre'].astype(object)).mean()
+
+    pdt.assert_frame_equal(table.rename_axis(index=None, columns=None),
+                           expected.rename_axis(index=None), rtol=1e-9)
+
+    top = cube.slice(region='global').rollup('genre').top_n('sum', 3)
+    expected_top = _global_by(processed_df, 'genre')['sum'].nlargest(3)
+    assert [label for label, _ in top] == list(expected_top.index)
+    with pytest.raises(ValueError):
+        cube.top_n('sum', 3)
+
+
+def test_cube_round_trips_through_npz(cube, tmp_path):
+    path = save_cube(cube, str(tmp_path / 'cube.npz'))
+
+    loaded = load_cube(path)
+
+    assert loaded.dims == CUBE_DIMS
+    for dim in CUBE_DIMS:
+        assert list(loaded.labels[dim]) == list(cube.labels[dim])
+    for name, array in cube.stats.items():
+        np.testing.assert_array_equal(loaded.stats[name], array)
+    assert load_cube(str(tmp_path / 'missing.npz')) is None
+
+
+def test_as_cube_accepts_cube_aggregates_and_rows(cube, processed_df):
+    from src.analysis.aggregates import build_aggregates
+
+    assert as_cube(cube) is cube
+    for data in [build_aggregates(processed_df), processed_df]:
+        np.testing.assert_allclose(as_cube(data).stat('sum'),
+                                   cube.stat('sum'), rtol=1e-12)
@@ -0,0 +1,198 @@
+"""
+Tests of loading, cleaning, preprocessing and storing the sales data
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.data.data_processing import (
+    SALES_COLUMNS, UNKNOWN_PHASE, load_data, clean_data, preprocess_data,
+    PARTITION_COLUMNS, save_processed_data, load_processed_data,
+    append_processed_data, get_summary_stats, widen_sales, assign_lifecycle_phases
+)
+
+
+def test_chunked_load_matches_full_load(synthetic_path):
+    chunks = list(load_data(synthetic_path, chunksize=700))
+
+    assert len(chunks) == 8
+    assert max(len(chunk) for chunk in chunks) == 700
+    pdt.assert_frame_equal(pd.concat(chunks), load_data(synthetic_path),
+                           check_dtype=False, check_categorical=False)
+
+
+def test_chunked_clean_and_preprocess_match_full_pass(synthetic_path):
+    chunks = preprocess_data(clean_data(load_data(synthetic_path, chunksize=700)))
+    expected = preprocess_data(clean_data(load_data(synthetic_path)))
+
+    pdt.assert_frame_equal(pd.concat(chunks), expected,
+                           check_dtype=False, check_categorical=False)
+
+
+def test_save_processed_data_streams_chunks(synthetic_path, tmp_path):
+    chunks = preprocess_data(clean_data(load_data(synthetic_path, chunksize=700)))
+    path = save_processed_data(chunks, str(tmp_path / 'processed.parquet'))
+    expected = preprocess_data(clean_data(load_data(synthetic_path)))
+
+    pdt.assert_frame_equal(load_processed_data(path),
+                           expected.reset_index(drop=True),
+                           check_dtype=False, check_categorical=False)
+
+
+def test_load_data_applies_schema(raw_df):
+    assert raw_df['year'].dtype == 'Int16'
+    assert isinstance(raw_df['genre'].dtype, pd.CategoricalDtype)
+    assert isinstance(raw_df['publisher'].dtype, pd.CategoricalDtype)
+    assert all(raw_df[column].dtype == np.float32 for column in SALES_COLUMNS)
+
+
+def test_widen_sales_restores_parsed_decimals(raw_path, raw_df):
+    expected = pd.read_csv(raw_path)[SALES_COLUMNS]
+
+    widened = widen_sales(raw_df[SALES_COLUMNS])
+
+    assert (widened.dtypes == np.float64).all()
+    pdt.assert_frame_equal(widened, expected, check_exact=True)
+
+
+def test_widen_sales_keeps_special_values():
+    values = np.array([0.0, -0.5, np.nan, np.inf, 1234.56], dtype=np.float32)
+
+    widened = widen_sales(values)
+
+    np.testing.assert_array_equal(widened, [0.0, -0.5, np.nan, np.inf, 1234.56])
+
+
+def test_summary_total_matches_double_precision(raw_path, raw_df):
+    cleaned = clean_data(raw_df)
+    expected = pd.read_csv(raw_path).loc[cleaned.index, 'global'].sum()
+
+    assert get_summary_stats(cleaned)['Total global sales (M)'] == expected
+
+
+def test_processed_data_round_trips_through_columnar_formats(processed_df,
+                                                             tmp_path):
+    expected = processed_df.reset_index(drop=True)
+
+    for name in ['processed.parquet', 'processed.feather']:
+        path = save_processed_data(processed_df, str(tmp_path / name))
+        pdt.assert_frame_equal(load_processed_data(path), expected)
+
+
+def test_load_processed_data_reads_selected_columns(processed_df, tmp_path):
+    path = save_processed_data(processed_df, str(tmp_path / 'processed.parquet'))
+
+    df = load_processed_data(path, columns=['genre', 'global'])
+
+    assert list(df.columns) == ['genre', 'global']
+    pdt.assert_frame_equal(df, processed_df[['genre', 'global']].reset_index(
+        drop=True))
+
+
+def test_processed_data_round_trips_through_csv(processed_df, tmp_path):
+    path = save_processed_data(processed_df, str(tmp_path / 'processed.csv'))
+
+    df = load_processed_data(path)
+
+    pdt.assert_frame_equal(df, processed_df.reset_index(drop=True),
+                           check_dtype=False, check_categorical=False)
+
+
+def test_partitioned_data_round_trips_like_parquet(raw_df, processed_df,
+                                                   tmp_path):
+    for name, df in [('cleaned', clean_data(raw_df)),
+                     ('processed', processed_df)]:
+        path = save_processed_data(df, str(tmp_path / f'{name}.parquet'))
+        partitioned_path = save_processed_data(
+            df, str(tmp_path / f'{name}-partitioned.parquet'),
+            partition_cols=PARTITION_COLUMNS)
+
+        pdt.assert_frame_equal(load_processed_data(partitioned_path),
+                               load_processed_data(path))
+    assert load_processed_data(partitioned_path)['year'].dtype == 'int64'
+    assert load_processed_data(
+        str(tmp_path / 'cleaned-partitioned.parquet'))['year'].dtype == 'Int16'
+
+
+@pytest.mark.parametrize('filters', [
+    {'year': 2016},
+    {'genre': ['Action', 'Shooter']},
+    {'year': [2015, 2016], 'genre': 'Sports'},
+    [('year', '>=', 2017)],
+    {'year': 1990}
+])
+def test_partitioned_data_reads_filtered_partitions(processed_df, tmp_path,
+                                                    filters):
+    path = save_processed_data(processed_df, str(tmp_path / 'processed.parquet'),
+                               partition_cols=PARTITION_COLUMNS)
+    columns = ['game', 'year', 'genre', 'global']
+
+    df = load_processed_data(path, columns=columns, filters=filters)
+
+    expected = processed_df[columns]
+    conditions = (filters if isinstance(filters, list) else
+                  [(column, 'in', values if isinstance(values, list)
+                    else [values]) for column, values in filters.items()])
+    for column, op, values in conditions:
+        if op == 'in':
+            expected = expected[expected[column].isin(values)]
+        else:
+            expected = expected[expected[column] >= values]
+    # Rows keep the order of the ids, also if the ids are not read
+    pdt.assert_frame_equal(df, expected.reset_index(drop=True),
+                           check_categorical=False)
+
+
+def test_appended_parts_with_different_categories_read_back(processed_df,
+                                                           tmp_path):
+    dataset_dir = str(tmp_path / 'dataset')
+    # Parts with under and over 127 publishers, like chunks of new rows
+    batches = [processed_df.iloc[:5], processed_df, processed_df.iloc[5:40]]
+    for batch in batches:
+        batch = batch.copy()
+        for column in batch.select_dtypes('category'):
+            batch[column] = batch[column].cat.remove_unused_categories()
+        append_processed_data(batch, dataset_dir)
+
+    expected = pd.concat(batches, ignore_index=True)
+    pdt.assert_frame_equal(load_processed_data(dataset_dir), expected,
+                           check_dtype=False, check_categorical=False)
+    assert len(load_processed_data(dataset_dir, filters={'year': 2016})) == \
+        (expected['year'] == 2016).sum()
+
+
+def test_append_processed_data_overwrites_named_part(processed_df, tmp_path):
+    dataset_dir = str(tmp_path / 'dataset')
+    append_processed_data(processed_df.iloc[:10], dataset_dir, part_name='a')
+    append_processed_data(processed_df.iloc[:10], dataset_dir, part_name='a')
+
+    assert os.listdir(dataset_dir) == ['part-a.parquet']
+    assert len(load_processed_data(dataset_dir)) == 10
+
+
+def test_assign_lifecycle_phases_uses_ps4_phases():
+    phases = assign_lifecycle_phases([2012, 2013, 2015, 2016, 2018, 2019, 2022, 0])
+
+    assert list(phases) == ['Unknown', 'Early', 'Early', 'Middle', 'Middle',
+                            'Late', 'Late', 'Unknown']
+    assert list(phases.categories) == ['Early', 'Middle', 'Late', UNKNOWN_PHASE]
+
+
+def test_assign_lifecycle_phases_prefers_first_overlapping_phase():
+    phases = assign_lifecycle_phases(
+        [2005, 2007, 2010], [('Launch', 2006, 2008), ('Peak', 2007, 2010)])
+
+    assert list(phases) == [UNKNOWN_PHASE, 'Launch', 'Peak']
+
+
+def test_preprocess_data_adds_derived_columns(processed_df):
+    row = processed_df.iloc[0]
+
+    assert row['lifecycle_phase'] == 'Early'
+    assert row['regional_sales_sum'] == np.float32(
+        row['North America'] + row['europe'] + row['japan']
+        + row['Rest of World'])
+    assert abs(row['europe_percent'] - row['europe'] / row['global'] * 100) < 1e-4
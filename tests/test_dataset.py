@@ -0,0 +1,90 @@
+"""
+Tests of loading sales data split into several files
+"""
+
+import os
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.data.data_processing import load_data
+from src.data.dataset import (
+    PLATFORM_COLUMN, SOURCE_COLUMN, is_dataset_path, find_dataset_files,
+    platform_from_path, load_dataset
+)
+
+
+# Files of the test dataset and the rows of the raw data they hold
+DATASET_FILES = [
+    (os.path.join('ps4', '2024-01.csv'), slice(0, 300)),
+    (os.path.join('ps4', '2024-02.csv'), slice(300, 600)),
+    (os.path.join('ps5', '2024-01.csv'), slice(600, None))
+]
+
+
+@pytest.fixture
+def dataset_dir(raw_path, tmp_path):
+    """Raw data split into one file per platform and month"""
+    lines = open(raw_path, encoding='utf-8').read().splitlines(keepends=True)
+    header, rows = lines[0], lines[1:]
+    for name, rows_slice in DATASET_FILES:
+        path = tmp_path / 'dataset' / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(header + ''.join(rows[rows_slice]), encoding='utf-8')
+    # Files other than CSV files are not part of the dataset
+    (tmp_path / 'dataset' / 'README.txt').write_text('notes')
+    return str(tmp_path / 'dataset')
+
+
+def test_dataset_paths_and_files(dataset_dir, raw_path):
+    pattern = os.path.join(dataset_dir, '*', '2024-01.csv')
+
+    assert is_dataset_path(dataset_dir)
+    assert is_dataset_path(pattern)
+    assert not is_dataset_path(raw_path)
+    assert find_dataset_files(dataset_dir) == [
+        os.path.join(dataset_dir, name) for name, _ in DATASET_FILES]
+    assert find_dataset_files(pattern) == [
+        os.path.join(dataset_dir, DATASET_FILES[0][0]),
+        os.path.join(dataset_dir, DATASET_FILES[2][0])]
+    with pytest.raises(FileNotFoundError):
+        find_dataset_files(os.path.join(dataset_dir, '*.parquet'))
+
+
+def test_platform_from_path(tmp_path):
+    root_dir = str(tmp_path)
+
+    assert platform_from_path(str(tmp_path / 'ps5' / 'a.csv'), root_dir) == 'ps5'
+    assert platform_from_path(str(tmp_path / 'ps4_sales.csv'), root_dir) == 'ps4'
+    assert platform_from_path('/elsewhere/xbox_sales.csv', root_dir) == 'xbox'
+
+
+@pytest.mark.parametrize('workers', [None, 1, 3])
+def test_load_dataset_combines_files_in_order(dataset_dir, raw_path, workers):
+    df = load_dataset(dataset_dir, workers=workers)
+
+    expected = load_data(raw_path)
+    pdt.assert_frame_equal(
+        df.drop(columns=[PLATFORM_COLUMN, SOURCE_COLUMN]).astype(object),
+        expected.astype(object))
+    for column, dtype in expected.dtypes.items():
+        assert isinstance(df[column].dtype, pd.CategoricalDtype) == \
+            isinstance(dtype, pd.CategoricalDtype)
+
+    sizes = [len(range(len(expected))[rows_slice])
+             for _, rows_slice in DATASET_FILES]
+    assert isinstance(df[PLATFORM_COLUMN].dtype, pd.CategoricalDtype)
+    assert isinstance(df[SOURCE_COLUMN].dtype, pd.CategoricalDtype)
+    assert df[PLATFORM_COLUMN].value_counts().to_dict() == {
+        'ps4': sizes[0] + sizes[1], 'ps5': sizes[2]}
+    assert list(df[SOURCE_COLUMN].unique()) == [
+        name for name, _ in DATASET_FILES]
+
+
+def test_load_dataset_rejects_mismatched_columns(dataset_dir):
+    path = os.path.join(dataset_dir, DATASET_FILES[2][0])
+    load_data(path).drop(columns='publisher').to_csv(path, index=False)
+
+    with pytest.raises(ValueError):
+        load_dataset(dataset_dir)
@@ -0,0 +1,158 @@
+"""
+Tests of processing only the rows appended to the raw data
+"""
+
+import os
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.data import incremental
+from src.data.data_processing import (
+    load_data, clean_and_preprocess, load_processed_data
+)
+from src.data.incremental import (
+    find_new_rows, read_new_rows, update_incremental_store, load_state
+)
+from src.analysis.aggregates import build_aggregates, load_aggregates
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Paths of an empty incremental store"""
+    return {
+        'dataset_dir': str(tmp_path / 'dataset'),
+        'aggregates_path': str(tmp_path / 'aggregates.parquet'),
+        'state_path': str(tmp_path / 'state.json'),
+        'quantiles_path': str(tmp_path / 'quantiles.json')
+    }
+
+
+def _write_lines(path, lines, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.writelines(lines)
+
+
+def _read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return f.readlines()
+
+
+def _sorted_aggregates(aggregates):
+    keys = ['year', 'genre', 'lifecycle_phase', 'region']
+    aggregates = aggregates.astype({key: str for key in keys})
+    return aggregates.sort_values(keys).reset_index(drop=True)
+
+
+def _assert_store_matches(store, source_path):
+    expected = clean_and_preprocess(load_data(source_path))
+    pdt.assert_frame_equal(load_processed_data(store['dataset_dir']),
+                           expected.reset_index(drop=True),
+                           check_dtype=False, check_categorical=False)
+    pdt.assert_frame_equal(
+        _sorted_aggregates(load_aggregates(store['aggregates_path'])),
+        _sorted_aggregates(build_aggregates(expected)),
+        check_dtype=False, check_categorical=False)
+
+
+def test_read_new_rows_streams_chunks(synthetic_path):
+    header, start, end = find_new_rows(synthetic_path)
+    chunks = list(read_new_rows(synthetic_path, header, start, end,
+                                chunksize=700))
+
+    assert len(chunks) == 8
+    assert max(len(chunk) for chunk in chunks) == 700
+    pdt.assert_frame_equal(pd.concat(chunks, ignore_index=True),
+                           load_data(synthetic_path),
+                           check_dtype=False, check_categorical=False)
+
+
+def test_appended_batches_read_back_as_one_dataset(synthetic_path, store,
+                                                   tmp_path):
+    lines = _read_lines(synthetic_path)
+    source_path = str(tmp_path / 'sales.csv')
+    _write_lines(source_path, lines[:1001])
+
+    # Each batch has its own categories, written in several parts
+    for batch in [lines[1001:1500], lines[1500:3800], lines[3800:]]:
+        update_incremental_store(source_path, chunksize=400, **store)
+        _write_lines(source_path, batch, mode='a')
+    result = update_incremental_store(source_path, chunksize=400, **store)
+
+    assert result['rows_read'] == len(lines) - 3800
+    assert load_state(store['state_path'])['rows'] == len(lines) - 1
+    assert len(os.listdir(store['dataset_dir'])) > 4
+    _assert_store_matches(store, source_path)
+
+
+def test_partial_trailing_line_is_read_by_next_run(raw_path, store, tmp_path):
+    lines = _read_lines(raw_path)
+    source_path = str(tmp_path / 'sales.csv')
+    _write_lines(source_path, lines[:-1] + [lines[-1][:10]])
+
+    result = update_incremental_store(source_path, **store)
+    assert result['rows_read'] == len(lines) - 2
+
+    _write_lines(source_path, [lines[-1][10:]], mode='a')
+    result = update_incremental_store(source_path, **store)
+    assert result['rows_read'] == 1
+    _assert_store_matches(store, source_path)
+
+
+def test_run_interrupted_before_commit_is_redone(raw_path, store, tmp_path,
+                                                 monkeypatch):
+    lines = _read_lines(raw_path)
+    source_path = str(tmp_path / 'sales.csv')
+    _write_lines(source_path, lines[:400])
+    update_incremental_store(source_path, **store)
+    _write_lines(source_path, lines[400:], mode='a')
+
+    def crash(state, state_path):
+        raise OSError('interrupted')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(incremental, 'save_state', crash)
+        with pytest.raises(OSError):
+            update_incremental_store(source_path, chunksize=100, **store)
+
+    # The parts and pending outputs of the interrupted run are replaced
+    result = update_incremental_store(source_path, chunksize=100, **store)
+    assert result['rows_read'] == len(lines) - 400
+    assert not any('.pending' in name for name in os.listdir(tmp_path))
+    _assert_store_matches(store, source_path)
+
+
+def test_run_interrupted_after_commit_is_completed(raw_path, store, tmp_path,
+                                                   monkeypatch):
+    source_path = str(tmp_path / 'sales.csv')
+    _write_lines(source_path, _read_lines(raw_path))
+    recover_pending = incremental._recover_pending
+
+    def crash(state, state_path, pending_paths):
+        if state is not None and state['pending']:
+            raise OSError('interrupted')
+        recover_pending(state, state_path, pending_paths)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(incremental, '_recover_pending', crash)
+        with pytest.raises(OSError):
+            update_incremental_store(source_path, **store)
+    assert not os.path.exists(store['aggregates_path'])
+
+    result = update_incremental_store(source_path, **store)
+    assert result['rows_read'] == 0
+    assert not load_state(store['state_path'])['pending']
+    _assert_store_matches(store, source_path)
+
+
+def test_replaced_source_rebuilds_store(raw_path, store, tmp_path):
+    lines = _read_lines(raw_path)
+    source_path = str(tmp_path / 'sales.csv')
+    _write_lines(source_path, lines)
+    update_incremental_store(source_path, **store)
+
+    _write_lines(source_path, lines[:1] + lines[300:])
+    result = update_incremental_store(source_path, **store)
+
+    assert result['rebuilt']
+    _assert_store_matches(store, source_path)
@@ -0,0 +1,112 @@
+"""
+Tests of the stage tracer
+"""
+
+import os
+import json
+import time
+
+from src.pipeline import instrumentation
+from src.pipeline.instrumentation import StageTracer
+
+
+def test_stage_records_are_written_as_json_lines(tmp_path):
+    trace_path = tmp_path / 'trace.jsonl'
+    tracer = StageTracer(str(trace_path))
+
+    with tracer.stage('load', rows_in=10):
+        tracer.annotate(rows_out=8)
+
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert records == tracer.records
+    assert records[0]['stage'] == 'load'
+    assert records[0]['rows_in'] == 10
+    assert records[0]['rows_out'] == 8
+    assert records[0]['wall_seconds'] >= 0
+    assert records[0]['cpu_seconds'] >= 0
+
+
+def test_nested_stages_name_their_parent():
+    tracer = StageTracer()
+
+    with tracer.stage('analysis'):
+        with tracer.stage('clean'):
+            pass
+
+    parents = {record['stage']: record['parent'] for record in tracer.records}
+    assert parents == {'clean': 'analysis', 'analysis': None}
+    assert len({record['run_id'] for record in tracer.records}) == 1
+
+
+def test_stages_are_traced_without_the_resource_module(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'resource', None)
+    tracer = StageTracer()
+
+    with tracer.stage('load'):
+        pass
+
+    assert instrumentation.get_peak_rss_mb() is None
+    assert 'peak_rss_delta_mb' not in tracer.records[0]
+    assert tracer.records[0]['wall_seconds'] >= 0
+
+
+def test_top_level_stages_are_profiled(tmp_path):
+    tracer = StageTracer(profile_dir=str(tmp_path), trace_memory=True)
+
+    with tracer.stage('report'):
+        with tracer.stage('inner'):
+            sum(range(1000))
+
+    report, = [record for record in tracer.records
+               if record['stage'] == 'report']
+    inner, = [record for record in tracer.records
+              if record['stage'] == 'inner']
+    assert os.path.exists(report['profile'])
+    assert os.path.exists(report['allocations'])
+    assert report['traced_peak_delta_mb'] >= 0
+    assert 'profile' not in inner
+
+
+def _busy_dependency():
+    return sum(range(200_000))
+
+
+def test_detached_stages_are_measured_on_their_own(tmp_path):
+    import pstats
+
+    tracer = StageTracer(profile_dir=str(tmp_path), trace_memory=True)
+
+    with tracer.stage('report'):
+        with tracer.detached():
+            with tracer.stage('dependency'):
+                _busy_dependency()
+                time.sleep(0.2)
+
+    report, dependency = tracer.records[1], tracer.records[0]
+    assert dependency['parent'] is None
+    assert report['wall_seconds'] < 0.1
+    assert dependency['wall_seconds'] >= 0.2
+
+    def functions(record):
+        return {name for _, _, name in pstats.Stats(record['profile']).stats}
+    assert '_busy_dependency' in functions(dependency)
+    assert '_busy_dependency' not in functions(report)
+
+
+def test_pipeline_dependencies_are_top_level_stages(raw_path, tmp_path,
+                                                    monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from run_analysis import run_full_analysis
+
+    trace_path = tmp_path / 'trace.jsonl'
+    run_full_analysis(raw_path, use_cache=False, trace_path=str(trace_path),
+                      profile=True, stages=['stats', 'regional_means'])
+
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    parents = {record['stage']: record['parent'] for record in records}
+    assert parents == {'load_data': 'clean', 'clean_and_preprocess': 'clean',
+                       'clean': None, 'stats': None, 'preprocess': None,
+                       'regional_means': None}
+    for record in records:
+        if record['parent'] is None:
+            assert os.path.exists(record['profile'])
@@ -0,0 +1,85 @@
+"""
+Tests of the multi-process cleaning and preprocessing
+"""
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.data.data_processing import (
+    load_data, clean_data, preprocess_data, clean_and_preprocess
+)
+from src.data.parallel import (
+    split_row_ranges, parallel_clean_data, parallel_preprocess_data,
+    parallel_clean_and_preprocess
+)
+
+
+@pytest.fixture(scope='module')
+def synthetic_df(synthetic_path):
+    """Raw synthetic catalog"""
+    return load_data(synthetic_path)
+
+
+@pytest.mark.parametrize('num_rows, num_partitions', [
+    (10, 3), (10, 1), (3, 8), (0, 4)
+])
+def test_row_ranges_cover_rows_in_order(num_rows, num_partitions):
+    ranges = split_row_ranges(num_rows, num_partitions)
+
+    assert [position for start, stop in ranges
+            for position in range(start, stop)] == list(range(num_rows))
+    assert len(ranges) <= num_partitions
+    sizes = [stop - start for start, stop in ranges]
+    assert not sizes or max(sizes) - min(sizes) <= 1
+
+
+def test_parallel_clean_matches_serial(synthetic_df, tmp_path):
+    counts, serial_counts = {}, {}
+
+    cleaned = parallel_clean_data(
+        synthetic_df, workers=2, num_partitions=5,
+        quarantine_path=str(tmp_path / 'parallel.csv'),
+        rejection_counts=counts)
+    expected = clean_data(synthetic_df,
+                          quarantine_path=str(tmp_path / 'serial.csv'),
+                          rejection_counts=serial_counts)
+
+    pdt.assert_frame_equal(cleaned, expected)
+    assert counts == serial_counts
+    pdt.assert_frame_equal(pd.read_csv(tmp_path / 'parallel.csv'),
+                           pd.read_csv(tmp_path / 'serial.csv'))
+
+
+def test_parallel_preprocess_matches_serial(synthetic_df):
+    cleaned = clean_data(synthetic_df)
+
+    pdt.assert_frame_equal(
+        parallel_preprocess_data(cleaned, workers=2, num_partitions=5),
+        preprocess_data(cleaned))
+
+
+def test_parallel_fused_pass_matches_serial(synthetic_df):
+    counts, serial_counts = {}, {}
+
+    processed = parallel_clean_and_preprocess(
+        synthetic_df, workers=2, num_partitions=5, rejection_counts=counts)
+    expected = clean_and_preprocess(synthetic_df,
+                                    rejection_counts=serial_counts)
+
+    pdt.assert_frame_equal(processed, expected)
+    assert counts == serial_counts
+
+
+def test_pipeline_serial_pass_matches_workers(raw_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from run_analysis import run_full_analysis
+
+    outputs = {}
+    for data_workers in [None, 2]:
+        outputs[data_workers] = str(tmp_path / f'processed-{data_workers}.csv')
+        run_full_analysis(raw_path, use_cache=False, data_workers=data_workers,
+                          processed_path=outputs[data_workers],
+                          stages=['save'])
+
+    pdt.assert_frame_equal(pd.read_csv(outputs[None]), pd.read_csv(outputs[2]))
@@ -0,0 +1,109 @@
+"""
+Tests of the approximate quantile sketches
+"""
+
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.data_processing import load_data, clean_and_preprocess
+from src.analysis.quantiles import (
+    REGIONS, QuantileSketch, build_quantile_sketches, merge_quantile_sketches,
+    quantile_table, regional_quantiles, save_quantile_sketches,
+    load_quantile_sketches
+)
+
+
+QUANTILES = [0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 1.0]
+
+
+@pytest.fixture
+def values():
+    """Skewed values with zeros and a few negative values"""
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(-1.5, 1.5, 20000)
+    values[rng.random(len(values)) < 0.3] = 0.0
+    values[:50] = -values[:50]
+    return values
+
+
+@pytest.mark.parametrize('relative_accuracy', [0.01, 0.05])
+def test_quantiles_are_within_relative_accuracy(values, relative_accuracy):
+    sketch = QuantileSketch(relative_accuracy)
+    sketch.update(values)
+    ordered = np.sort(values)
+
+    for q in QUANTILES:
+        exact = ordered[math.floor(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= \
+            relative_accuracy * abs(exact) + 1e-12
+
+
+def test_merged_sketches_equal_one_sketch(values):
+    sketch = QuantileSketch()
+    sketch.update(values)
+    merged = QuantileSketch()
+    for part in np.array_split(values, 7):
+        partial = QuantileSketch()
+        partial.update(part)
+        merged.merge(partial)
+
+    assert merged.to_dict() == sketch.to_dict()
+
+
+def test_sketch_ignores_missing_values_and_handles_empty():
+    sketch = QuantileSketch()
+    assert np.isnan(sketch.quantile(0.5))
+
+    sketch.update([np.nan, 0.0, 0.0, 2.0])
+    assert sketch.count == 3
+    assert sketch.quantile(0.5) == 0.0
+
+
+def test_sketch_rejects_invalid_accuracy():
+    with pytest.raises(ValueError):
+        QuantileSketch(0)
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_chunked_sketches_match_full_build(synthetic_path):
+    df = clean_and_preprocess(load_data(synthetic_path))
+    chunks = clean_and_preprocess(load_data(synthetic_path, chunksize=800))
+
+    expected = build_quantile_sketches(df, 'lifecycle_phase')
+    chunked = build_quantile_sketches(chunks, 'lifecycle_phase')
+    halves = merge_quantile_sketches(
+        build_quantile_sketches(df.iloc[:2000], 'lifecycle_phase'), None,
+        build_quantile_sketches(df.iloc[2000:], 'lifecycle_phase'))
+
+    for result in [chunked, halves]:
+        assert result.keys() == expected.keys()
+        for key in expected:
+            for region in REGIONS:
+                assert result[key][region].to_dict() == \
+                    expected[key][region].to_dict()
+
+
+def test_regional_quantiles_match_exact_quantiles(processed_df):
+    table = regional_quantiles(processed_df, 'lifecycle_phase')
+
+    assert list(table.columns) == ['p50', 'p90', 'p99']
+    for (phase, region), row in table.iterrows():
+        values = np.sort(processed_df.loc[
+            processed_df['lifecycle_phase'] == phase, region].to_numpy(
+                dtype=np.float64))
+        for name, q in [('p50', 0.5), ('p90', 0.9), ('p99', 0.99)]:
+            exact = values[math.floor(q * (len(values) - 1))]
+            assert row[name] == pytest.approx(exact, rel=0.01, abs=1e-9)
+
+
+def test_sketches_round_trip_through_json(processed_df, tmp_path):
+    sketches = build_quantile_sketches(processed_df, 'lifecycle_phase')
+
+    path = save_quantile_sketches(sketches, str(tmp_path / 'sketches.json'))
+
+    pd.testing.assert_frame_equal(
+        quantile_table(load_quantile_sketches(path)).rename(index=str),
+        quantile_table(sketches).rename(index=str))
@@ -0,0 +1,49 @@
+"""
+Tests of the regional sales analysis
+"""
+
+import pandas.testing as pdt
+
+from src.analysis.regional_analysis import (
+    REGIONS, MARKET_REGIONS, compute_regional_aggregates,
+    analyze_top_genres_by_region, analyze_regional_preferences
+)
+from src.data.data_processing import widen_sales
+
+
+def test_regional_aggregates_match_grouped_rows(processed_df):
+    sales = widen_sales(processed_df[REGIONS])
+
+    aggregates = compute_regional_aggregates(processed_df)
+
+    genre_means = sales.groupby(processed_df['genre'], observed=True).mean()
+    pdt.assert_frame_equal(
+        aggregates['genre_means'].rename(index=str).sort_index(),
+        genre_means.rename(index=str).sort_index(), check_names=False,
+        check_index_type=False, check_column_type=False, rtol=1e-12)
+    phase_means = sales.groupby(processed_df['lifecycle_phase'],
+                                observed=True).mean()
+    pdt.assert_frame_equal(
+        aggregates['phase_means'].rename(index=str).sort_index(),
+        phase_means.rename(index=str).sort_index(), check_names=False,
+        check_index_type=False, check_column_type=False, rtol=1e-12)
+
+    expected = sales.agg(['mean', 'median', 'std', 'min', 'max', 'sum'])
+    pdt.assert_frame_equal(aggregates['distribution'], expected,
+                           check_names=False, rtol=1e-9)
+
+
+def test_top_genres_by_region_are_sorted(processed_df):
+    top_genres = analyze_top_genres_by_region(processed_df, top_n=5)
+
+    for region in REGIONS:
+        sales = [sales for _, sales in top_genres[region]]
+        assert len(sales) == 5
+        assert sales == sorted(sales, reverse=True)
+
+
+def test_market_shares_add_up(processed_df):
+    market_share = analyze_regional_preferences(processed_df)['market_share']
+
+    assert list(market_share) == MARKET_REGIONS
+    assert abs(sum(market_share.values()) - 100) < 1e-9
@@ -0,0 +1,141 @@
+"""
+Tests of the streaming report writer
+"""
+
+import os
+import sys
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.analysis.report_writer import ReportWriter
+
+
+@pytest.fixture
+def sales_table():
+    """Small table with a named index and a missing value"""
+    return pd.DataFrame(
+        {'global': [1.5, np.nan, 0.25], 'games': np.array([3, 1, 2])},
+        index=pd.Index(['Action', 'Shooter', 'Sports'], name='genre'))
+
+
+def _write_report(writer, sales_table):
+    """Writes a title, a section of rows and a section with a table"""
+    writer.text('Sales Report')
+    writer.section('1. Summary')
+    writer.rows([{'metric': 'games', 'value': np.int64(6)},
+                 {'metric': 'total', 'value': np.float32(1.75)}],
+                line_format=lambda row: f"{row['metric']}: {row['value']}")
+    writer.section('2. Sales by Genre', rule=None)
+    writer.table(sales_table)
+
+
+def test_text_report_matches_to_string(sales_table, tmp_path):
+    path = str(tmp_path / 'reports' / 'report.txt')
+
+    with ReportWriter(path) as writer:
+        _write_report(writer, sales_table)
+
+    assert writer.path == path
+    assert not os.path.exists(str(tmp_path / 'reports' / 'report.jsonl'))
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == '\n'.join([
+            'Sales Report', '1. Summary', '-' * 40, 'games: 6', 'total: 1.75',
+            '2. Sales by Genre', sales_table.to_string()])
+
+
+def test_large_tables_are_written_in_blocks(tmp_path):
+    df = pd.DataFrame({'value': np.arange(25) * 1.5})
+    path = str(tmp_path / 'report.txt')
+
+    with ReportWriter(path) as writer:
+        writer.table(df, block_rows=10)
+
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    # Only the first block has a header; values are not realigned by blocks
+    assert lines[0] == df.iloc[:10].to_string().split('\n')[0]
+    assert len(lines) == len(df) + 1
+    assert [float(line.split()[1]) for line in lines[1:]] == list(df['value'])
+
+
+def test_json_and_csv_outputs_hold_the_data(sales_table, tmp_path):
+    path = str(tmp_path / 'report.txt')
+
+    with ReportWriter(path, formats=('json', 'csv')) as writer:
+        _write_report(writer, sales_table)
+
+    assert writer.path == str(tmp_path / 'report.jsonl')
+    assert not os.path.exists(path)
+    with open(writer.paths['json'], encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert records[:2] == [
+        {'section': '1. Summary', 'row': {'metric': 'games', 'value': 6}},
+        {'section': '1. Summary', 'row': {'metric': 'total', 'value': 1.75}}]
+    assert records[2:] == [
+        {'section': '2. Sales by Genre',
+         'row': {'genre': 'Action', 'global': 1.5, 'games': 3}},
+        {'section': '2. Sales by Genre',
+         'row': {'genre': 'Shooter', 'global': None, 'games': 1}},
+        {'section': '2. Sales by Genre',
+         'row': {'genre': 'Sports', 'global': 0.25, 'games': 2}}]
+
+    assert sorted(os.listdir(writer.paths['csv'])) == [
+        '01_summary.csv', '02_sales_by_genre.csv']
+    table = pd.read_csv(
+        os.path.join(writer.paths['csv'], '02_sales_by_genre.csv'),
+        index_col='genre')
+    pdt.assert_frame_equal(table, sales_table)
+
+
+def test_gzip_outputs_match_uncompressed(sales_table, tmp_path):
+    formats = ('text', 'json', 'csv')
+    with ReportWriter(str(tmp_path / 'plain' / 'report.txt'),
+                      formats=formats) as plain:
+        _write_report(plain, sales_table)
+    with ReportWriter(str(tmp_path / 'gzip' / 'report.txt'), formats=formats,
+                      compression='gzip') as compressed:
+        _write_report(compressed, sales_table)
+
+    assert compressed.paths['text'].endswith('report.txt.gz')
+    assert compressed.paths['json'].endswith('report.jsonl.gz')
+    for name in ['text', 'json']:
+        with open(plain.paths[name], 'rb') as f, \
+                gzip.open(compressed.paths[name], 'rb') as g:
+            assert g.read() == f.read()
+    assert sorted(os.listdir(compressed.paths['csv'])) == [
+        '01_summary.csv.gz', '02_sales_by_genre.csv.gz']
+
+
+def test_zstd_outputs_round_trip(sales_table, tmp_path):
+    zstandard = pytest.importorskip('zstandard')
+    path = str(tmp_path / 'report.txt')
+
+    with ReportWriter(path, compression='zstd') as writer:
+        _write_report(writer, sales_table)
+
+    with zstandard.open(writer.path, 'rt', encoding='utf-8') as f:
+        assert f.read().endswith(sales_table.to_string())
+
+
+def test_invalid_formats_and_compressions_are_rejected(tmp_path):
+    path = str(tmp_path / 'report.txt')
+
+    with pytest.raises(ValueError):
+        ReportWriter(path, formats=('text', 'xml'))
+    with pytest.raises(ValueError):
+        ReportWriter(path, formats=())
+    with pytest.raises(ValueError):
+        ReportWriter(path, compression='bz2')
+    assert not os.path.exists(path)
+
+
+def test_zstd_requires_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'zstandard', None)
+
+    with pytest.raises(ImportError, match='zstandard'):
+        ReportWriter(str(tmp_path / 'report.txt'), compression='zstd')
@@ -0,0 +1,93 @@
+"""
+Tests of sharing DataFrames with worker processes
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.data.shared_frame import SharedFrame, attach_frame, map_shared
+
+
+def _worker_memory(handle=None):
+    """Returns the Arrow memory of a worker, attached to a shared frame"""
+    import pyarrow as pa
+
+    df = None if handle is None else attach_frame(handle)
+    allocated = pa.total_allocated_bytes()
+    del df
+    return allocated
+
+
+def _fresh_worker_memory(handle=None):
+    """Measures the Arrow memory of a new worker process"""
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_worker_memory, handle).result()
+
+
+def _column_sums(df, column):
+    return df[column].sum(), df['game'].str.len().sum()
+
+
+@pytest.fixture
+def mixed_df(processed_df):
+    """Processed data with nullable, object and missing string values"""
+    df = processed_df.copy()
+    df['year'] = df['year'].astype('Int16')
+    df.loc[df.index[:3], 'year'] = pd.NA
+    df['source'] = df['game'].astype(object)
+    df.loc[df.index[5], 'game'] = None
+    return df
+
+
+@pytest.mark.parametrize('index', [None, 'game', 'source', 'year', 'genre'])
+def test_attached_frame_equals_published(mixed_df, index):
+    df = mixed_df if index is None else mixed_df.set_index(index)
+
+    for frame in [df, df.iloc[10:50], df.iloc[:0]]:
+        with SharedFrame(frame) as shared:
+            pdt.assert_frame_equal(attach_frame(shared.handle), frame)
+
+
+def test_columns_are_stored_in_shared_memory(mixed_df):
+    with SharedFrame(mixed_df) as shared:
+        kinds = {column: spec['kind']
+                 for column, spec in shared.handle['columns']}
+
+    assert kinds == {
+        column: 'arrow' if column == 'game' else
+        'masked' if column == 'year' else
+        'factorized' if column == 'source' else
+        'categorical' if isinstance(dtype, pd.CategoricalDtype) else 'array'
+        for column, dtype in mixed_df.dtypes.items()}
+
+
+def test_map_shared_runs_tasks_in_order(processed_df):
+    tasks = [(_column_sums, (column,)) for column in ['global', 'japan']]
+
+    results = map_shared(tasks, processed_df, workers=2)
+
+    assert results == [_column_sums(processed_df, 'global'),
+                       _column_sums(processed_df, 'japan')]
+
+
+def test_workers_do_not_copy_string_columns():
+    rng = np.random.default_rng(3)
+    num_rows = 200_000
+    df = pd.DataFrame({
+        'game': [f'Game {value:012d} of a long series' for value in
+                 rng.integers(0, 10 ** 12, num_rows)],
+        'global': rng.random(num_rows).astype(np.float32)
+    })
+
+    num_characters = int(df['game'].str.len().sum())
+
+    # The handle and the attached frame take far less than the characters,
+    # which every worker would hold if the strings were copied
+    with SharedFrame(df) as shared:
+        attached = _fresh_worker_memory(shared.handle)
+    baseline = _fresh_worker_memory()
+    assert attached - baseline < num_characters / 4
@@ -0,0 +1,43 @@
+"""
+Tests of the imports made at startup by the entry points
+"""
+
+import pytest
+
+from benchmarks.startup_benchmark import (
+    ENTRY_POINTS, parse_importtime, measure_entry_point, compare_with_baseline
+)
+
+
+@pytest.mark.parametrize('name, module', ENTRY_POINTS)
+def test_entry_points_do_not_import_matplotlib(name, module):
+    result = measure_entry_point(module, repeat=1)
+
+    assert result['import_ms'] > 0
+    assert 'matplotlib' not in result['heavy_modules']
+
+
+def test_reports_command_line_imports_no_heavy_modules():
+    result = measure_entry_point('src.analysis.__main__', repeat=1)
+
+    assert result['heavy_modules'] == []
+
+
+def test_parse_importtime_reads_cumulative_times():
+    output = '\n'.join([
+        'import time: self [us] | cumulative | imported package',
+        'import time:       120 |        120 |   _io',
+        'import time:       300 |       2500 | pandas',
+        'some other output'
+    ])
+
+    assert parse_importtime(output) == {'_io': 120, 'pandas': 2500}
+
+
+def test_compare_with_baseline_skips_new_entry_points():
+    results = {'results': {'reports': {'import_ms': 30.0},
+                           'new': {'import_ms': 5.0}}}
+    baseline = {'results': {'reports': {'import_ms': 60.0}}}
+
+    assert compare_with_baseline(results, baseline) == [
+        '  reports: 0.50x baseline import time']
@@ -0,0 +1,74 @@
+"""
+Tests of the top-N selection with a partial sort
+"""
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.data.data_processing import widen_sales
+from src.analysis.topk import (
+    top_k_positions, top_k, grouped_top_k, top_groups, top_rows
+)
+
+
+def _sorted_positions(values, k):
+    """Positions of a stable descending sort, without NaN values"""
+    series = pd.Series(values).dropna()
+    order = series.sort_values(ascending=False, kind='stable').index
+    return np.asarray(order[:k] if k is not None else order)
+
+
+@pytest.mark.parametrize('k', [None, 0, 1, 5, 37, 1000])
+def test_top_k_positions_match_stable_sort(k):
+    rng = np.random.default_rng(11)
+    # Few distinct values, so that many values tie, and some NaN values
+    values = rng.integers(0, 20, 500).astype('float64')
+    values[rng.random(len(values)) < 0.05] = np.nan
+
+    np.testing.assert_array_equal(top_k_positions(values, k),
+                                  _sorted_positions(values, k))
+
+
+def test_top_k_keeps_labels(processed_df):
+    means = processed_df.groupby('publisher', observed=True)['global'].mean()
+
+    pdt.assert_series_equal(
+        top_k(means, 10), means.sort_values(ascending=False,
+                                            kind='stable').head(10))
+
+
+def test_grouped_top_k_matches_sort_per_group():
+    rng = np.random.default_rng(5)
+    values = rng.integers(0, 10, 300).astype('float64')
+    groups = rng.choice(['b', 'a', 'c'], 300)
+
+    result = grouped_top_k(values, groups, 4)
+
+    assert list(result) == ['a', 'b', 'c']
+    for label, positions in result.items():
+        members = np.flatnonzero(groups == label)
+        expected = members[_sorted_positions(values[members], 4)]
+        np.testing.assert_array_equal(positions, expected)
+
+
+@pytest.mark.parametrize('stat', ['sum', 'mean', 'size'])
+def test_top_groups_match_sorted_groupby(processed_df, stat):
+    grouped = widen_sales(processed_df['japan']).groupby(
+        processed_df['publisher'], observed=True)
+    expected = grouped.size() if stat == 'size' else grouped.agg(stat)
+
+    pdt.assert_series_equal(
+        top_groups(processed_df, 'publisher', 'japan', 5, stat),
+        expected.sort_values(ascending=False, kind='stable').head(5),
+        check_names=False)
+
+
+def test_top_rows_match_sorted_rows(processed_df):
+    columns = ['game', 'global']
+
+    pdt.assert_frame_equal(
+        top_rows(processed_df, 'global', 10, columns),
+        processed_df.sort_values('global', ascending=False,
+                                 kind='stable')[columns].head(10))
@@ -0,0 +1,98 @@
+"""
+Tests of the validation rules, rejection counts and quarantine file
+"""
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from src.data.data_processing import SALES_COLUMNS, load_data, clean_data
+from src.data.validation import (
+    MISSING_VALUES, NEGATIVE_SALES, REGIONAL_SUM_MISMATCH, REASONS_COLUMN,
+    evaluate_rules, count_rejections, merge_rejection_counts, rejected_rows,
+    write_quarantine
+)
+
+
+def _invalid_rows(raw_df):
+    """First rows of the raw data, made to violate each rule"""
+    df = raw_df.head(6).copy()
+    df.loc[df.index[1], 'publisher'] = None
+    # Negative sales that still add up to the global sales
+    df.loc[df.index[2], 'global'] -= df.loc[df.index[2], 'japan'] + 0.05
+    df.loc[df.index[2], 'japan'] = -0.05
+    df.loc[df.index[3], 'global'] += 5.0
+    # Negative sales that no longer add up to the global sales
+    df.loc[df.index[4], 'europe'] = -20.0
+    # Missing sales are only rejected for the missing value
+    df.loc[df.index[5], 'global'] = np.nan
+    return df
+
+
+def test_rules_flag_each_violation(raw_df):
+    df = _invalid_rows(raw_df)
+
+    flags, _ = evaluate_rules(df, SALES_COLUMNS[:-1], SALES_COLUMNS[-1])
+
+    np.testing.assert_array_equal(flags, [
+        0, MISSING_VALUES, NEGATIVE_SALES, REGIONAL_SUM_MISMATCH,
+        NEGATIVE_SALES | REGIONAL_SUM_MISMATCH, MISSING_VALUES])
+
+
+def test_counts_and_reasons_of_rejected_rows(raw_df):
+    df = _invalid_rows(raw_df)
+    flags, _ = evaluate_rules(df, SALES_COLUMNS[:-1], SALES_COLUMNS[-1])
+
+    assert count_rejections(flags) == {
+        'rows': 6, 'rejected': 5, 'missing_values': 2, 'negative_sales': 2,
+        'regional_sum_mismatch': 2}
+
+    rows = rejected_rows(df, flags)
+    pdt.assert_frame_equal(rows.drop(columns=REASONS_COLUMN), df.iloc[1:])
+    assert list(rows[REASONS_COLUMN]) == [
+        'missing_values', 'negative_sales', 'regional_sum_mismatch',
+        'negative_sales,regional_sum_mismatch', 'missing_values']
+
+
+def test_merge_rejection_counts_adds_to_totals():
+    total = merge_rejection_counts({}, {'rows': 3, 'rejected': 1})
+
+    assert merge_rejection_counts(total, {'rows': 2, 'rejected': 2}) is total
+    assert total == {'rows': 5, 'rejected': 3}
+
+
+def test_write_quarantine_appends_without_header(raw_df, tmp_path):
+    df = _invalid_rows(raw_df)
+    flags, _ = evaluate_rules(df, SALES_COLUMNS[:-1], SALES_COLUMNS[-1])
+    rows = rejected_rows(df, flags)
+    path = str(tmp_path / 'quarantine' / 'rejected.csv')
+
+    write_quarantine(rows.iloc[:2], path)
+    write_quarantine(rows.iloc[2:], path, append=True)
+
+    saved = pd.read_csv(path)
+    assert len(saved) == len(rows)
+    assert list(saved[REASONS_COLUMN]) == list(rows[REASONS_COLUMN])
+
+    write_quarantine(rows.iloc[:1], path)
+    assert len(pd.read_csv(path)) == 1
+
+
+def test_clean_data_quarantines_removed_rows(synthetic_path, tmp_path):
+    raw = load_data(synthetic_path)
+    counts, chunk_counts = {}, {}
+    path, chunk_path = str(tmp_path / 'whole.csv'), str(tmp_path / 'chunks.csv')
+
+    cleaned = clean_data(raw, quarantine_path=path, rejection_counts=counts)
+    chunks = list(clean_data(load_data(synthetic_path, chunksize=700),
+                             quarantine_path=chunk_path,
+                             rejection_counts=chunk_counts))
+
+    quarantined = pd.read_csv(path)
+    assert counts['rows'] == len(raw)
+    assert counts['rejected'] == len(raw) - len(cleaned) == len(quarantined) > 0
+    assert set(quarantined['id']).isdisjoint(cleaned['id'])
+    assert chunk_counts == counts
+    pdt.assert_frame_equal(pd.read_csv(chunk_path), quarantined)
+    pdt.assert_frame_equal(pd.concat(chunks), cleaned, check_dtype=False,
+                           check_categorical=False)
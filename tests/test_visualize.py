@@ -0,0 +1,54 @@
+"""
+Tests of the figures of the analysis
+"""
+
+import os
+
+import matplotlib
+import pytest
+
+from src.analysis.cube import build_cube
+from src.visualization import visualize
+from src.visualization.visualize import FIGURES, create_all_visualizations
+
+
+matplotlib.use('Agg')
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_create_all_visualizations_saves_every_figure(processed_df, tmp_path,
+                                                      workers):
+    paths = create_all_visualizations(processed_df, workers, str(tmp_path))
+
+    assert [os.path.basename(path) for path in paths] == [
+        filename for _, filename in FIGURES]
+    assert all(os.path.getsize(path) > 0 for path in paths)
+
+
+def test_create_all_visualizations_draws_from_cube_only(processed_df, tmp_path):
+    paths = create_all_visualizations(None, 2, str(tmp_path),
+                                      cube=build_cube(processed_df))
+
+    assert len(paths) == len(FIGURES)
+    assert all(os.path.getsize(path) > 0 for path in paths)
+
+
+def _plot_without_rows(df, cube=None):
+    """Figure drawn from the cube, which fails if it receives the rows"""
+    import matplotlib.pyplot as plt
+
+    assert df is None
+    fig, ax = plt.subplots()
+    ax.plot(cube.rollup('genre').stat('count'))
+    return fig
+
+
+def test_figure_workers_receive_only_the_cube(processed_df, tmp_path,
+                                              monkeypatch):
+    monkeypatch.setattr(visualize, 'FIGURES', [
+        (_plot_without_rows, 'first.png'), (_plot_without_rows, 'second.png')])
+
+    paths = create_all_visualizations(processed_df, 2, str(tmp_path))
+
+    assert [os.path.basename(path) for path in paths] == ['first.png',
+                                                          'second.png']
@@ -0,0 +1,83 @@
+"""
+Tests of the yearly sales analysis
+"""
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.data.data_processing import widen_sales
+from src.analysis.aggregates import build_aggregates
+from src.analysis.year_analysis import (
+    TIME_GRAINS, analyze_yearly_trends, analyze_top_genres_by_year
+)
+
+
+def test_yearly_trends_match_double_precision(raw_path, processed_df):
+    sales = pd.read_csv(raw_path).loc[processed_df.index]
+    expected = sales.groupby('year')['global'].agg(['mean', 'sum', 'size'])
+
+    trends = analyze_yearly_trends(processed_df)
+
+    pdt.assert_series_equal(trends['total_sales'], expected['sum'],
+                            check_names=False, check_index_type=False,
+                            rtol=1e-12)
+    pdt.assert_series_equal(trends['average_sales'], expected['mean'],
+                            check_names=False, check_index_type=False,
+                            rtol=1e-12)
+
+
+def _naive_top_genres(df, periods, top_n):
+    """Top genres of every period, filtering and sorting each period"""
+    result = {}
+    for period in sorted(periods.dropna().unique()):
+        rows = df[periods == period]
+        means = widen_sales(rows['global']).groupby(
+            rows['genre'].astype(str)).mean()
+        top = means.sort_values(ascending=False, kind='stable').head(top_n)
+        result[period] = list(top.items())
+    return result
+
+
+def _assert_same_top_genres(result, expected):
+    assert list(result) == list(expected)
+    for period, genres in expected.items():
+        assert [genre for genre, _ in result[period]] == \
+            [genre for genre, _ in genres]
+        np.testing.assert_allclose([mean for _, mean in result[period]],
+                                   [mean for _, mean in genres], rtol=1e-12)
+
+
+def test_top_genres_by_year_match_per_year_sort(processed_df):
+    known = processed_df[processed_df['year'] > 0]
+    expected = _naive_top_genres(known, known['year'], 3)
+
+    _assert_same_top_genres(analyze_top_genres_by_year(processed_df), expected)
+    _assert_same_top_genres(
+        analyze_top_genres_by_year(
+            None, aggregates=build_aggregates(processed_df)), expected)
+
+
+@pytest.mark.parametrize('grain', ['year', 'quarter', 'month'])
+def test_top_genres_by_release_date_grain(processed_df, grain):
+    rng = np.random.default_rng(2)
+    df = processed_df.copy()
+    df['release_date'] = pd.Timestamp('2014-01-01') + pd.to_timedelta(
+        rng.integers(0, 6 * 365, len(df)), unit='D')
+    df.loc[df.index[:5], 'release_date'] = pd.NaT
+
+    periods = df['release_date'].dt.to_period(TIME_GRAINS[grain])
+    if grain == 'year':
+        periods = periods.dt.year
+    expected = _naive_top_genres(df, periods, 2)
+
+    _assert_same_top_genres(
+        analyze_top_genres_by_year(df, top_n=2, grain=grain), expected)
+
+
+def test_top_genres_reject_unknown_or_unsupported_grains(processed_df):
+    with pytest.raises(ValueError):
+        analyze_top_genres_by_year(processed_df, grain='week')
+    with pytest.raises(ValueError):
+        analyze_top_genres_by_year(processed_df, grain='month')